@@ -3,10 +3,6 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
-
-from backend.extensions import db
-from backend.routes import auth, files, jobs
 
 
 def create_app(test_config=None):
@@ -18,6 +14,28 @@ def create_app(test_config=None):
     Returns:
         Flask: The configured Flask application instance.
     """
+    # Imported here so that importing the package (e.g. while pytest collects
+    # backend/tests) does not pull in the whole application
+    from backend.extensions import (
+        db,
+        metrics,
+        profiler,
+        query_profiler,
+        replicas,
+    )
+    from backend.routes import auth, jobs, uploads
+    from backend.services.logging_setup import configure_logging
+    from backend.services.metrics import scrape_allowed
+    from backend.services.pooling import (
+        dispose_after_fork,
+        engine_options_from_env,
+        pool_stats,
+        track_checkouts,
+    )
+    from backend.services.replicas import replica_binds
+    from backend.services.schema import LazyMigrateCommands, check_schema
+
+    configure_logging()
     app = Flask(__name__)
 
     # Configure CORS
@@ -47,27 +65,76 @@ def create_app(test_config=None):
 
     if test_config is not None:
         app.config.update(test_config)
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        engine_options_from_env(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
+    app.config.setdefault(
+        "SQLALCHEMY_BINDS",
+        replica_binds(os.getenv("DATABASE_REPLICA_URLS"), engine_options_from_env),
+    )
+    app.config.setdefault(
+        "DB_REPLICA_STICKY_SECONDS", int(os.getenv("DB_REPLICA_STICKY_SECONDS", 10))
+    )
+    app.config.setdefault("DB_SCHEMA_CHECK", os.getenv("DB_SCHEMA_CHECK", "strict"))
+    app.config.setdefault("METRICS_TOKEN", os.getenv("METRICS_TOKEN"))
+    app.config.setdefault(
+        "QUERY_PROFILER",
+        os.getenv("QUERY_PROFILER", "false").lower() in ("true", "1", "yes"),
+    )
+    app.config.setdefault("QUERY_BUDGET", int(os.getenv("QUERY_BUDGET", 25)))
+    app.config.setdefault(
+        "QUERY_REPEAT_THRESHOLD", int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+    )
+    app.config.setdefault("PROFILER_SECRET", os.getenv("PROFILER_SECRET"))
+    app.config.setdefault("PROFILER_OUTPUT_DIR", os.getenv("PROFILER_OUTPUT_DIR"))
 
     # Initialize extensions
     db.init_app(app)
+    metrics.init_app(app, db)
+    query_profiler.init_app(app, db)
+    profiler.init_app(app)
     jwt = JWTManager(app)
-    migrate = Migrate(app, db)
+    replicas.init_app(app)
 
-    # Create all tables
     with app.app_context():
-        # Import models to ensure they are registered with SQLAlchemy
-        from backend.models.models import File, Job, User  # noqa
+        for engine in db.engines.values():
+            track_checkouts(engine)
+            dispose_after_fork(engine)
+
+    # `flask db ...`; Flask-Migrate and Alembic are imported on first use
+    app.cli.add_command(LazyMigrateCommands(db))
 
-        db.create_all()
+    # Import models to ensure they are registered with SQLAlchemy
+    from backend.models.models import File, Job, User  # noqa
+
+    # The schema is managed by migrations; DB_SCHEMA_CHECK=create restores
+    # the old create_all() behaviour
+    check_schema(app, db, app.config["DB_SCHEMA_CHECK"])
 
     # Register blueprints
     app.register_blueprint(auth.bp)
-    app.register_blueprint(jobs.bp)
-    app.register_blueprint(files.bp)
+    app.register_blueprint(jobs.bp, url_prefix="/api/jobs")
+    app.register_blueprint(uploads.bp, url_prefix="/api/uploads")
 
     @app.route("/health")
     def health_check():
         """Health check endpoint."""
         return jsonify({"status": "Jobpal API is running!"})
 
+    @app.route("/health/pool")
+    def pool_health():
+        """Connection pool statistics for this worker, guarded like /metrics."""
+        if not scrape_allowed():
+            return jsonify({"error": "Unauthorized"}), 401
+        return jsonify(
+            {
+                "pid": os.getpid(),
+                "engines": {
+                    key or "default": pool_stats(engine)
+                    for key, engine in db.engines.items()
+                },
+            }
+        )
+
     return app
@@ -1,13 +1,35 @@
 import os
 
-from extensions import db, jwt, migrate
+from extensions import (
+    blobs,
+    compressor,
+    db,
+    job_events,
+    jwt,
+    metrics,
+    profiler,
+    query_profiler,
+    replicas,
+    text_extractor,
+)
 from flask import Flask
 from flask_cors import CORS
-from routes import auth_bp, jobs_bp
+from routes import auth_bp, dashboard_bp, jobs_bp, uploads_bp
+from services.logging_setup import configure_logging
+from services.metrics import scrape_allowed
+from services.pooling import (
+    dispose_after_fork,
+    engine_options_from_env,
+    pool_stats,
+    track_checkouts,
+)
+from services.replicas import replica_binds
+from services.schema import LazyMigrateCommands, check_schema
 
 
 def create_app():
     """Create and configure the Flask application"""
+    configure_logging()
     app = Flask(__name__)
 
     # Configure CORS
@@ -17,8 +39,24 @@ def create_app():
             r"/*": {
                 "origins": os.environ.get("CORS_ORIGINS").split(","),
                 "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
-                "expose_headers": ["Authorization"],
+                "allow_headers": [
+                    "Content-Type",
+                    "Authorization",
+                    "Range",
+                    "If-Range",
+                    "If-None-Match",
+                    "Content-Range",
+                    "Upload-Offset",
+                ],
+                "expose_headers": [
+                    "Authorization",
+                    "Accept-Ranges",
+                    "Content-Disposition",
+                    "Content-Range",
+                    "ETag",
+                    "Location",
+                    "Upload-Offset",
+                ],
                 "supports_credentials": True,
             }
         },
@@ -29,6 +67,20 @@ def create_app():
         "DATABASE_URL", "postgresql:///jobpal"
     )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Pool sizing and PgBouncer mode come from DB_* variables (services/pooling.py)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options_from_env(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    # Optional read replicas: GET requests read from one of them, except right
+    # after the same user wrote something (see services/replicas.py)
+    app.config["SQLALCHEMY_BINDS"] = replica_binds(
+        os.environ.get("DATABASE_REPLICA_URLS"), engine_options_from_env
+    )
+    app.config["DB_REPLICA_STICKY_SECONDS"] = int(
+        os.environ.get("DB_REPLICA_STICKY_SECONDS", 10)
+    )
+    # off, warn, strict or create; see services/schema.py
+    app.config["DB_SCHEMA_CHECK"] = os.environ.get("DB_SCHEMA_CHECK", "strict")
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev")
 
     # Configure JWT
@@ -47,31 +99,141 @@ def create_app():
     app.config["MAX_CONTENT_LENGTH"] = int(
         os.environ.get("MAX_CONTENT_LENGTH", 16 * 1024 * 1024)
     )  # 16MB max file size
+    # Resumable uploads: each chunk must fit in MAX_CONTENT_LENGTH, the whole
+    # file in UPLOAD_MAX_SIZE. Idle sessions are purged after UPLOAD_SESSION_TTL.
+    app.config["UPLOAD_CHUNK_SIZE"] = int(
+        os.environ.get("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+    )
+    app.config["UPLOAD_MAX_SIZE"] = int(
+        os.environ.get("UPLOAD_MAX_SIZE", 200 * 1024 * 1024)
+    )
+    app.config["UPLOAD_SESSION_TTL"] = int(
+        os.environ.get("UPLOAD_SESSION_TTL", 24 * 60 * 60)
+    )
+    # Per-user limit on distinct uploaded bytes (0 = unlimited)
+    app.config["USER_STORAGE_QUOTA"] = int(os.environ.get("USER_STORAGE_QUOTA", 0))
+    # Internal nginx location that serves UPLOAD_FOLDER (e.g. "/protected-uploads").
+    # When set, downloads are handed off to nginx via X-Accel-Redirect.
+    app.config["FILE_ACCEL_REDIRECT"] = os.environ.get("FILE_ACCEL_REDIRECT")
+    # Background threads per worker extracting text from uploads (0 disables)
+    app.config["EXTRACTION_WORKERS"] = int(os.environ.get("EXTRACTION_WORKERS", 2))
+    # Bearer token required to scrape /metrics (unset = localhost only)
+    app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+    # Log N+1 patterns and requests over budget; see services/query_profiler.py
+    app.config["QUERY_PROFILER"] = os.environ.get(
+        "QUERY_PROFILER", "false"
+    ).lower() in ("true", "1", "yes")
+    app.config["QUERY_BUDGET"] = int(os.environ.get("QUERY_BUDGET", 25))
+    app.config["QUERY_REPEAT_THRESHOLD"] = int(
+        os.environ.get("QUERY_REPEAT_THRESHOLD", 5)
+    )
+    # Live job updates (GET /api/jobs/events); see services/job_events.py
+    app.config["JOB_EVENTS_HEARTBEAT"] = float(
+        os.environ.get("JOB_EVENTS_HEARTBEAT", 15)
+    )
+    app.config["JOB_EVENTS_MAX_SECONDS"] = float(
+        os.environ.get("JOB_EVENTS_MAX_SECONDS", 300)
+    )
+    app.config["JOB_EVENTS_RETENTION"] = int(
+        os.environ.get("JOB_EVENTS_RETENTION", 24 * 60 * 60)
+    )
+    app.config["JOB_EVENTS_LISTEN_URL"] = os.environ.get("JOB_EVENTS_LISTEN_URL")
+    # Response compression (services/compression.py)
+    app.config["COMPRESS_ENCODINGS"] = [
+        encoding.strip()
+        for encoding in os.environ.get("COMPRESS_ENCODINGS", "zstd,br,gzip").split(",")
+        if encoding.strip()
+    ]
+    app.config["COMPRESS_LEVELS"] = {
+        encoding: int(os.environ[f"COMPRESS_LEVEL_{encoding.upper()}"])
+        for encoding in app.config["COMPRESS_ENCODINGS"]
+        if f"COMPRESS_LEVEL_{encoding.upper()}" in os.environ
+    }
+    app.config["COMPRESS_MIN_SIZE"] = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    app.config["COMPRESS_MIMETYPES"] = ["application/json", "text/csv", "text/plain"]
+    app.config["COMPRESS_CACHE_BYTES"] = int(
+        os.environ.get("COMPRESS_CACHE_BYTES", 16 * 1024 * 1024)
+    )
+    # Admin profiling endpoints are only registered when a secret is set
+    app.config["PROFILER_SECRET"] = os.environ.get("PROFILER_SECRET")
+    app.config["PROFILER_OUTPUT_DIR"] = os.environ.get("PROFILER_OUTPUT_DIR")
 
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # First, so request timing includes the other extensions' hooks
+    metrics.init_app(app, db)
+    # Its after_request hook runs after the others but before the metrics',
+    # so profiles leave it out and response sizes are recorded as sent
+    compressor.init_app(app)
+    query_profiler.init_app(app, db)
+    profiler.init_app(app)
     jwt.init_app(app)
+    blobs.init_app(app)
+    text_extractor.init_app(app)
+    replicas.init_app(app)
+    job_events.init_app(app, db)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            track_checkouts(engine)
+            dispose_after_fork(engine)
+
+    # `flask db ...`; Flask-Migrate and Alembic are imported on first use
+    app.cli.add_command(LazyMigrateCommands(db))
 
     # Import models after db is initialized
-    from models import File, Job, User
+    from models import (
+        Blob,
+        File,
+        FileText,
+        Job,
+        UploadSession,
+        User,
+        UserBlob,
+        VacancyText,
+    )
 
     # Register blueprints
     app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(uploads_bp, url_prefix="/api/uploads")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
 
     @app.route("/health", methods=["GET"])
     def health_check():
         """Health check endpoint"""
         return {"status": "healthy"}, 200
 
+    @app.route("/health/pool", methods=["GET"])
+    def pool_health():
+        """Connection pool statistics for this worker, guarded like /metrics"""
+        if not scrape_allowed():
+            return {"error": "Unauthorized"}, 401
+        return {
+            "pid": os.getpid(),
+            "engines": {
+                key or "default": pool_stats(engine)
+                for key, engine in db.engines.items()
+            },
+        }, 200
+
+    check_schema(app, db, app.config["DB_SCHEMA_CHECK"])
+
     return app
 
 
-app = create_app()
+def __getattr__(name):
+    # ``app:app`` and ``from app import app`` still work, but importing this
+    # module no longer builds an application (gunicorn calls create_app()).
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    app.run(
+    create_app().run(
         host="0.0.0.0",  # Bind to all network interfaces
         port=int(os.environ.get("PORT", 7315)),
         debug=os.environ.get("ENV", "development") == "development",
@@ -1,8 +1,25 @@
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from services import (
+    BlobStore,
+    JobEvents,
+    Profiler,
+    QueryProfiler,
+    ReplicaRouter,
+    RequestMetrics,
+    ResponseCompressor,
+    RoutingSession,
+    TextExtractor,
+)
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
-migrate = Migrate()
+blobs = BlobStore()
+text_extractor = TextExtractor()
+replicas = ReplicaRouter()
+metrics = RequestMetrics()
+query_profiler = QueryProfiler()
+profiler = Profiler()
+job_events = JobEvents()
+compressor = ResponseCompressor()
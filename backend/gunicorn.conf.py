@@ -0,0 +1,60 @@
+"""Gunicorn settings, overridable from the environment.
+
+    PORT                port to listen on (default 7315)
+    WEB_CONCURRENCY     number of worker processes (default 4)
+    GUNICORN_THREADS    threads per worker (default 8); each open
+                        /api/jobs/events stream holds one while it waits
+    GUNICORN_TIMEOUT    worker timeout in seconds (default 120)
+    GUNICORN_PRELOAD    build the app once in the master and fork workers
+                        from it (default true)
+    PROMETHEUS_MULTIPROC_DIR
+                        where workers share their metrics (default
+                        $TMPDIR/jobpal-metrics, emptied on startup)
+
+With preloading, a restarted worker is a fork of the master and does not
+import or configure the app again. Database pools inherited from the master
+are emptied in each worker (see ``services.pooling.dispose_after_fork``).
+"""
+
+import os
+import tempfile
+
+# Must exist before the app imports prometheus_client, which happens before
+# any server hook runs when the app is preloaded
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "jobpal-metrics")
+)
+os.makedirs(metrics_dir, exist_ok=True)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 7315)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+# More than one thread selects the gthread worker, so long-lived event
+# streams do not take a whole worker each
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+
+
+def on_starting(server):
+    """Remove values left behind by a previous run, which would be added to
+    the new ones
+
+    Runs once in the master, unlike this file, which is read again on every
+    reload. A preloaded app has already written the master's own files, so
+    those are kept.
+    """
+    own = f"_{os.getpid()}.db"
+    for entry in os.scandir(metrics_dir):
+        if entry.is_file() and not entry.name.endswith(own):
+            os.unlink(entry.path)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,12 +1,11 @@
 import logging
 from logging.config import fileConfig
 
+# Import models to ensure they are detected for migrations
+import models  # noqa
 from alembic import context
 from flask import current_app
 
-# Import models to ensure they are detected for migrations
-from backend.models.models import File, Job, User  # noqa
-
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -0,0 +1,95 @@
+"""initial schema
+
+Matches the tables previously created by ``db.create_all()``. Databases that
+were bootstrapped that way should be stamped with this revision
+(``flask db stamp 4b1d6c2e9a01``) before running ``flask db upgrade``.
+
+Revision ID: 4b1d6c2e9a01
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "4b1d6c2e9a01"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+application_status = sa.Enum(
+    "NOT_YET_APPLIED",
+    "APPLIED",
+    "REJECTED",
+    "TEST_TASK",
+    "SCREENING_CALL",
+    "INTERVIEW",
+    "OFFER",
+    name="applicationstatus",
+)
+job_source = sa.Enum(
+    "LINKEDIN",
+    "INDEED",
+    "COMPANY_WEBSITE",
+    "REFERRAL",
+    "OTHER",
+    name="jobsource",
+)
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=120), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("first_name", sa.String(length=100), nullable=True),
+        sa.Column("last_name", sa.String(length=100), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("company_name", sa.String(length=255), nullable=False),
+        sa.Column("role_title", sa.String(length=255), nullable=False),
+        sa.Column("vacancy_link", sa.Text(), nullable=True),
+        sa.Column("vacancy_text", sa.Text(), nullable=True),
+        sa.Column("application_status", application_status, nullable=False),
+        sa.Column("source", job_source, nullable=True),
+        sa.Column("date_applied", sa.DateTime(), nullable=True),
+        sa.Column("next_milestone_date", sa.DateTime(), nullable=True),
+        sa.Column("salary_min", sa.Integer(), nullable=True),
+        sa.Column("salary_max", sa.Integer(), nullable=True),
+        sa.Column("telegram_notification_sent", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "files",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("file_path", sa.String(length=512), nullable=False),
+        sa.Column("file_type", sa.String(length=50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("job_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("files")
+    op.drop_table("jobs")
+    op.drop_table("users")
+    application_status.drop(op.get_bind(), checkfirst=True)
+    job_source.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,33 @@
+"""add deleted_records tombstones for incremental backups
+
+Revision ID: 7c3e5a1f0b22
+Revises: 4b1d6c2e9a01
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7c3e5a1f0b22"
+down_revision = "4b1d6c2e9a01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "deleted_records",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_deleted_records_deleted_at", "deleted_records", ["deleted_at"])
+
+
+def downgrade():
+    op.drop_index("ix_deleted_records_deleted_at", table_name="deleted_records")
+    op.drop_table("deleted_records")
@@ -0,0 +1,42 @@
+"""add content-addressed blobs referenced by files
+
+Revision ID: 9a2f4d8b1c35
+Revises: 7c3e5a1f0b22
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9a2f4d8b1c35"
+down_revision = "7c3e5a1f0b22"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "blobs",
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.add_column(sa.Column("blob_digest", sa.String(length=64)))
+        batch_op.create_foreign_key(
+            "fk_files_blob_digest_blobs", "blobs", ["blob_digest"], ["digest"]
+        )
+        batch_op.create_index("ix_files_blob_digest", ["blob_digest"])
+
+
+def downgrade():
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.drop_index("ix_files_blob_digest")
+        batch_op.drop_constraint("fk_files_blob_digest_blobs", type_="foreignkey")
+        batch_op.drop_column("blob_digest")
+    op.drop_table("blobs")
@@ -0,0 +1,90 @@
+"""add job_status_events status history
+
+Revision ID: a3d9f1c7b246
+Revises: f2b8d4a6c139
+Create Date: 2026-10-19 13:10:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a3d9f1c7b246"
+down_revision = "f2b8d4a6c139"
+branch_labels = None
+depends_on = None
+
+# The type already exists; it was created with the jobs table
+application_status = postgresql.ENUM(name="applicationstatus", create_type=False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    status_type = (
+        application_status
+        if bind.dialect.name == "postgresql"
+        else sa.String(length=15)
+    )
+    op.create_table(
+        "job_status_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("from_status", status_type, nullable=True),
+        sa.Column("to_status", status_type, nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_job_status_events_job_id_occurred_at",
+        "job_status_events",
+        ["job_id", "occurred_at"],
+    )
+    op.create_index(
+        "ix_job_status_events_user_id_occurred_at",
+        "job_status_events",
+        ["user_id", "occurred_at"],
+    )
+
+    # Earlier transitions were never recorded. Seed each job's history with
+    # what is known: the application date, then the current status as of the
+    # last update.
+    def status(expression):
+        if bind.dialect.name == "postgresql":
+            return f"CAST({expression} AS applicationstatus)"
+        return expression
+
+    progressed = (
+        "date_applied IS NOT NULL"
+        " AND application_status NOT IN ('NOT_YET_APPLIED', 'APPLIED')"
+    )
+    op.execute(f"""
+        INSERT INTO job_status_events
+            (job_id, user_id, from_status, to_status, occurred_at)
+        SELECT id, user_id, NULL, {status("'APPLIED'")}, date_applied
+        FROM jobs
+        WHERE {progressed}
+        """)
+    op.execute(f"""
+        INSERT INTO job_status_events
+            (job_id, user_id, from_status, to_status, occurred_at)
+        SELECT id, user_id,
+               {status(f"CASE WHEN {progressed} THEN 'APPLIED' END")},
+               application_status,
+               COALESCE(updated_at, created_at, date_applied, CURRENT_TIMESTAMP)
+        FROM jobs
+        """)
+
+
+def downgrade():
+    op.drop_index(
+        "ix_job_status_events_user_id_occurred_at", table_name="job_status_events"
+    )
+    op.drop_index(
+        "ix_job_status_events_job_id_occurred_at", table_name="job_status_events"
+    )
+    op.drop_table("job_status_events")
@@ -0,0 +1,43 @@
+"""add file_texts with full-text index for extracted upload text
+
+Revision ID: b5e8c0d3f417
+Revises: 9a2f4d8b1c35
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b5e8c0d3f417"
+down_revision = "9a2f4d8b1c35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_texts",
+        sa.Column("blob_digest", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("error", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("extracted_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["blob_digest"], ["blobs.digest"]),
+        sa.PrimaryKeyConstraint("blob_digest"),
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            "ix_file_texts_content_fts",
+            "file_texts",
+            [sa.text("to_tsvector('english', content)")],
+            postgresql_using="gin",
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_file_texts_content_fts", table_name="file_texts")
+    op.drop_table("file_texts")
@@ -0,0 +1,56 @@
+"""add user_job_stats dashboard counters
+
+Revision ID: b7e1d3a5c902
+Revises: a3d9f1c7b246
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b7e1d3a5c902"
+down_revision = "a3d9f1c7b246"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_job_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("metric", sa.String(length=16), nullable=False),
+        sa.Column("bucket", sa.String(length=32), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "metric", "bucket"),
+    )
+
+    # Populate from existing jobs; afterwards Job events keep it current.
+    # Buckets hold enum values, which are the lower-cased stored names.
+    if op.get_bind().dialect.name == "postgresql":
+        week = "to_char(date_trunc('week', date_applied), 'YYYY-MM-DD')"
+    else:
+        week = "date(date_applied, 'weekday 0', '-6 days')"
+    op.execute(f"""
+        INSERT INTO user_job_stats (user_id, metric, bucket, count)
+        SELECT user_id, 'total', '', COUNT(*) FROM jobs GROUP BY user_id
+        UNION ALL
+        SELECT user_id, 'active', '', COUNT(*) FROM jobs
+        WHERE application_status NOT IN ('REJECTED', 'OFFER')
+        GROUP BY user_id
+        UNION ALL
+        SELECT user_id, 'status', LOWER(CAST(application_status AS TEXT)), COUNT(*)
+        FROM jobs GROUP BY user_id, application_status
+        UNION ALL
+        SELECT user_id, 'source', LOWER(CAST(source AS TEXT)), COUNT(*)
+        FROM jobs WHERE source IS NOT NULL GROUP BY user_id, source
+        UNION ALL
+        SELECT user_id, 'applied_week', {week}, COUNT(*)
+        FROM jobs WHERE date_applied IS NOT NULL GROUP BY user_id, {week}
+        """)
+
+
+def downgrade():
+    op.drop_table("user_job_stats")
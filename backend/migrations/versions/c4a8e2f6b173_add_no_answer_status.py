@@ -0,0 +1,42 @@
+"""add NO_ANSWER application status
+
+Revision ID: c4a8e2f6b173
+Revises: b7e1d3a5c902
+Create Date: 2026-10-19 15:20:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a8e2f6b173"
+down_revision = "b7e1d3a5c902"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite stores the enum as VARCHAR(15) without a CHECK constraint
+    if op.get_bind().dialect.name == "postgresql":
+        # ADD VALUE cannot run inside a transaction block before PostgreSQL 12
+        with op.get_context().autocommit_block():
+            op.execute(
+                "ALTER TYPE applicationstatus ADD VALUE IF NOT EXISTS 'NO_ANSWER'"
+            )
+
+
+def downgrade():
+    # PostgreSQL cannot drop an enum value; the type keeps it, unused. Swept
+    # jobs go back to APPLIED so the previous code can load them. Run
+    # scripts/job_stats.py --repair afterwards to recount their users.
+    op.execute(
+        "DELETE FROM job_status_events"
+        " WHERE to_status = 'NO_ANSWER' OR from_status = 'NO_ANSWER'"
+    )
+    op.execute(
+        "UPDATE jobs SET application_status = 'APPLIED'"
+        " WHERE application_status = 'NO_ANSWER'"
+    )
+    op.execute(
+        "DELETE FROM user_job_stats WHERE metric = 'status' AND bucket = 'no_answer'"
+    )
@@ -0,0 +1,59 @@
+"""add per-user storage accounting
+
+Revision ID: d4f2b6a8e913
+Revises: c1a7e3b9d582
+Create Date: 2026-10-19 09:50:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d4f2b6a8e913"
+down_revision = "c1a7e3b9d582"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "storage_bytes", sa.BigInteger(), nullable=False, server_default="0"
+            )
+        )
+    op.create_table(
+        "user_blobs",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("blob_digest", sa.String(length=64), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["blob_digest"], ["blobs.digest"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "blob_digest"),
+    )
+    # Populate from existing files; afterwards File events keep it current
+    op.execute(
+        """
+        INSERT INTO user_blobs (user_id, blob_digest, ref_count)
+        SELECT jobs.user_id, files.blob_digest, COUNT(files.id)
+        FROM files JOIN jobs ON jobs.id = files.job_id
+        WHERE files.blob_digest IS NOT NULL
+        GROUP BY jobs.user_id, files.blob_digest
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET storage_bytes = (
+            SELECT COALESCE(SUM(blobs.size), 0)
+            FROM user_blobs JOIN blobs ON blobs.digest = user_blobs.blob_digest
+            WHERE user_blobs.user_id = users.id
+        )
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("user_blobs")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("storage_bytes")
@@ -0,0 +1,37 @@
+"""add job_changes log for live job events
+
+Revision ID: d9b3f5a7c214
+Revises: c4a8e2f6b173
+Create Date: 2026-10-19 16:40:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d9b3f5a7c214"
+down_revision = "c4a8e2f6b173"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job_changes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=10), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_job_changes_user_id_id", "job_changes", ["user_id", "id"])
+    op.create_index("ix_job_changes_occurred_at", "job_changes", ["occurred_at"])
+
+
+def downgrade():
+    op.drop_index("ix_job_changes_occurred_at", table_name="job_changes")
+    op.drop_index("ix_job_changes_user_id_id", table_name="job_changes")
+    op.drop_table("job_changes")
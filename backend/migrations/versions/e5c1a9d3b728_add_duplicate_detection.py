@@ -0,0 +1,131 @@
+"""add normalized vacancy link hash and trigram indexes for duplicate detection
+
+Revision ID: e5c1a9d3b728
+Revises: d9b3f5a7c214
+Create Date: 2026-10-19 19:10:00.000000
+
+"""
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5c1a9d3b728"
+down_revision = "d9b3f5a7c214"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of models.TRACKING_PARAMETERS and normalize_vacancy_link
+TRACKING_PARAMETERS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "igshid",
+        "lipi",
+        "mc_cid",
+        "mc_eid",
+        "msclkid",
+        "ref",
+        "ref_src",
+        "refid",
+        "src",
+        "trackingid",
+        "trk",
+        "trkinfo",
+        "_hsenc",
+        "_hsmi",
+    }
+)
+
+jobs = sa.table(
+    "jobs",
+    sa.column("id", sa.Integer),
+    sa.column("vacancy_link", sa.Text),
+    sa.column("vacancy_link_hash", sa.String),
+)
+
+
+def link_hash(link):
+    link = (link or "").strip()
+    if not link:
+        return None
+    parts = urlsplit(link if "://" in link else f"//{link}")
+    host = (parts.hostname or "").removeprefix("www.")
+    try:
+        if parts.port:
+            host = f"{host}:{parts.port}"
+    except ValueError:
+        pass
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_")
+        and name.lower() not in TRACKING_PARAMETERS
+    )
+    normalized = host + parts.path.rstrip("/")
+    if query:
+        normalized += "?" + urlencode(query)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("vacancy_link_hash", sa.String(length=64)))
+
+    # Hash existing links in keyset-paginated batches
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(jobs.c.id, jobs.c.vacancy_link)
+            .where(jobs.c.id > last_id, jobs.c.vacancy_link.isnot(None))
+            .order_by(jobs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        conn.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam("_id")),
+            [
+                {"_id": job_id, "vacancy_link_hash": link_hash(link)}
+                for job_id, link in rows
+            ],
+        )
+
+    # Build without locking out writes on PostgreSQL; CONCURRENTLY cannot run
+    # inside a transaction, so the backfill above is committed first.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_user_id_vacancy_link_hash",
+            "jobs",
+            ["user_id", "vacancy_link_hash"],
+            postgresql_where=sa.text("vacancy_link_hash IS NOT NULL"),
+            sqlite_where=sa.text("vacancy_link_hash IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+        if conn.dialect.name == "postgresql":
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for column in ("company_name", "role_title"):
+                op.create_index(
+                    f"ix_jobs_{column}_trgm",
+                    "jobs",
+                    [column],
+                    postgresql_using="gin",
+                    postgresql_ops={column: "gin_trgm_ops"},
+                    postgresql_concurrently=True,
+                )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_jobs_role_title_trgm", table_name="jobs")
+        op.drop_index("ix_jobs_company_name_trgm", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_vacancy_link_hash", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("vacancy_link_hash")
@@ -0,0 +1,141 @@
+"""move vacancy text to a compressed side table
+
+Revision ID: e7a3c5d1f824
+Revises: d4f2b6a8e913
+Create Date: 2026-10-19 11:20:00.000000
+
+"""
+
+import hashlib
+import zlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e7a3c5d1f824"
+down_revision = "d4f2b6a8e913"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+EXCERPT_LENGTH = 200
+
+jobs = sa.table(
+    "jobs",
+    sa.column("id", sa.Integer),
+    sa.column("vacancy_text", sa.Text),
+    sa.column("vacancy_digest", sa.String),
+    sa.column("vacancy_excerpt", sa.String),
+)
+vacancy_texts = sa.table(
+    "vacancy_texts",
+    sa.column("digest", sa.String),
+    sa.column("body", sa.LargeBinary),
+    sa.column("size", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def upgrade():
+    op.create_table(
+        "vacancy_texts",
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("digest"),
+    )
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("vacancy_digest", sa.String(length=64)))
+        batch_op.add_column(
+            sa.Column("vacancy_excerpt", sa.String(length=EXCERPT_LENGTH))
+        )
+        batch_op.create_foreign_key(
+            "fk_jobs_vacancy_digest",
+            "vacancy_texts",
+            ["vacancy_digest"],
+            ["digest"],
+        )
+        batch_op.create_index("ix_jobs_vacancy_digest", ["vacancy_digest"])
+
+    # Compress existing texts in keyset-paginated batches
+    conn = op.get_bind()
+    seen = set()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(jobs.c.id, jobs.c.vacancy_text)
+            .where(jobs.c.id > last_id, jobs.c.vacancy_text.isnot(None))
+            .where(jobs.c.vacancy_text != "")
+            .order_by(jobs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        new_texts, updates = [], []
+        for job_id, text in rows:
+            raw = text.encode("utf-8")
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest not in seen:
+                seen.add(digest)
+                new_texts.append(
+                    {
+                        "digest": digest,
+                        "body": zlib.compress(raw, 6),
+                        "size": len(raw),
+                        "created_at": datetime.utcnow(),
+                    }
+                )
+            updates.append(
+                {
+                    "_id": job_id,
+                    "vacancy_digest": digest,
+                    "vacancy_excerpt": text[:EXCERPT_LENGTH],
+                }
+            )
+        if new_texts:
+            conn.execute(vacancy_texts.insert(), new_texts)
+        conn.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam("_id")),
+            updates,
+        )
+
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("vacancy_text")
+
+
+def downgrade():
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.add_column(sa.Column("vacancy_text", sa.Text()))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(jobs.c.id, vacancy_texts.c.body)
+            .join(vacancy_texts, vacancy_texts.c.digest == jobs.c.vacancy_digest)
+            .where(jobs.c.id > last_id)
+            .order_by(jobs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        conn.execute(
+            jobs.update().where(jobs.c.id == sa.bindparam("_id")),
+            [
+                {"_id": job_id, "vacancy_text": zlib.decompress(body).decode("utf-8")}
+                for job_id, body in rows
+            ],
+        )
+
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_index("ix_jobs_vacancy_digest")
+        batch_op.drop_constraint("fk_jobs_vacancy_digest", type_="foreignkey")
+        batch_op.drop_column("vacancy_excerpt")
+        batch_op.drop_column("vacancy_digest")
+    op.drop_table("vacancy_texts")
@@ -0,0 +1,52 @@
+"""add composite indexes for per-user job queries
+
+Revision ID: f2b8d4a6c139
+Revises: e7a3c5d1f824
+Create Date: 2026-10-19 12:40:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f2b8d4a6c139"
+down_revision = "e7a3c5d1f824"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Build without locking out writes on PostgreSQL; CONCURRENTLY cannot run
+    # inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_jobs_user_id_updated_at",
+            "jobs",
+            ["user_id", "updated_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_jobs_user_id_application_status",
+            "jobs",
+            ["user_id", "application_status"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_jobs_user_id_next_milestone_date",
+            "jobs",
+            ["user_id", "next_milestone_date"],
+            postgresql_where=sa.text("next_milestone_date IS NOT NULL"),
+            sqlite_where=sa.text("next_milestone_date IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_files_job_id", "files", ["job_id"], postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    op.drop_index("ix_files_job_id", table_name="files")
+    op.drop_index("ix_jobs_user_id_next_milestone_date", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_application_status", table_name="jobs")
+    op.drop_index("ix_jobs_user_id_updated_at", table_name="jobs")
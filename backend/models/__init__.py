@@ -1,4 +1,32 @@
 from .enums import ApplicationStatus, JobSource
-from .models import File, Job, User
+from .models import (
+    Blob,
+    DeletedRecord,
+    File,
+    FileText,
+    Job,
+    JobChange,
+    JobStatusEvent,
+    UploadSession,
+    User,
+    UserBlob,
+    UserJobStat,
+    VacancyText,
+)
 
-__all__ = ["ApplicationStatus", "JobSource", "User", "Job", "File"]
+__all__ = [
+    "ApplicationStatus",
+    "JobSource",
+    "User",
+    "Job",
+    "File",
+    "Blob",
+    "FileText",
+    "UploadSession",
+    "UserBlob",
+    "VacancyText",
+    "DeletedRecord",
+    "JobStatusEvent",
+    "UserJobStat",
+    "JobChange",
+]
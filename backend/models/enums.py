@@ -11,6 +11,8 @@ class ApplicationStatus(str, Enum):
     SCREENING_CALL = "screening_call"
     INTERVIEW = "interview"
     OFFER = "offer"
+    # Set by the stale-application sweeper (services/stale_jobs.py)
+    NO_ANSWER = "no_answer"
 
 
 class JobSource(str, Enum):
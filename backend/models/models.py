@@ -1,21 +1,41 @@
 import enum
-from datetime import datetime
+import hashlib
+import zlib
+from datetime import datetime, timedelta
 from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
 from extensions import db
 from sqlalchemy import (
+    DDL,
+    BigInteger,
     Boolean,
     Column,
     Date,
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     Text,
+    event,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import (
+    Session,
+    attributes,
+    column_property,
+    deferred,
+    object_session,
+    relationship,
 )
-from sqlalchemy.orm import relationship
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from .enums import ApplicationStatus, JobSource
@@ -32,6 +52,8 @@ class User(db.Model):
     first_name = Column(String(100))
     last_name = Column(String(100))
     is_active = Column(Boolean, default=True)
+    # Bytes of distinct uploaded content, maintained by File insert/delete events
+    storage_bytes = Column(BigInteger, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -57,6 +79,65 @@ class User(db.Model):
             return False
         return check_password_hash(self.password_hash, password)
 
+    def has_storage_for(self, digest: str, size: int, quota: int) -> bool:
+        """Check if storing a blob keeps the user within ``quota`` bytes
+
+        Content the user already stores does not count again. A quota of 0
+        means unlimited.
+        """
+        if not quota:
+            return True
+        if db.session.get(UserBlob, (self.id, digest)) is not None:
+            return True
+        return (self.storage_bytes or 0) + size <= quota
+
+
+class Blob(db.Model):
+    """Content-addressed file contents shared by one or more File rows"""
+
+    __tablename__ = "blobs"
+
+    digest = Column(String(64), primary_key=True)  # sha256 hex digest
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def ensure(cls, digest: str, size: int) -> None:
+        """Insert the blob row unless it already exists.
+
+        Uses ``ON CONFLICT DO NOTHING`` so concurrent uploads of the same
+        content cannot fail on the primary key.
+        """
+        now = datetime.utcnow()
+        db.session.execute(
+            _insert_ignore(cls.__table__)
+            .values(
+                digest=digest, size=size, ref_count=0, created_at=now, updated_at=now
+            )
+            .on_conflict_do_nothing(index_elements=["digest"])
+        )
+
+
+def _insert_ignore(table, connection=None):
+    """Return an INSERT for ``table`` that can use ``on_conflict_do_nothing``"""
+    bind = connection if connection is not None else db.session.get_bind()
+    insert = pg_insert if bind.dialect.name == "postgresql" else sqlite_insert
+    return insert(table)
+
+
+class UserBlob(db.Model):
+    """Per-user reference count of a blob, used for storage accounting"""
+
+    __tablename__ = "user_blobs"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    blob_digest = Column(String(64), ForeignKey("blobs.digest"), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+
 
 class File(db.Model):
     """File model for storing resume and cover letter files"""
@@ -67,12 +148,89 @@ class File(db.Model):
     filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False)
     file_type = Column(String(50), nullable=False)  # 'resume' or 'cover_letter'
+    blob_digest = Column(String(64), ForeignKey("blobs.digest"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    job_id = Column(Integer, ForeignKey("jobs.id"))
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
     job = relationship("Job", back_populates="files")
+    blob = relationship("Blob")
+
+
+EXCERPT_LENGTH = 200
+
+
+class VacancyText(db.Model):
+    """Compressed vacancy body, stored once per distinct text"""
+
+    __tablename__ = "vacancy_texts"
+
+    digest = Column(String(64), primary_key=True)  # sha256 of the UTF-8 text
+    body = deferred(Column(LargeBinary, nullable=False))  # zlib-compressed
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.body).decode("utf-8")
+
+    @staticmethod
+    def digest_for(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Query parameters that only say where a link was clicked. Parameters
+# starting with utm_ are dropped as well.
+TRACKING_PARAMETERS = frozenset(
+    {
+        "fbclid",
+        "gclid",
+        "igshid",
+        "lipi",
+        "mc_cid",
+        "mc_eid",
+        "msclkid",
+        "ref",
+        "ref_src",
+        "refid",
+        "src",
+        "trackingid",
+        "trk",
+        "trkinfo",
+        "_hsenc",
+        "_hsmi",
+    }
+)
+
+
+def normalize_vacancy_link(link: Optional[str]) -> Optional[str]:
+    """The vacancy link without what varies between copies of the same link
+
+    Drops the scheme, a leading ``www.``, the fragment, a trailing slash and
+    tracking parameters, lowercases the host and sorts the remaining query
+    parameters.
+    """
+    link = (link or "").strip()
+    if not link:
+        return None
+    parts = urlsplit(link if "://" in link else f"//{link}")
+    host = (parts.hostname or "").removeprefix("www.")
+    try:
+        if parts.port:
+            host = f"{host}:{parts.port}"
+    except ValueError:
+        pass
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_")
+        and name.lower() not in TRACKING_PARAMETERS
+    )
+    normalized = host + parts.path.rstrip("/")
+    if query:
+        normalized += "?" + urlencode(query)
+    return normalized
 
 
 class Job(db.Model):
@@ -85,14 +243,28 @@ class Job(db.Model):
     company_name = Column(String(255), nullable=False)
     role_title = Column(String(255), nullable=False)
     vacancy_link = Column(Text)
-    vacancy_text = Column(Text)
-    application_status = Column(
-        Enum(ApplicationStatus),
-        default=ApplicationStatus.NOT_YET_APPLIED,
-        nullable=False,
-    )
-    source = Column(Enum(JobSource), default=JobSource.OTHER)
-    date_applied = Column(DateTime)
+    # sha256 of normalize_vacancy_link(vacancy_link), computed when the job is
+    # flushed so duplicate links are found with an index lookup
+    vacancy_link_hash = Column(String(64))
+    # The full vacancy body lives in vacancy_texts; only a short excerpt is
+    # kept inline so list queries stay narrow.
+    vacancy_digest = Column(String(64), ForeignKey("vacancy_texts.digest"), index=True)
+    vacancy_excerpt = Column(String(EXCERPT_LENGTH))
+    # Active history: changing one of these on an expired job loads the old
+    # value first, so the status history and the counters (JOB_STAT_COLUMNS)
+    # can tell what it changed from
+    application_status = column_property(
+        Column(
+            Enum(ApplicationStatus),
+            default=ApplicationStatus.NOT_YET_APPLIED,
+            nullable=False,
+        ),
+        active_history=True,
+    )
+    source = column_property(
+        Column(Enum(JobSource), default=JobSource.OTHER), active_history=True
+    )
+    date_applied = column_property(Column(DateTime), active_history=True)
     next_milestone_date = Column(DateTime)
     salary_min = Column(Integer)
     salary_max = Column(Integer)
@@ -100,6 +272,567 @@ class Job(db.Model):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Every query is scoped to one user, so user_id leads each index
+    __table_args__ = (
+        Index("ix_jobs_user_id_updated_at", user_id, updated_at),
+        Index("ix_jobs_user_id_application_status", user_id, application_status),
+        Index(
+            "ix_jobs_user_id_next_milestone_date",
+            user_id,
+            next_milestone_date,
+            postgresql_where=next_milestone_date.isnot(None),
+            sqlite_where=next_milestone_date.isnot(None),
+        ),
+        Index(
+            "ix_jobs_user_id_vacancy_link_hash",
+            user_id,
+            vacancy_link_hash,
+            postgresql_where=vacancy_link_hash.isnot(None),
+            sqlite_where=vacancy_link_hash.isnot(None),
+        ),
+        # Trigram indexes for the similarity (%) operator of pg_trgm, used by
+        # duplicate detection (services/duplicates.py)
+        Index(
+            "ix_jobs_company_name_trgm",
+            company_name,
+            postgresql_using="gin",
+            postgresql_ops={"company_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_jobs_role_title_trgm",
+            role_title,
+            postgresql_using="gin",
+            postgresql_ops={"role_title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relationships
     user = relationship("User", back_populates="jobs")
     files = relationship("File", back_populates="job", cascade="all, delete-orphan")
+    vacancy = relationship("VacancyText")
+
+    @property
+    def vacancy_text(self) -> Optional[str]:
+        """Full vacancy text, loaded from vacancy_texts on first access"""
+        if "_pending_vacancy_text" in self.__dict__:
+            return self._pending_vacancy_text
+        if self.vacancy_digest is None:
+            return None
+        return self.vacancy.text
+
+    @vacancy_text.setter
+    def vacancy_text(self, text: Optional[str]) -> None:
+        # The vacancy_texts row is written when the job is flushed
+        self._pending_vacancy_text = text or None
+        if not text:
+            self.vacancy_digest = None
+            self.vacancy_excerpt = None
+            return
+        self.vacancy_digest = VacancyText.digest_for(text)
+        self.vacancy_excerpt = text[:EXCERPT_LENGTH]
+
+    @staticmethod
+    def link_hash_for(link: Optional[str]) -> Optional[str]:
+        normalized = normalize_vacancy_link(link)
+        if normalized is None:
+            return None
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+event.listen(
+    Job.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class FileText(db.Model):
+    """Plain text extracted from an uploaded blob, used for search
+
+    Kept out of ``files`` so list queries never read the text.
+    """
+
+    __tablename__ = "file_texts"
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+    UNSUPPORTED = "unsupported"
+
+    blob_digest = Column(String(64), ForeignKey("blobs.digest"), primary_key=True)
+    status = Column(String(20), nullable=False, default=PENDING)
+    content = Column(Text)
+    error = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    extracted_at = Column(DateTime)
+
+    __table_args__ = (
+        Index(
+            "ix_file_texts_content_fts",
+            func.to_tsvector(literal_column("'english'"), content),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    @classmethod
+    def claim(cls, digest: str) -> bool:
+        """Insert a pending row for ``digest``.
+
+        Returns:
+            bool: True if this caller created the row and should extract
+        """
+        result = db.session.execute(
+            _insert_ignore(cls.__table__)
+            .values(
+                blob_digest=digest, status=cls.PENDING, created_at=datetime.utcnow()
+            )
+            .on_conflict_do_nothing(index_elements=["blob_digest"])
+        )
+        return result.rowcount == 1
+
+
+class UploadSession(db.Model):
+    """Resumable upload whose chunks are still being received"""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String(255), nullable=False)
+    file_type = Column(String(50), nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    received = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
+    )
+
+
+class DeletedRecord(db.Model):
+    """Tombstone recording a deleted row, used by incremental backups"""
+
+    __tablename__ = "deleted_records"
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class JobStatusEvent(db.Model):
+    """Append-only record of a job entering a status
+
+    Written in the same transaction as the status change by the Job mapper
+    events below, so the history cannot drift from ``jobs``. Rows are never
+    updated; they are only removed together with their job.
+    """
+
+    __tablename__ = "job_status_events"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    # Denormalized so per-user analytics never join jobs
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    from_status = Column(Enum(ApplicationStatus))
+    to_status = Column(Enum(ApplicationStatus), nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_job_status_events_job_id_occurred_at", job_id, occurred_at),
+        Index("ix_job_status_events_user_id_occurred_at", user_id, occurred_at),
+    )
+
+
+class UserJobStat(db.Model):
+    """One of a user's dashboard counters, kept current by the Job events
+
+    ``metric`` is ``total``, ``active``, ``status``, ``source`` or
+    ``applied_week``; ``bucket`` is the status or source value, or the Monday
+    of the week applied as an ISO date. A user's whole summary is the rows
+    under their ``user_id``, one primary-key range scan however many jobs
+    they track.
+    """
+
+    __tablename__ = "user_job_stats"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    metric = Column(String(16), primary_key=True)
+    bucket = Column(String(32), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+
+# Statuses after which an application needs no more follow-up
+CLOSED_STATUSES = frozenset(
+    {ApplicationStatus.REJECTED, ApplicationStatus.OFFER, ApplicationStatus.NO_ANSWER}
+)
+
+
+def job_stat_keys(status, source, date_applied):
+    """The ``(metric, bucket)`` counters a job with these values counts in"""
+    keys = [("total", ""), ("status", status.value)]
+    if status not in CLOSED_STATUSES:
+        keys.append(("active", ""))
+    if source is not None:
+        keys.append(("source", source.value))
+    if date_applied is not None:
+        week = date_applied.date() - timedelta(days=date_applied.weekday())
+        keys.append(("applied_week", week.isoformat()))
+    return keys
+
+
+# NOTIFY channel carrying the ids of users whose jobs changed
+JOB_CHANGES_CHANNEL = "job_changes"
+
+
+class JobChange(db.Model):
+    """A job was created, updated or deleted; read by the live event stream
+
+    The ids order the changes and double as SSE event ids, so a client that
+    reconnects with ``Last-Event-ID`` gets exactly what it missed. Rows are
+    pruned after a retention period (see services/job_events.py).
+    """
+
+    __tablename__ = "job_changes"
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    # No foreign key: deletions outlive their job
+    job_id = Column(Integer, nullable=False)
+    action = Column(String(10), nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (Index("ix_job_changes_user_id_id", user_id, id),)
+
+
+def record_job_changes(session, changes):
+    """Write ``(user_id, job_id, action)`` changes and wake their streams
+
+    On PostgreSQL a NOTIFY per user is sent in the same transaction, so it is
+    delivered on commit and dropped on rollback. Elsewhere the users are kept
+    in ``session.info`` for the local stand-in to publish after the commit.
+    """
+    if not changes:
+        return
+    occurred_at = datetime.utcnow()
+    session.execute(
+        JobChange.__table__.insert(),
+        [
+            {
+                "user_id": user_id,
+                "job_id": job_id,
+                "action": action,
+                "occurred_at": occurred_at,
+            }
+            for user_id, job_id, action in changes
+        ],
+    )
+    user_ids = {user_id for user_id, _, _ in changes}
+    if session.get_bind().dialect.name == "postgresql":
+        for user_id in sorted(user_ids):
+            session.execute(select(func.pg_notify(JOB_CHANGES_CHANNEL, str(user_id))))
+    else:
+        session.info.setdefault("changed_users", set()).update(user_ids)
+
+
+def _record_deletion(mapper, connection, target):
+    """Remember the deleted row; ``_write_tombstones`` records it"""
+    session = object_session(target)
+    session.info.setdefault("tombstones", []).append(
+        {"table_name": mapper.local_table.name, "row_id": target.id}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _write_tombstones(session, flush_context):
+    """Write the flush's tombstones in one statement, in the same transaction
+
+    Deleting a job cascades to its files, so one row per statement would turn
+    a single delete into an N+1.
+    """
+    tombstones = session.info.pop("tombstones", None)
+    if tombstones:
+        deleted_at = datetime.utcnow()
+        session.execute(
+            DeletedRecord.__table__.insert(),
+            [{**row, "deleted_at": deleted_at} for row in tombstones],
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _write_job_changes(session, flush_context):
+    """Record the flush's job changes in one statement, like the tombstones"""
+    changes = session.info.pop("job_changes", None)
+    if not changes:
+        return
+    # A deleted user takes their change log with them
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    record_job_changes(
+        session,
+        [change for change in changes if change[0] not in deleted_users],
+    )
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tombstones(session, previous_transaction):
+    session.info.pop("tombstones", None)
+    session.info.pop("job_changes", None)
+    session.info.pop("changed_users", None)
+
+
+def _queue_job_change(target, action):
+    object_session(target).info.setdefault("job_changes", []).append(
+        (target.user_id, target.id, action)
+    )
+
+
+@event.listens_for(Job, "after_insert")
+def _job_created(mapper, connection, target):
+    _queue_job_change(target, JobChange.CREATED)
+
+
+@event.listens_for(Job, "after_update")
+def _job_updated(mapper, connection, target):
+    # Also called for jobs that were only marked dirty
+    if object_session(target).is_modified(target, include_collections=False):
+        _queue_job_change(target, JobChange.UPDATED)
+
+
+@event.listens_for(Job, "after_delete")
+def _job_deleted(mapper, connection, target):
+    _queue_job_change(target, JobChange.DELETED)
+
+
+for _model in (User, Job, File):
+    event.listen(_model, "after_delete", _record_deletion)
+
+
+def _adjust_blob_refs(connection, digest, delta):
+    if digest is None:
+        return
+    blobs = Blob.__table__
+    connection.execute(
+        blobs.update()
+        .where(blobs.c.digest == digest)
+        .values(ref_count=blobs.c.ref_count + delta, updated_at=datetime.utcnow())
+    )
+
+
+def _adjust_user_storage(connection, job_id, digest, delta):
+    """Track which blobs a user references and keep ``storage_bytes`` current
+
+    A user's total only changes when they gain their first or drop their last
+    reference to a given blob, so linking one resume to many jobs is free.
+    """
+    if job_id is None or digest is None:
+        return
+    jobs, users, user_blobs = Job.__table__, User.__table__, UserBlob.__table__
+    user_id = connection.scalar(select(jobs.c.user_id).where(jobs.c.id == job_id))
+    if user_id is None:
+        return
+
+    key = (user_blobs.c.user_id == user_id) & (user_blobs.c.blob_digest == digest)
+    if delta > 0:
+        created = connection.execute(
+            _insert_ignore(user_blobs, connection)
+            .values(user_id=user_id, blob_digest=digest, ref_count=1)
+            .on_conflict_do_nothing(index_elements=["user_id", "blob_digest"])
+        ).rowcount
+        if not created:
+            connection.execute(
+                user_blobs.update()
+                .where(key)
+                .values(ref_count=user_blobs.c.ref_count + 1)
+            )
+            return
+    else:
+        connection.execute(
+            user_blobs.update().where(key).values(ref_count=user_blobs.c.ref_count - 1)
+        )
+        removed = connection.execute(
+            user_blobs.delete().where(key & (user_blobs.c.ref_count <= 0))
+        ).rowcount
+        if not removed:
+            return
+
+    size = connection.scalar(
+        select(Blob.__table__.c.size).where(Blob.__table__.c.digest == digest)
+    )
+    connection.execute(
+        users.update()
+        .where(users.c.id == user_id)
+        .values(storage_bytes=users.c.storage_bytes + delta * (size or 0))
+    )
+
+
+@event.listens_for(Job, "before_insert")
+@event.listens_for(Job, "before_update")
+def _store_vacancy_text(mapper, connection, target):
+    """Insert the compressed vacancy text unless an identical one exists"""
+    text = target.__dict__.get("_pending_vacancy_text")
+    if text is None:
+        return
+    raw = text.encode("utf-8")
+    connection.execute(
+        _insert_ignore(VacancyText.__table__, connection)
+        .values(
+            digest=target.vacancy_digest,
+            body=zlib.compress(raw, 6),
+            size=len(raw),
+            created_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["digest"])
+    )
+
+
+@event.listens_for(Job, "before_insert")
+@event.listens_for(Job, "before_update")
+def _hash_vacancy_link(mapper, connection, target):
+    # Only when the link changed; most updates do not touch it
+    if attributes.get_history(target, "vacancy_link").has_changes():
+        target.vacancy_link_hash = Job.link_hash_for(target.vacancy_link)
+
+
+@event.listens_for(Job, "after_insert")
+@event.listens_for(Job, "after_update")
+def _forget_vacancy_text(mapper, connection, target):
+    """The text is stored; later reads and flushes go to vacancy_texts
+
+    A ``vacancy`` loaded before the text changed points at the old row, so it
+    is unloaded too and read again on next access.
+    """
+    if target.__dict__.pop("_pending_vacancy_text", False) is not False:
+        target.__dict__.pop("vacancy", None)
+
+
+def _record_status(connection, target, from_status):
+    connection.execute(
+        JobStatusEvent.__table__.insert().values(
+            job_id=target.id,
+            user_id=target.user_id,
+            from_status=from_status,
+            to_status=target.application_status,
+            occurred_at=datetime.utcnow(),
+        )
+    )
+
+
+@event.listens_for(Job, "after_insert")
+def _record_initial_status(mapper, connection, target):
+    _record_status(connection, target, None)
+
+
+@event.listens_for(Job, "after_update")
+def _record_status_change(mapper, connection, target):
+    history = attributes.get_history(target, "application_status")
+    previous = history.deleted[0] if history.deleted else None
+    if history.added and history.added[0] != previous:
+        _record_status(connection, target, previous)
+
+
+@event.listens_for(Job, "before_delete")
+def _delete_status_events(mapper, connection, target):
+    # SQLite does not enforce ON DELETE CASCADE unless foreign keys are on
+    events = JobStatusEvent.__table__
+    connection.execute(events.delete().where(events.c.job_id == target.id))
+
+
+JOB_STAT_COLUMNS = ("application_status", "source", "date_applied")
+
+
+def _committed_value(target, name):
+    """The attribute's value before this flush's changes"""
+    history = attributes.get_history(target, name)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, name)
+
+
+def adjust_job_stats(connection, deltas):
+    """Apply counter changes in a single upsert
+
+    ``deltas`` maps ``(user_id, metric, bucket)`` to the change. Keys are
+    sorted so concurrent transactions lock the rows in the same order, and
+    keys whose changes cancel out are skipped, so an edit that does not touch
+    a counted column writes nothing.
+    """
+    rows = [
+        {"user_id": user_id, "metric": metric, "bucket": bucket, "count": delta}
+        for (user_id, metric, bucket), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stats = UserJobStat.__table__
+    insert = _insert_ignore(stats, connection).values(rows)
+    connection.execute(
+        insert.on_conflict_do_update(
+            index_elements=["user_id", "metric", "bucket"],
+            set_={"count": stats.c.count + insert.excluded["count"]},
+        )
+    )
+
+
+@event.listens_for(Job, "after_insert")
+def _count_new_job(mapper, connection, target):
+    keys = job_stat_keys(*(getattr(target, name) for name in JOB_STAT_COLUMNS))
+    adjust_job_stats(connection, {(target.user_id, *key): 1 for key in keys})
+
+
+@event.listens_for(Job, "after_update")
+def _recount_job(mapper, connection, target):
+    if not any(
+        attributes.get_history(target, name).has_changes() for name in JOB_STAT_COLUMNS
+    ):
+        return
+    deltas = {}
+    old = job_stat_keys(*(_committed_value(target, n) for n in JOB_STAT_COLUMNS))
+    new = job_stat_keys(*(getattr(target, name) for name in JOB_STAT_COLUMNS))
+    for key in old:
+        key = (target.user_id, *key)
+        deltas[key] = deltas.get(key, 0) - 1
+    for key in new:
+        key = (target.user_id, *key)
+        deltas[key] = deltas.get(key, 0) + 1
+    adjust_job_stats(connection, deltas)
+
+
+@event.listens_for(Job, "after_delete")
+def _uncount_job(mapper, connection, target):
+    keys = job_stat_keys(*(_committed_value(target, n) for n in JOB_STAT_COLUMNS))
+    adjust_job_stats(connection, {(target.user_id, *key): -1 for key in keys})
+
+
+@event.listens_for(File, "after_insert")
+def _acquire_blob(mapper, connection, target):
+    _adjust_blob_refs(connection, target.blob_digest, 1)
+    _adjust_user_storage(connection, target.job_id, target.blob_digest, 1)
+
+
+@event.listens_for(File, "after_update")
+def _move_blob(mapper, connection, target):
+    history = attributes.get_history(target, "job_id")
+    if history.has_changes():
+        for old_job_id in history.deleted:
+            _adjust_user_storage(connection, old_job_id, target.blob_digest, -1)
+        _adjust_user_storage(connection, target.job_id, target.blob_digest, 1)
+
+
+@event.listens_for(File, "after_delete")
+def _release_blob(mapper, connection, target):
+    # Unreferenced blobs are left on disk; reclaiming them is a separate sweep
+    # so a concurrent upload of the same content can still link to them.
+    _adjust_blob_refs(connection, target.blob_digest, -1)
+    _adjust_user_storage(connection, target.job_id, target.blob_digest, -1)
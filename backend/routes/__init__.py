@@ -1,4 +1,6 @@
 from .auth import bp as auth_bp
+from .dashboard import bp as dashboard_bp
 from .jobs import bp as jobs_bp
+from .uploads import bp as uploads_bp
 
-__all__ = ["auth_bp", "jobs_bp"]
+__all__ = ["auth_bp", "dashboard_bp", "jobs_bp", "uploads_bp"]
@@ -2,14 +2,12 @@ import logging
 from datetime import timedelta
 
 from extensions import db
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
 from models import User
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.security import check_password_hash, generate_password_hash
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 bp = Blueprint("auth", __name__, url_prefix="/api/auth")
@@ -19,9 +17,8 @@ bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 def register():
     """Register a new user."""
     try:
-        logger.debug("Starting registration process")
         data = request.get_json()
-        logger.debug(f"Received registration data: {data}")
+        logger.debug("Registration attempt", extra={"email": (data or {}).get("email")})
 
         if not data or not data.get("email") or not data.get("password"):
             logger.warning("Missing email or password in registration request")
@@ -29,10 +26,9 @@ def register():
 
         existing_user = User.query.filter_by(email=data["email"]).first()
         if existing_user:
-            logger.warning(f"Email {data['email']} already registered")
+            logger.warning("Email already registered", extra={"email": data["email"]})
             return jsonify({"error": "Email already registered"}), 400
 
-        logger.debug("Creating new user object")
         user = User(
             email=data["email"],
             first_name=data.get("first_name"),
@@ -42,22 +38,19 @@ def register():
         user.set_password(data["password"])
 
         try:
-            logger.debug("Attempting to add user to database")
             db.session.add(user)
             db.session.commit()
-            logger.debug("User successfully added to database")
+            logger.debug("User registered", extra={"user_id": user.id})
         except SQLAlchemyError as e:
-            logger.error(f"Database error during registration: {str(e)}")
+            logger.error("Database error during registration: %s", e)
             db.session.rollback()
             return jsonify({"error": "Database error occurred"}), 500
 
-        logger.debug("Creating access token")
         access_token = create_access_token(identity=str(user.id))
-        logger.debug("Registration successful")
         return jsonify({"access_token": access_token}), 201
 
     except Exception as e:
-        logger.error(f"Unexpected error during registration: {str(e)}")
+        logger.exception("Unexpected error during registration")
         return jsonify({"error": str(e)}), 500
 
 
@@ -66,29 +59,23 @@ def login():
     """Login a user."""
     try:
         data = request.get_json()
-        logger.debug(f"Login attempt with email: {data.get('email')}")
-        logger.debug(f"Request headers: {dict(request.headers)}")
+        logger.debug("Login attempt", extra={"email": (data or {}).get("email")})
 
         if not data or not data.get("email") or not data.get("password"):
             logger.warning("Missing email or password in login request")
             return jsonify({"error": "Missing email or password"}), 400
 
         user = User.query.filter_by(email=data["email"]).first()
-        logger.debug(f"Found user: {user is not None}")
-
         if not user:
-            logger.warning(f"No user found with email: {data.get('email')}")
+            logger.warning("Login for unknown email", extra={"email": data["email"]})
             return jsonify({"error": "Invalid email or password"}), 401
 
-        password_valid = user.check_password(data["password"])
-        logger.debug(f"Password valid: {password_valid}")
-
-        if not password_valid:
-            logger.warning("Invalid password for user")
+        if not user.check_password(data["password"]):
+            logger.warning("Invalid password", extra={"user_id": user.id})
             return jsonify({"error": "Invalid email or password"}), 401
 
         access_token = create_access_token(identity=str(user.id))
-        logger.debug("Login successful, token created")
+        logger.debug("Login successful", extra={"user_id": user.id})
 
         response = jsonify(
             {
@@ -111,7 +98,7 @@ def login():
         return response, 200
 
     except Exception as e:
-        logger.error(f"Unexpected error during login: {str(e)}")
+        logger.exception("Unexpected error during login")
         return jsonify({"error": str(e)}), 500
 
 
@@ -131,6 +118,10 @@ def get_current_user():
                 "email": user.email,
                 "first_name": user.first_name,
                 "last_name": user.last_name,
+                "storage": {
+                    "used": user.storage_bytes,
+                    "quota": current_app.config.get("USER_STORAGE_QUOTA") or None,
+                },
             }
         )
 
@@ -150,8 +141,8 @@ def refresh():
 
         access_token = create_access_token(identity=str(user.id))
         return jsonify({"access_token": access_token}), 200
-    except Exception as e:
-        logger.error(f"Error refreshing token: {str(e)}")
+    except Exception:
+        logger.exception("Error refreshing token")
         return jsonify({"error": "Failed to refresh token"}), 500
 
 
@@ -0,0 +1,53 @@
+import logging
+
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from services import dashboard as dashboard_data
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("dashboard", __name__)
+
+
+@bp.route("", methods=["GET"])
+@bp.route("/", methods=["GET"])
+@jwt_required()
+def get_dashboard():
+    """Get the data of every dashboard widget in one response
+
+    The ETag is derived from the user's latest job change, so a revalidation
+    with ``If-None-Match`` is answered with 304 without running the
+    aggregate queries.
+    """
+    try:
+        upcoming_days = int(
+            request.args.get("upcoming_days", dashboard_data.DEFAULT_UPCOMING_DAYS)
+        )
+    except ValueError:
+        return jsonify({"error": "upcoming_days must be an integer"}), 400
+    if not 0 < upcoming_days <= dashboard_data.MAX_UPCOMING_DAYS:
+        return (
+            jsonify(
+                {
+                    "error": "upcoming_days must be between 1 and "
+                    f"{dashboard_data.MAX_UPCOMING_DAYS}"
+                }
+            ),
+            400,
+        )
+
+    try:
+        user_id = int(get_jwt_identity())
+        etag = dashboard_data.version(user_id, upcoming_days)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify(dashboard_data.dashboard(user_id, upcoming_days))
+        response.set_etag(etag, weak=True)
+        # Cached by the browser, but revalidated on every use
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    except SQLAlchemyError as e:
+        logger.error("Database error while reading the dashboard: %s", e)
+        return jsonify({"error": "Database error occurred"}), 500
@@ -1,81 +1,149 @@
+import csv
+import io
+import json
+import logging
+import mimetypes
 import os
+import queue
+import time
 from datetime import datetime
-
-from extensions import db
-from flask import Blueprint, current_app, jsonify, request, send_file
+from urllib.parse import quote
+
+from extensions import blobs, db, text_extractor
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    g,
+    jsonify,
+    request,
+    send_file,
+    stream_with_context,
+)
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from models.enums import ApplicationStatus, JobSource
-from models.models import File, Job, User
+from models.models import Blob, File, FileText, Job, JobChange, User, VacancyText
+from services import analytics, duplicates, job_stats
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 from werkzeug.utils import secure_filename
 
+logger = logging.getLogger(__name__)
+
 bp = Blueprint("jobs", __name__)
 
 # Configure upload folder
 UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {"pdf", "doc", "docx", "txt"}
 
+# Single-job responses carry the full vacancy text; load it with the job
+WITH_TEXT = joinedload(Job.vacancy).undefer(VacancyText.body)
+
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def save_file(file, file_type):
-    """Save uploaded file and return File object"""
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(current_app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
+class StorageQuotaExceeded(Exception):
+    """Raised when an upload would exceed the user's storage quota"""
+
+
+def save_file(file, file_type, user=None):
+    """Save uploaded file and return File object
 
-        file_record = File(filename=filename, file_path=filepath, file_type=file_type)
+    The contents go to the content-addressed blob store, so uploads with the
+    same name no longer overwrite each other and identical uploads share one
+    copy on disk. When ``user`` is given, the upload is checked against
+    ``USER_STORAGE_QUOTA``. The record is added to the session; the caller
+    commits it together with the rest of the request.
+    """
+    if file and allowed_file(file.filename):
+        digest, size = blobs.put(file.stream)
+        if user is not None and not user.has_storage_for(
+            digest, size, current_app.config["USER_STORAGE_QUOTA"]
+        ):
+            # The blob stays unreferenced and is reclaimed by the upload GC
+            raise StorageQuotaExceeded()
+        Blob.ensure(digest, size)
+
+        file_record = File(
+            filename=secure_filename(file.filename),
+            file_path=blobs.path_for(digest),
+            file_type=file_type,
+            blob_digest=digest,
+        )
         db.session.add(file_record)
-        db.session.commit()
         return file_record
     return None
 
 
+def serialize_job(job, include_text=True, include_excerpt=False):
+    """Return the JSON representation of a job used by every jobs endpoint
+
+    Lists send the short ``vacancy_excerpt`` and only include the full
+    ``vacancy_text`` on request; single-job responses always include it.
+    """
+    data = {
+        "id": job.id,
+        "company_name": job.company_name,
+        "role_title": job.role_title,
+        "vacancy_link": job.vacancy_link,
+        "application_status": job.application_status.value,
+        "source": job.source.value if job.source else None,
+        "date_applied": job.date_applied.isoformat() if job.date_applied else None,
+        "next_milestone_date": (
+            job.next_milestone_date.isoformat() if job.next_milestone_date else None
+        ),
+        "salary_min": job.salary_min,
+        "salary_max": job.salary_max,
+        "telegram_notification_sent": job.telegram_notification_sent,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+    if include_excerpt:
+        data["vacancy_excerpt"] = job.vacancy_excerpt
+    if include_text:
+        data["vacancy_text"] = job.vacancy_text
+    return data
+
+
 @bp.route("/", methods=["GET"])
 @jwt_required()
 def get_jobs():
-    """Get all jobs for the current user"""
+    """Get all jobs for the current user
+
+    Each job carries its ``vacancy_excerpt``; the full ``vacancy_text`` is
+    only included with ``?include=vacancy_text`` (it used to be always sent).
+    """
     try:
         user_id = int(get_jwt_identity())
-        jobs = Job.query.filter_by(user_id=user_id).all()
-
-        return (
-            jsonify(
-                [
-                    {
-                        "id": job.id,
-                        "company_name": job.company_name,
-                        "role_title": job.role_title,
-                        "vacancy_link": job.vacancy_link,
-                        "vacancy_text": job.vacancy_text,
-                        "application_status": job.application_status.value,
-                        "source": job.source.value if job.source else None,
-                        "date_applied": (
-                            job.date_applied.isoformat() if job.date_applied else None
-                        ),
-                        "next_milestone_date": (
-                            job.next_milestone_date.isoformat()
-                            if job.next_milestone_date
-                            else None
-                        ),
-                        "salary_min": job.salary_min,
-                        "salary_max": job.salary_max,
-                        "telegram_notification_sent": job.telegram_notification_sent,
-                        "created_at": (
-                            job.created_at.isoformat() if job.created_at else None
-                        ),
-                        "updated_at": (
-                            job.updated_at.isoformat() if job.updated_at else None
-                        ),
-                    }
-                    for job in jobs
-                ]
-            ),
-            200,
+        # The full vacancy text is only loaded when explicitly requested
+        include_text = "vacancy_text" in request.args.get("include", "").split(",")
+        # Every job change appends to job_changes, so its latest id versions
+        # the list (pruning keeps it); an unchanged list is answered without
+        # reading it
+        latest_change = current_app.extensions["job_events"].latest_id(user_id)
+        etag = f"jobs-{user_id}-{latest_change}{'-text' if include_text else ''}"
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        query = Job.query.filter_by(user_id=user_id).order_by(Job.updated_at.desc())
+        if include_text:
+            query = query.options(selectinload(Job.vacancy).undefer(VacancyText.body))
+        jobs = query.all()
+
+        response = jsonify(
+            [
+                serialize_job(job, include_text=include_text, include_excerpt=True)
+                for job in jobs
+            ]
         )
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
     except (ValueError, SQLAlchemyError) as e:
         return jsonify({"error": str(e)}), 500
 
@@ -86,7 +154,6 @@ def create_job():
     """Create a new job"""
     try:
         data = request.get_json()
-        print("Received data:", data)  # Debug log
         user_id = int(get_jwt_identity())
 
         # Check if user exists
@@ -100,9 +167,33 @@ def create_job():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
 
-        # Debug log the enum values
-        print("Application status:", data["application_status"])
-        print("Source:", data.get("source"))
+        # Similar jobs are returned with the new one; clients that would
+        # rather ask the user first send reject_duplicates
+        existing = duplicates.find_duplicates(
+            user_id,
+            data["company_name"],
+            data["role_title"],
+            data.get("vacancy_link"),
+        )
+        if existing and data.get("reject_duplicates"):
+            return (
+                jsonify(
+                    {
+                        "error": "This job looks like one you have already added",
+                        "duplicates": existing,
+                    }
+                ),
+                409,
+            )
+
+        logger.debug(
+            "Creating job",
+            extra={
+                "user_id": user_id,
+                "application_status": data["application_status"],
+                "source": data.get("source"),
+            },
+        )
 
         # Create job
         job = Job(
@@ -129,45 +220,18 @@ def create_job():
         )
 
         db.session.add(job)
+        db.session.flush()
+        job_id = job.id
         db.session.commit()
 
-        return (
-            jsonify(
-                {
-                    "id": job.id,
-                    "company_name": job.company_name,
-                    "role_title": job.role_title,
-                    "vacancy_link": job.vacancy_link,
-                    "vacancy_text": job.vacancy_text,
-                    "application_status": job.application_status.value,
-                    "source": job.source.value if job.source else None,
-                    "date_applied": (
-                        job.date_applied.isoformat() if job.date_applied else None
-                    ),
-                    "next_milestone_date": (
-                        job.next_milestone_date.isoformat()
-                        if job.next_milestone_date
-                        else None
-                    ),
-                    "salary_min": job.salary_min,
-                    "salary_max": job.salary_max,
-                    "telegram_notification_sent": job.telegram_notification_sent,
-                    "created_at": (
-                        job.created_at.isoformat() if job.created_at else None
-                    ),
-                    "updated_at": (
-                        job.updated_at.isoformat() if job.updated_at else None
-                    ),
-                }
-            ),
-            201,
-        )
+        job = Job.query.options(WITH_TEXT).filter_by(id=job_id).one()
+        return jsonify({**serialize_job(job), "duplicates": existing}), 201
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except SQLAlchemyError as e:
         db.session.rollback()
-        print(f"Database error: {str(e)}")  # Log the error
+        logger.error("Database error while creating a job: %s", e)
         return jsonify({"error": f"Database error: {str(e)}"}), 500
 
 
@@ -217,43 +281,14 @@ def update_job(job_id):
         job.updated_at = datetime.utcnow()
         db.session.commit()
 
-        return (
-            jsonify(
-                {
-                    "id": job.id,
-                    "company_name": job.company_name,
-                    "role_title": job.role_title,
-                    "vacancy_link": job.vacancy_link,
-                    "vacancy_text": job.vacancy_text,
-                    "application_status": job.application_status.value,
-                    "source": job.source.value if job.source else None,
-                    "date_applied": (
-                        job.date_applied.isoformat() if job.date_applied else None
-                    ),
-                    "next_milestone_date": (
-                        job.next_milestone_date.isoformat()
-                        if job.next_milestone_date
-                        else None
-                    ),
-                    "salary_min": job.salary_min,
-                    "salary_max": job.salary_max,
-                    "telegram_notification_sent": job.telegram_notification_sent,
-                    "created_at": (
-                        job.created_at.isoformat() if job.created_at else None
-                    ),
-                    "updated_at": (
-                        job.updated_at.isoformat() if job.updated_at else None
-                    ),
-                }
-            ),
-            200,
-        )
+        job = Job.query.options(WITH_TEXT).filter_by(id=job_id).one()
+        return jsonify(serialize_job(job)), 200
 
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except SQLAlchemyError as e:
         db.session.rollback()
-        print(f"Database error: {str(e)}")  # Add debug logging
+        logger.error("Database error while updating job %s: %s", job_id, e)
         return jsonify({"error": f"Database error: {str(e)}"}), 500
 
 
@@ -282,30 +317,62 @@ def upload_file(job_id):
     """Upload a file for a job"""
     try:
         user_id = get_jwt_identity()
-        job = Job.query.filter_by(id=job_id, user_id=user_id).first_or_404()
+        # The user is needed for the storage quota; load it in the same query
+        job = (
+            Job.query.options(joinedload(Job.user))
+            .filter_by(id=job_id, user_id=user_id)
+            .first_or_404()
+        )
 
-        if "file" not in request.files:
-            return jsonify({"error": "No file provided"}), 400
+        if request.is_json:
+            # Link a file the user already uploaded instead of uploading again
+            data = request.get_json()
+            if not data.get("file_id"):
+                return jsonify({"error": "No file provided"}), 400
 
-        file = request.files["file"]
-        file_type = request.form.get("file_type", "application/pdf")
+            source = (
+                File.query.join(Job)
+                .filter(File.id == data["file_id"], Job.user_id == user_id)
+                .first_or_404()
+            )
+            file_record = File(
+                filename=source.filename,
+                file_path=source.file_path,
+                file_type=data.get("file_type", source.file_type),
+                blob_digest=source.blob_digest,
+            )
+            db.session.add(file_record)
+        else:
+            if "file" not in request.files:
+                return jsonify({"error": "No file provided"}), 400
 
-        if file.filename == "":
-            return jsonify({"error": "No file selected"}), 400
+            file = request.files["file"]
+            file_type = request.form.get("file_type", "application/pdf")
 
-        file_record = save_file(file, file_type)
-        if not file_record:
-            return jsonify({"error": "Invalid file type"}), 400
+            if file.filename == "":
+                return jsonify({"error": "No file selected"}), 400
 
-        job.files.append(file_record)
+            file_record = save_file(file, file_type, user=job.user)
+            if not file_record:
+                return jsonify({"error": "Invalid file type"}), 400
+
+        # Setting the key rather than appending to job.files avoids loading
+        # every file already attached to the job
+        file_record.job_id = job.id
         db.session.commit()
 
+        # Extract text in the background; a no-op if this blob was seen before
+        text_extractor.submit(
+            file_record.blob_digest, file_record.file_path, file_record.filename
+        )
+
         return (
             jsonify(
                 {
                     "id": file_record.id,
                     "filename": file_record.filename,
                     "file_type": file_record.file_type,
+                    "digest": file_record.blob_digest,
                     "created_at": (
                         file_record.created_at.isoformat()
                         if file_record.created_at
@@ -316,11 +383,171 @@ def upload_file(job_id):
             201,
         )
 
+    except StorageQuotaExceeded:
+        return jsonify({"error": "Storage quota exceeded"}), 413
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": "Database error occurred"}), 500
 
 
+@bp.route("/files", methods=["GET"])
+@jwt_required()
+def get_uploaded_files():
+    """List the current user's uploaded files, one entry per distinct upload"""
+    try:
+        user_id = int(get_jwt_identity())
+        latest_ids = (
+            db.session.query(func.max(File.id))
+            .join(Job)
+            .filter(Job.user_id == user_id)
+            .group_by(func.coalesce(File.blob_digest, File.file_path))
+        )
+        files = (
+            File.query.filter(File.id.in_(latest_ids))
+            .order_by(File.created_at.desc())
+            .all()
+        )
+
+        return (
+            jsonify(
+                [
+                    {
+                        "id": file.id,
+                        "filename": file.filename,
+                        "file_type": file.file_type,
+                        "digest": file.blob_digest,
+                        "created_at": (
+                            file.created_at.isoformat() if file.created_at else None
+                        ),
+                    }
+                    for file in files
+                ]
+            ),
+            200,
+        )
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/files/search", methods=["GET"])
+@jwt_required()
+def search_files():
+    """Full-text search over the current user's uploaded files"""
+    try:
+        user_id = int(get_jwt_identity())
+        query_text = request.args.get("q", "").strip()
+        if not query_text:
+            return jsonify({"error": "Missing search query"}), 400
+
+        query = (
+            db.session.query(File, Job.company_name, Job.role_title)
+            .join(Job)
+            .join(FileText, FileText.blob_digest == File.blob_digest)
+            .filter(Job.user_id == user_id, FileText.status == FileText.DONE)
+        )
+
+        if db.engine.dialect.name == "postgresql":
+            # Matches the ix_file_texts_content_fts expression index
+            config = literal_column("'english'")
+            document = func.to_tsvector(config, FileText.content)
+            ts_query = func.plainto_tsquery(config, query_text)
+            query = (
+                query.filter(document.op("@@")(ts_query))
+                .add_columns(func.ts_headline(config, FileText.content, ts_query))
+                .order_by(func.ts_rank(document, ts_query).desc())
+            )
+        else:
+            # Escaped, so "%" and "_" in the query match themselves
+            query = query.filter(
+                FileText.content.icontains(query_text, autoescape=True)
+            )
+            query = query.add_columns(literal_column("NULL"))
+
+        results = query.limit(50).all()
+
+        return (
+            jsonify(
+                [
+                    {
+                        "id": file.id,
+                        "job_id": file.job_id,
+                        "company_name": company_name,
+                        "role_title": role_title,
+                        "filename": file.filename,
+                        "file_type": file.file_type,
+                        "snippet": snippet,
+                    }
+                    for file, company_name, role_title, snippet in results
+                ]
+            ),
+            200,
+        )
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route("/<int:job_id>/files/<int:file_id>", methods=["GET"])
+@jwt_required()
+def download_file(job_id, file_id):
+    """Download a file attached to a job
+
+    Supports conditional requests and byte ranges. Blob-backed files use their
+    sha256 digest as a strong ETag. When ``FILE_ACCEL_REDIRECT`` is configured
+    the response only carries an ``X-Accel-Redirect`` header and nginx streams
+    the bytes itself, so no worker time is spent on the transfer.
+    ``If-None-Match`` is answered here first. nginx would compare ``If-Range``
+    with its own ETag and ignore the range, so resumed downloads are sent
+    from here.
+    """
+    try:
+        user_id = get_jwt_identity()
+        file_record = (
+            File.query.join(Job)
+            .filter(File.id == file_id, File.job_id == job_id, Job.user_id == user_id)
+            .first_or_404()
+        )
+
+        mimetype = (
+            mimetypes.guess_type(file_record.filename)[0] or "application/octet-stream"
+        )
+        accel_prefix = current_app.config.get("FILE_ACCEL_REDIRECT")
+        etag = file_record.blob_digest
+
+        if accel_prefix and etag and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+        elif accel_prefix and "If-Range" not in request.headers:
+            relative_path = os.path.relpath(
+                file_record.file_path, current_app.config["UPLOAD_FOLDER"]
+            )
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers["X-Accel-Redirect"] = (
+                f"{accel_prefix.rstrip('/')}/{quote(relative_path)}"
+            )
+            response.headers["Content-Disposition"] = (
+                f"attachment; filename*=UTF-8''{quote(file_record.filename)}"
+            )
+            if etag:
+                response.set_etag(etag)
+        else:
+            response = send_file(
+                os.path.abspath(file_record.file_path),
+                mimetype=mimetype,
+                as_attachment=True,
+                download_name=file_record.filename,
+                conditional=True,
+                etag=etag or True,
+            )
+
+        response.cache_control.private = True
+        return response
+
+    except FileNotFoundError:
+        return jsonify({"error": "File contents not found"}), 404
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @bp.route("/<int:job_id>", methods=["GET"])
 @bp.route("/<int:job_id>/", methods=["GET"])
 @jwt_required()
@@ -328,42 +555,257 @@ def get_job(job_id):
     """Get a single job by ID"""
     try:
         user_id = get_jwt_identity()
-        job = Job.query.filter_by(id=job_id, user_id=user_id).first_or_404()
+        job = (
+            Job.query.options(WITH_TEXT)
+            .filter_by(id=job_id, user_id=user_id)
+            .first_or_404()
+        )
+
+        return jsonify(serialize_job(job)), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        logger.error("Database error while reading job %s: %s", job_id, e)
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
 
+@bp.route("/<int:job_id>/timeline", methods=["GET"])
+@jwt_required()
+def get_job_timeline(job_id):
+    """Get a job's status history with the time spent in each status"""
+    try:
+        user_id = int(get_jwt_identity())
+        Job.query.with_entities(Job.id).filter_by(
+            id=job_id, user_id=user_id
+        ).first_or_404()
+
+        return (
+            jsonify({"job_id": job_id, "events": analytics.job_timeline(job_id)}),
+            200,
+        )
+    except SQLAlchemyError as e:
+        logger.error("Database error while reading job %s timeline: %s", job_id, e)
+        return jsonify({"error": "Database error occurred"}), 500
+
+
+@bp.route("/analytics", methods=["GET"])
+@jwt_required()
+def get_status_analytics():
+    """Get time-in-status and funnel conversion for the current user"""
+    try:
+        user_id = int(get_jwt_identity())
         return (
             jsonify(
                 {
-                    "id": job.id,
-                    "company_name": job.company_name,
-                    "role_title": job.role_title,
-                    "vacancy_link": job.vacancy_link,
-                    "vacancy_text": job.vacancy_text,
-                    "application_status": job.application_status.value,
-                    "source": job.source.value if job.source else None,
-                    "date_applied": (
-                        job.date_applied.isoformat() if job.date_applied else None
-                    ),
-                    "next_milestone_date": (
-                        job.next_milestone_date.isoformat()
-                        if job.next_milestone_date
-                        else None
-                    ),
-                    "salary_min": job.salary_min,
-                    "salary_max": job.salary_max,
-                    "telegram_notification_sent": job.telegram_notification_sent,
-                    "created_at": (
-                        job.created_at.isoformat() if job.created_at else None
-                    ),
-                    "updated_at": (
-                        job.updated_at.isoformat() if job.updated_at else None
-                    ),
+                    "time_in_status": analytics.time_in_status(user_id),
+                    "funnel": analytics.funnel(user_id),
                 }
             ),
             200,
         )
+    except SQLAlchemyError as e:
+        logger.error("Database error while computing analytics: %s", e)
+        return jsonify({"error": "Database error occurred"}), 500
 
-    except ValueError as e:
-        return jsonify({"error": str(e)}), 400
+
+@bp.route("/stats", methods=["GET"])
+@jwt_required()
+def get_job_stats():
+    """Get the current user's job counts by status, source and week applied"""
+    try:
+        return jsonify(job_stats.summary(int(get_jwt_identity()))), 200
     except SQLAlchemyError as e:
-        print(f"Database error: {str(e)}")  # Add debug logging
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
+        logger.error("Database error while reading job stats: %s", e)
+        return jsonify({"error": "Database error occurred"}), 500
+
+
+@bp.route("/duplicates", methods=["GET"])
+@jwt_required()
+def get_duplicates():
+    """Get the current user's jobs that look like the same vacancy, grouped"""
+    try:
+        return jsonify(duplicates.duplicate_groups(int(get_jwt_identity()))), 200
+    except SQLAlchemyError as e:
+        logger.error("Database error while finding duplicate jobs: %s", e)
+        return jsonify({"error": "Database error occurred"}), 500
+
+
+EXPORT_COLUMNS = [
+    "id",
+    "company_name",
+    "role_title",
+    "vacancy_link",
+    "application_status",
+    "source",
+    "date_applied",
+    "next_milestone_date",
+    "salary_min",
+    "salary_max",
+    "created_at",
+    "updated_at",
+]
+EXPORT_BATCH_SIZE = 500
+
+
+def _csv_cell(value):
+    # Spreadsheets run cells starting with these as formulas
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+@bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_jobs():
+    """Download the current user's jobs as CSV
+
+    Jobs are read and sent in batches of EXPORT_BATCH_SIZE, so an export
+    never holds all of a user's jobs in memory; the response compression
+    compresses the stream as it is sent. ``?include=vacancy_text`` adds the
+    full vacancy texts.
+    """
+    user_id = int(get_jwt_identity())
+    include_text = "vacancy_text" in request.args.get("include", "").split(",")
+    columns = EXPORT_COLUMNS + (["vacancy_text"] if include_text else [])
+    query = (
+        select(Job)
+        .where(Job.user_id == user_id)
+        .order_by(Job.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if include_text:
+        query = query.options(selectinload(Job.vacancy).undefer(VacancyText.body))
+
+    def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def written():
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+
+        # The header goes out before the first batch is read
+        writer.writerow(columns)
+        yield written()
+        for index, job in enumerate(db.session.scalars(query), 1):
+            data = serialize_job(job, include_text=include_text)
+            writer.writerow([_csv_cell(data[column]) for column in columns])
+            if index % EXPORT_BATCH_SIZE == 0:
+                yield written()
+        yield written()
+
+    return Response(
+        stream_with_context(rows()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="jobs.csv"'},
+    )
+
+
+# How long browsers wait before reconnecting a dropped stream
+EVENT_STREAM_RETRY_MS = 3000
+
+
+def _sse(event, data, event_id=None):
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _job_events(user_id, changes):
+    """Turn a batch of changes into events, one per job, with its latest state"""
+    latest, created = {}, set()
+    for change in changes:
+        latest.pop(change.job_id, None)
+        latest[change.job_id] = change
+        if change.action == JobChange.CREATED:
+            created.add(change.job_id)
+    alive = [
+        job_id
+        for job_id, change in latest.items()
+        if change.action != JobChange.DELETED
+    ]
+    jobs = {}
+    if alive:
+        jobs = {
+            job.id: job
+            for job in Job.query.filter(Job.user_id == user_id, Job.id.in_(alive))
+        }
+    for job_id, change in latest.items():
+        job = jobs.get(job_id)
+        if job is None:
+            # Deleted, possibly by a change in a later batch
+            data = {"action": JobChange.DELETED, "job_id": job_id}
+        else:
+            data = {
+                "action": JobChange.CREATED if job_id in created else change.action,
+                "job": serialize_job(job, include_text=False, include_excerpt=True),
+            }
+        yield _sse("job", data, change.id)
+
+
+def _job_event_stream(user_id, after_id):
+    stream = current_app.extensions["job_events"]
+    # Subscribe before reading, so no change falls between the two
+    with stream.subscribe(user_id) as wakeups:
+        yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+        stream.prune()
+        if after_id is None:
+            after_id = stream.latest_id(user_id)
+        elif stream.is_pruned(user_id, after_id):
+            after_id = stream.latest_id(user_id)
+            yield _sse("reset", {}, after_id)
+        deadline = time.monotonic() + stream.max_seconds
+
+        while True:
+            changes = stream.changes_since(user_id, after_id)
+            if changes:
+                yield from _job_events(user_id, changes)
+                after_id = changes[-1].id
+                continue
+            # Hand the connection back to the pool while waiting
+            db.session.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                wakeups.get(timeout=min(stream.heartbeat, remaining))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    return
+                yield ": heartbeat\n\n"
+                continue
+            # One read covers every commit that woke us up meanwhile
+            try:
+                while True:
+                    wakeups.get_nowait()
+            except queue.Empty:
+                pass
+
+
+@bp.route("/events", methods=["GET"])
+@jwt_required()
+def stream_job_events():
+    """Stream the current user's job changes as Server-Sent Events
+
+    Each ``job`` event carries the job as ``GET /api/jobs/`` lists it, or only
+    its id once deleted. Send ``Last-Event-ID`` (or ``?last_event_id=``) to
+    resume after the last event received; without it the stream starts now.
+    A ``reset`` event means changes were pruned and the list must be fetched
+    again.
+    """
+    user_id = int(get_jwt_identity())
+    resume = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        after_id = int(resume) if resume else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+    # Notifications follow commits on the primary; a replica may lag behind
+    g.pop("db_replica", None)
+    return Response(
+        stream_with_context(_job_event_stream(user_id, after_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,239 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from extensions import blobs, db, text_extractor
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from models.models import Blob, File, Job, UploadSession, User
+from services import uploads
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
+
+from .jobs import allowed_file
+
+bp = Blueprint("uploads", __name__)
+
+
+def _session_status(session, offset):
+    return {
+        "id": session.id,
+        "job_id": session.job_id,
+        "filename": session.filename,
+        "size": session.total_size,
+        "offset": offset,
+        "chunk_size": current_app.config["UPLOAD_CHUNK_SIZE"],
+    }
+
+
+def _get_session(upload_id):
+    user_id = int(get_jwt_identity())
+    return UploadSession.query.filter_by(id=upload_id, user_id=user_id).first_or_404()
+
+
+def _chunk_offset():
+    """Read the chunk offset from ``Upload-Offset`` or ``Content-Range``"""
+    if "Upload-Offset" in request.headers:
+        return int(request.headers["Upload-Offset"])
+    content_range = request.headers.get("Content-Range", "")
+    if content_range.startswith("bytes "):
+        return int(content_range[len("bytes ") :].split("-", 1)[0])
+    raise ValueError("Missing Upload-Offset or Content-Range header")
+
+
+@bp.route("/", methods=["POST"])
+@jwt_required()
+def create_upload():
+    """Start a resumable upload for a job file"""
+    try:
+        data = request.get_json()
+        user_id = int(get_jwt_identity())
+
+        for field in ["job_id", "filename", "size"]:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+
+        if not allowed_file(data["filename"]):
+            return jsonify({"error": "Invalid file type"}), 400
+
+        size = int(data["size"])
+        if size < 0 or size > current_app.config["UPLOAD_MAX_SIZE"]:
+            return jsonify({"error": "File too large"}), 413
+
+        job = Job.query.filter_by(id=data["job_id"], user_id=user_id).first_or_404()
+        quota = current_app.config["USER_STORAGE_QUOTA"]
+        if quota and job.user.storage_bytes + size > quota:
+            return jsonify({"error": "Storage quota exceeded"}), 413
+
+        uploads.maybe_purge_stale_sessions(
+            timedelta(seconds=current_app.config["UPLOAD_SESSION_TTL"])
+        )
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            job_id=job.id,
+            filename=secure_filename(data["filename"]),
+            file_type=data.get("file_type", "application/pdf"),
+            total_size=size,
+            received=0,
+        )
+        db.session.add(session)
+        db.session.commit()
+
+        response = jsonify(_session_status(session, 0))
+        response.headers["Location"] = f"{request.script_root}/api/uploads/{session.id}"
+        response.headers["Upload-Offset"] = "0"
+        return response, 201
+
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@bp.route("/<upload_id>", methods=["GET", "HEAD"])
+@jwt_required()
+def get_upload(upload_id):
+    """Report how many bytes of an upload have been received"""
+    session = _get_session(upload_id)
+    offset = uploads.received_bytes(blobs.partial_path(session.id))
+    response = jsonify(_session_status(session, offset))
+    response.headers["Upload-Offset"] = str(offset)
+    return response, 200
+
+
+@bp.route("/<upload_id>", methods=["PUT", "PATCH"])
+@jwt_required()
+def put_chunk(upload_id):
+    """Write one chunk of an upload, starting at the given offset
+
+    The body is streamed to disk without being buffered in memory. A chunk
+    whose offset does not match what was received answers 409 with the
+    offset to resume from.
+    """
+    try:
+        session = _get_session(upload_id)
+        session_id, total_size = session.id, session.total_size
+        # Release the connection while the body streams in
+        db.session.commit()
+
+        offset = uploads.write_chunk(
+            blobs.partial_path(session_id),
+            session_id,
+            _chunk_offset(),
+            request.stream,
+            total_size,
+        )
+
+        UploadSession.query.filter_by(id=session_id).update(
+            {"received": offset, "updated_at": datetime.utcnow()}
+        )
+        db.session.commit()
+
+        response = jsonify({"id": session_id, "offset": offset, "size": total_size})
+        response.headers["Upload-Offset"] = str(offset)
+        return response, 200
+
+    except uploads.ChunkConflict as e:
+        response = jsonify({"error": str(e), "offset": e.offset})
+        response.headers["Upload-Offset"] = str(e.offset)
+        return response, 409
+    except uploads.UploadBusy:
+        return jsonify({"error": "Another chunk is being written"}), 409
+    except uploads.UploadClosed:
+        return jsonify({"error": "Upload is no longer open"}), 409
+    except uploads.UploadTooLarge:
+        return jsonify({"error": "Chunk exceeds the declared upload size"}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@bp.route("/<upload_id>/complete", methods=["POST"])
+@jwt_required()
+def complete_upload(upload_id):
+    """Move a fully received upload into the blob store and attach it"""
+    try:
+        session = _get_session(upload_id)
+        path = blobs.partial_path(session.id)
+
+        # Zero-byte uploads never receive a chunk; locking creates the file
+        with uploads.locked(path) as partial:
+            received = partial.seek(0, os.SEEK_END)
+            if received != session.total_size:
+                response = jsonify(
+                    {"error": "Upload is incomplete", "offset": received}
+                )
+                response.headers["Upload-Offset"] = str(received)
+                return response, 409
+
+            digest = uploads.finalize(path, session.id, session.total_size)
+
+            # Checked before the blob is stored: a rejected upload keeps its
+            # session, so it can be completed once space has been freed
+            user = db.session.get(User, session.user_id)
+            if not user.has_storage_for(
+                digest, session.total_size, current_app.config["USER_STORAGE_QUOTA"]
+            ):
+                return jsonify({"error": "Storage quota exceeded"}), 413
+
+            blobs.adopt(path, digest)
+            Blob.ensure(digest, session.total_size)
+
+            file_record = File(
+                job_id=session.job_id,
+                filename=session.filename,
+                file_path=blobs.path_for(digest),
+                file_type=session.file_type,
+                blob_digest=digest,
+            )
+            db.session.add(file_record)
+            db.session.delete(session)
+            db.session.commit()
+
+        text_extractor.submit(digest, file_record.file_path, file_record.filename)
+
+        return (
+            jsonify(
+                {
+                    "id": file_record.id,
+                    "filename": file_record.filename,
+                    "file_type": file_record.file_type,
+                    "digest": file_record.blob_digest,
+                    "created_at": (
+                        file_record.created_at.isoformat()
+                        if file_record.created_at
+                        else None
+                    ),
+                }
+            ),
+            201,
+        )
+
+    except uploads.UploadBusy:
+        return jsonify({"error": "A chunk is being written"}), 409
+    except uploads.UploadClosed:
+        return jsonify({"error": "Upload is no longer open"}), 409
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@bp.route("/<upload_id>", methods=["DELETE"])
+@jwt_required()
+def abort_upload(upload_id):
+    """Abandon an upload and discard the received bytes"""
+    try:
+        session = _get_session(upload_id)
+        uploads.discard(blobs.partial_path(session.id), session.id)
+        db.session.delete(session)
+        db.session.commit()
+        return "", 204
+
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({"error": "Database error occurred"}), 500
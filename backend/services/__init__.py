@@ -0,0 +1,20 @@
+from .blobstore import BlobStore
+from .compression import ResponseCompressor
+from .extraction import TextExtractor
+from .job_events import JobEvents
+from .metrics import RequestMetrics
+from .profiling import Profiler
+from .query_profiler import QueryProfiler
+from .replicas import ReplicaRouter, RoutingSession
+
+__all__ = [
+    "BlobStore",
+    "JobEvents",
+    "Profiler",
+    "QueryProfiler",
+    "ReplicaRouter",
+    "RequestMetrics",
+    "ResponseCompressor",
+    "RoutingSession",
+    "TextExtractor",
+]
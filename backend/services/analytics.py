@@ -0,0 +1,171 @@
+"""Status-history analytics computed in SQL from ``job_status_events``.
+
+Every event starts a span: a job entered ``to_status`` at ``occurred_at``
+and stayed until its next event. The next event's time comes from a
+``LEAD`` window over the job's events, so one indexed scan of a user's
+events yields every span without replaying jobs in Python. A job's last
+span is still open; it counts towards the jobs currently in that status but
+not towards completed durations.
+"""
+
+from datetime import datetime
+
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import JobStatusEvent
+from sqlalchemy import DateTime, case, func, select
+
+# The order applications move through; REJECTED and NO_ANSWER can follow
+# any of them
+FUNNEL = [
+    ApplicationStatus.NOT_YET_APPLIED,
+    ApplicationStatus.APPLIED,
+    ApplicationStatus.SCREENING_CALL,
+    ApplicationStatus.TEST_TASK,
+    ApplicationStatus.INTERVIEW,
+    ApplicationStatus.OFFER,
+]
+
+events = JobStatusEvent.__table__
+
+
+def seconds_between(later, earlier):
+    """SQL expression for the seconds from ``earlier`` to ``later``"""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", later - earlier)
+    return (func.julianday(later) - func.julianday(earlier)) * 86400.0
+
+
+def _spans(*criteria):
+    """Subquery of status spans: when each event's status began and ended"""
+    left_at = func.lead(events.c.occurred_at, type_=DateTime).over(
+        partition_by=events.c.job_id,
+        order_by=(events.c.occurred_at, events.c.id),
+    )
+    return (
+        select(
+            events.c.id,
+            events.c.job_id,
+            events.c.from_status,
+            events.c.to_status,
+            events.c.occurred_at,
+            left_at.label("left_at"),
+        )
+        .where(*criteria)
+        .subquery()
+    )
+
+
+def _days(seconds):
+    return None if seconds is None else round(float(seconds) / 86400, 2)
+
+
+def job_timeline(job_id, now=None):
+    """Every status a job went through, oldest first, with its duration"""
+    now = now or datetime.utcnow()
+    spans = _spans(events.c.job_id == job_id)
+    rows = db.session.execute(
+        select(
+            spans,
+            seconds_between(func.coalesce(spans.c.left_at, now), spans.c.occurred_at),
+        ).order_by(spans.c.occurred_at, spans.c.id)
+    ).all()
+    return [
+        {
+            "from_status": row.from_status.value if row.from_status else None,
+            "to_status": row.to_status.value,
+            "occurred_at": row.occurred_at.isoformat(),
+            "left_at": row.left_at.isoformat() if row.left_at else None,
+            "days_in_status": _days(row[-1]),
+            "current": row.left_at is None,
+        }
+        for row in rows
+    ]
+
+
+def time_in_status(user_id):
+    """Per status: jobs that entered it, jobs in it now, and how long the
+    completed stays in it lasted"""
+    spans = _spans(events.c.user_id == user_id)
+    duration = seconds_between(spans.c.left_at, spans.c.occurred_at)
+    rows = db.session.execute(
+        select(
+            spans.c.to_status,
+            func.count(func.distinct(spans.c.job_id)),
+            func.count() - func.count(spans.c.left_at),
+            func.avg(duration),
+            func.max(duration),
+        ).group_by(spans.c.to_status)
+    ).all()
+    by_status = {row[0]: row[1:] for row in rows}
+    result = []
+    for status in ApplicationStatus:
+        jobs, current, avg_seconds, max_seconds = by_status.get(
+            status, (0, 0, None, None)
+        )
+        result.append(
+            {
+                "status": status.value,
+                "jobs": jobs,
+                "current": current,
+                "avg_days": _days(avg_seconds),
+                "max_days": _days(max_seconds),
+            }
+        )
+    return result
+
+
+def funnel(user_id):
+    """How many jobs got at least as far as each stage of FUNNEL
+
+    A job counts for the stages it skipped (an interview without a recorded
+    screening call still passed screening). ``rate`` is relative to all
+    tracked jobs, ``step_rate`` to the previous stage.
+    """
+    rank = case(
+        *((events.c.to_status == status, index) for index, status in enumerate(FUNNEL)),
+        else_=-1,
+    )
+    rejected = case((events.c.to_status == ApplicationStatus.REJECTED, 1), else_=0)
+    unanswered = case((events.c.to_status == ApplicationStatus.NO_ANSWER, 1), else_=0)
+    furthest = (
+        select(
+            func.max(rank).label("rank"),
+            func.max(rejected).label("rejected"),
+            func.max(unanswered).label("no_answer"),
+        )
+        .where(events.c.user_id == user_id)
+        .group_by(events.c.job_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(
+            furthest.c.rank,
+            func.count(),
+            func.sum(furthest.c.rejected),
+            func.sum(furthest.c.no_answer),
+        ).group_by(furthest.c.rank)
+    ).all()
+    exactly = {furthest_rank: count for furthest_rank, count, _, _ in rows}
+
+    # Jobs that reached a stage are those whose furthest stage is it or later
+    reached = [
+        sum(exactly.get(later, 0) for later in range(index, len(FUNNEL)))
+        for index in range(len(FUNNEL))
+    ]
+    stages = []
+    for index, status in enumerate(FUNNEL):
+        count, previous = reached[index], reached[index - 1] if index else None
+        stages.append(
+            {
+                "status": status.value,
+                "jobs": count,
+                "rate": round(count / reached[0], 4) if reached[0] else None,
+                "step_rate": round(count / previous, 4) if previous else None,
+            }
+        )
+    return {
+        "stages": stages,
+        "rejected": sum(int(count or 0) for _, _, count, _ in rows),
+        "no_answer": sum(int(count or 0) for _, _, _, count in rows),
+    }
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """Content-addressed storage for uploaded files.
+
+    Blobs are stored under ``<UPLOAD_FOLDER>/blobs/ab/cd/<sha256>``. Uploads are
+    hashed while they are streamed to a temporary file in the same filesystem
+    and then renamed into place, so identical content is only ever stored once
+    and readers never observe a partially written blob.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.root = app.config["UPLOAD_FOLDER"]
+        app.extensions["blobstore"] = self
+
+    @property
+    def blob_dir(self) -> str:
+        return os.path.join(self.root, "blobs")
+
+    @property
+    def tmp_dir(self) -> str:
+        return os.path.join(self.root, "tmp")
+
+    @property
+    def partial_dir(self) -> str:
+        return os.path.join(self.root, "partial")
+
+    def partial_path(self, upload_id: str) -> str:
+        """Return the path that collects the chunks of a resumable upload"""
+        return os.path.join(self.partial_dir, f"{upload_id}.part")
+
+    def path_for(self, digest: str) -> str:
+        """Return the sharded on-disk path for a blob digest"""
+        return os.path.join(self.blob_dir, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
+
+    def put(self, stream: BinaryIO) -> Tuple[str, int]:
+        """Stream ``stream`` into the store.
+
+        Args:
+            stream (BinaryIO): Readable binary stream, e.g. ``FileStorage.stream``
+
+        Returns:
+            Tuple[str, int]: The sha256 hex digest and the size in bytes
+        """
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            digest = hasher.hexdigest()
+            self.adopt(tmp_path, digest)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return digest, size
+
+    def adopt(self, tmp_path: str, digest: str) -> str:
+        """Move an already hashed temporary file into its final location.
+
+        If a blob with the same digest already exists the temporary file is
+        discarded instead, and the existing blob's mtime is refreshed so the
+        garbage collector's grace period starts over.
+
+        Returns:
+            str: The final blob path
+        """
+        final_path = self.path_for(digest)
+        try:
+            os.utime(final_path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        else:
+            os.unlink(tmp_path)
+        return final_path
+
+    def iter_blobs(self):
+        """Yield ``(digest, path)`` for every stored blob without listing all"""
+        for top in _scandirs(self.blob_dir):
+            for shard in _scandirs(top.path):
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.is_file(follow_symlinks=False):
+                            yield entry.name, entry.path
+
+
+def _scandirs(path):
+    try:
+        with os.scandir(path) as entries:
+            dirs = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return []
+    return sorted(dirs, key=lambda entry: entry.name)
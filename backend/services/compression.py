@@ -0,0 +1,239 @@
+"""Compress API responses with the best encoding the client accepts.
+
+Job lists carry whole vacancy texts, and the CSV export carries every job,
+so JSON and CSV shrink several times over when compressed. Responses are
+compressed with zstd, brotli or gzip, whichever ``Accept-Encoding`` rates
+highest (ties go to that order). gzip is always available; brotli and zstd
+need the ``brotli`` and ``zstandard`` packages and are skipped without them.
+
+* Only COMPRESS_MIMETYPES are compressed. Event streams, file downloads
+  (``send_file`` passes files through) and responses that already have a
+  ``Content-Encoding`` are left alone.
+* Bodies smaller than COMPRESS_MIN_SIZE bytes are sent as they are; the
+  headers would eat most of the saving.
+* Streamed responses (the CSV export) are compressed chunk by chunk as they
+  are sent, so they are never held in memory.
+* ETagged bodies are compressed once per ETag and encoding and then served
+  from an LRU cache of up to COMPRESS_CACHE_BYTES (0 disables it). Entries
+  are checked against a digest of the body, so an ETag shared by different
+  resources never serves the wrong bytes.
+
+A compressed response has a different body from the uncompressed one, so
+strong ETags are made weak; handlers compare ETags weakly anyway.
+
+Compression runs after the handler but before the request metrics, so
+``jobpal_http_response_size_bytes`` records the bytes actually sent.
+"""
+
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_BYTES = Counter(
+    "jobpal_compression_bytes_total",
+    "Response bytes before (stage=in) and after (stage=out) compression",
+    ["encoding", "stage"],
+)
+CACHE_LOOKUPS = Counter(
+    "jobpal_compression_cache_total",
+    "Lookups of compressed ETagged bodies in the cache",
+    ["result"],
+)
+
+SKIPPED_STATUS_CODES = {204, 206, 304}
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level):
+        import zstandard
+
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+
+# Encoding to compressor, module that must be importable and default level.
+# The levels favour speed: responses are compressed on every request.
+CODECS = {
+    "zstd": (_Zstd, "zstandard", 3),
+    "br": (_Brotli, "brotli", 4),
+    "gzip": (_Gzip, None, 6),
+}
+
+
+def available_encodings():
+    """The encodings in CODECS whose module is installed, in order"""
+    encodings = []
+    for encoding, (_, module, _) in CODECS.items():
+        if module is not None:
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+        encodings.append(encoding)
+    return encodings
+
+
+class ResponseCompressor:
+    """Negotiates and applies response compression for every request"""
+
+    def __init__(self, app=None):
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        available = available_encodings()
+        wanted = app.config["COMPRESS_ENCODINGS"]
+        self.encodings = [encoding for encoding in wanted if encoding in available]
+        missing = [encoding for encoding in wanted if encoding not in available]
+        if missing:
+            logger.info("Response compression without %s", ", ".join(missing))
+        levels = app.config["COMPRESS_LEVELS"]
+        self.levels = {
+            encoding: levels.get(encoding, CODECS[encoding][2])
+            for encoding in self.encodings
+        }
+        self.min_size = app.config["COMPRESS_MIN_SIZE"]
+        self.mimetypes = set(app.config["COMPRESS_MIMETYPES"])
+        self.cache_limit = app.config["COMPRESS_CACHE_BYTES"]
+        app.extensions["response_compressor"] = self
+        app.after_request(self._compress)
+
+    def negotiate(self, accept_encodings):
+        """The enabled encoding the client rates highest, or None"""
+        best, best_quality = None, 0
+        for encoding in self.encodings:
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compressor(self, encoding):
+        return CODECS[encoding][0](self.levels[encoding])
+
+    def compress(self, encoding, data):
+        """Compress a whole body"""
+        compressor = self.compressor(encoding)
+        compressed = compressor.compress(data) + compressor.flush()
+        COMPRESSED_BYTES.labels(encoding, "in").inc(len(data))
+        COMPRESSED_BYTES.labels(encoding, "out").inc(len(compressed))
+        return compressed
+
+    def _compress(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            response.direct_passthrough
+            or response.status_code in SKIPPED_STATUS_CODES
+            or "Content-Encoding" in response.headers
+            or "no-transform" in response.cache_control
+        ):
+            return response
+        if not response.is_streamed and len(response.get_data()) < self.min_size:
+            return response
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            self._compress_stream(response, encoding)
+        else:
+            body = response.get_data()
+            etag, _ = response.get_etag()
+            if etag and self.cache_limit:
+                compressed = self._cached(etag, encoding, body)
+            else:
+                compressed = self.compress(encoding, body)
+            response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_stream(self, response, encoding):
+        chunks = response.iter_encoded()
+        original = response.response
+        if hasattr(original, "close"):
+            response.call_on_close(original.close)
+        compressor = self.compressor(encoding)
+
+        def compressed_chunks():
+            size_in = size_out = 0
+            for chunk in chunks:
+                size_in += len(chunk)
+                data = compressor.compress(chunk)
+                if data:
+                    size_out += len(data)
+                    yield data
+            data = compressor.flush()
+            size_out += len(data)
+            yield data
+            COMPRESSED_BYTES.labels(encoding, "in").inc(size_in)
+            COMPRESSED_BYTES.labels(encoding, "out").inc(size_out)
+
+        response.response = compressed_chunks()
+        response.headers.pop("Content-Length", None)
+
+    def _cached(self, etag, encoding, body):
+        key = (etag, encoding)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == digest:
+                self._cache.move_to_end(key)
+                CACHE_LOOKUPS.labels("hit").inc()
+                return entry[1]
+        CACHE_LOOKUPS.labels("miss").inc()
+        compressed = self.compress(encoding, body)
+        if len(compressed) > self.cache_limit:
+            return compressed
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous is not None:
+                self._cache_size -= len(previous[1])
+            self._cache[key] = (digest, compressed)
+            self._cache_size += len(compressed)
+            while self._cache_size > self.cache_limit:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted)
+        return compressed
@@ -0,0 +1,167 @@
+"""Everything the dashboard widgets show, read in one request.
+
+The widgets used to fetch the full job list each and derive their numbers
+in the browser. ``dashboard`` reads the same numbers with a few aggregate
+queries in one transaction:
+
+* ``summary``: the ``user_job_stats`` counters (``services/job_stats.py``)
+* ``rejections``: days from applying to the REJECTED event
+* ``waiting``: how long the open applications have waited, spread around
+  the average days to rejection
+* ``activity``: applications per day since the start of the year
+* ``overdue`` and ``upcoming``: jobs whose next milestone has passed or
+  falls within ``upcoming_days``
+
+The document only changes when a job does (each change appends a
+``job_changes`` row) or when the clock moves jobs between overdue and
+upcoming. ``version`` is built from both, so a request whose ETag matches is
+answered with one indexed lookup and without running the aggregates.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import CLOSED_STATUSES, Job, JobChange, JobStatusEvent
+from sqlalchemy import DateTime, func, literal, select
+
+from . import job_stats
+from .analytics import seconds_between
+
+DEFAULT_UPCOMING_DAYS = 14
+MAX_UPCOMING_DAYS = 90
+
+jobs = Job.__table__
+events = JobStatusEvent.__table__
+
+
+def _now(now=None):
+    # Minute resolution, so that the version stays valid for a minute
+    return (now or datetime.utcnow()).replace(second=0, microsecond=0)
+
+
+def version(user_id, upcoming_days=DEFAULT_UPCOMING_DAYS, now=None):
+    """Changes whenever ``dashboard`` with the same arguments would"""
+    latest = db.session.scalar(
+        select(func.max(JobChange.id)).where(JobChange.user_id == user_id)
+    )
+    return f"{user_id}-{latest or 0}-{upcoming_days}-{_now(now):%Y%m%d%H%M}"
+
+
+def _days(seconds):
+    return None if seconds is None else round(float(seconds) / 86400, 2)
+
+
+def rejections(user_id):
+    """Count, average, fastest and slowest days from applying to rejection"""
+    days = seconds_between(events.c.occurred_at, jobs.c.date_applied) / 86400.0
+    count, average, fastest, slowest = db.session.execute(
+        select(func.count(), func.avg(days), func.min(days), func.max(days))
+        .select_from(events.join(jobs, jobs.c.id == events.c.job_id))
+        .where(
+            events.c.user_id == user_id,
+            events.c.to_status == ApplicationStatus.REJECTED,
+            jobs.c.application_status == ApplicationStatus.REJECTED,
+            jobs.c.date_applied.isnot(None),
+            events.c.occurred_at >= jobs.c.date_applied,
+        )
+    ).one()
+    return {
+        "jobs": count,
+        "average_days": round(float(average)) if average is not None else 0,
+        "fastest_days": math.floor(fastest) if fastest is not None else 0,
+        "slowest_days": math.floor(slowest) if slowest is not None else 0,
+    }
+
+
+def waiting(user_id, average_days, now):
+    """Days the open applications have waited, and their spread around
+    ``average_days``; past ``threshold_days`` an answer is unlikely"""
+    days = seconds_between(literal(now, DateTime), jobs.c.date_applied) / 86400.0
+    count, mean, mean_square = db.session.execute(
+        select(func.count(), func.avg(days), func.avg(days * days)).where(
+            jobs.c.user_id == user_id,
+            jobs.c.date_applied.isnot(None),
+            jobs.c.application_status.notin_(CLOSED_STATUSES),
+        )
+    ).one()
+    if not count:
+        return {"jobs": 0, "deviation_days": 0, "threshold_days": 0}
+    # Mean of (days - average)², expanded so it is computed in one pass
+    variance = mean_square - 2 * average_days * mean + average_days**2
+    deviation = math.sqrt(max(float(variance), 0.0))
+    return {
+        "jobs": count,
+        "deviation_days": round(deviation, 2),
+        "threshold_days": round(average_days + 2 * deviation, 2),
+    }
+
+
+def activity(user_id, now):
+    """Applications per day since the start of the year, oldest first"""
+    day = func.date(jobs.c.date_applied)
+    rows = db.session.execute(
+        select(day, func.count())
+        .where(
+            jobs.c.user_id == user_id,
+            jobs.c.date_applied >= now.replace(month=1, day=1, hour=0, minute=0),
+        )
+        .group_by(day)
+        .order_by(day)
+    ).all()
+    # A date on PostgreSQL, an ISO string on SQLite
+    return [{"date": str(date)[:10], "count": count} for date, count in rows]
+
+
+def milestones(user_id, now, upcoming_days):
+    """Jobs with a passed milestone, and those due within ``upcoming_days``"""
+    rows = db.session.execute(
+        select(
+            jobs.c.id,
+            jobs.c.company_name,
+            jobs.c.role_title,
+            jobs.c.application_status,
+            jobs.c.date_applied,
+            jobs.c.next_milestone_date,
+        )
+        .where(
+            jobs.c.user_id == user_id,
+            jobs.c.next_milestone_date.isnot(None),
+            jobs.c.next_milestone_date <= now + timedelta(days=upcoming_days),
+            jobs.c.application_status != ApplicationStatus.REJECTED,
+        )
+        .order_by(jobs.c.next_milestone_date, jobs.c.id)
+    ).all()
+    overdue, upcoming = [], []
+    for row in rows:
+        (overdue if row.next_milestone_date < now else upcoming).append(
+            {
+                "id": row.id,
+                "company_name": row.company_name,
+                "role_title": row.role_title,
+                "application_status": row.application_status.value,
+                "date_applied": (
+                    row.date_applied.isoformat() if row.date_applied else None
+                ),
+                "next_milestone_date": row.next_milestone_date.isoformat(),
+            }
+        )
+    return overdue, upcoming
+
+
+def dashboard(user_id, upcoming_days=DEFAULT_UPCOMING_DAYS, now=None):
+    """The data of every dashboard widget for one user"""
+    now = _now(now)
+    rejected = rejections(user_id)
+    overdue, upcoming = milestones(user_id, now, upcoming_days)
+    return {
+        "summary": job_stats.summary(user_id),
+        "rejections": rejected,
+        "waiting": waiting(user_id, rejected["average_days"], now),
+        "activity": activity(user_id, now),
+        "overdue": overdue,
+        "upcoming": upcoming,
+        "upcoming_days": upcoming_days,
+        "generated_at": now.isoformat(),
+    }
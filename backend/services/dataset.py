@@ -0,0 +1,536 @@
+"""Deterministic synthetic data for performance tests and benchmarks.
+
+``SyntheticDataset`` generates users, jobs, vacancy texts and files that look
+like real usage:
+
+* jobs follow a plausible status and source mix, are skewed towards recent
+  dates, and have application and milestone dates that fit their status
+* each job's status history in ``job_status_events`` leads from saving or
+  applying through some of the intermediate stages to its current status,
+  and ``user_job_stats`` holds the counters the Job events would have kept
+* most jobs have a vacancy text of a few hundred words, and some texts are
+  shared by several users who saved the same posting
+* files reference content-addressed blobs; a user attaches the same few
+  resumes to many jobs, so blob reference counts, per-user storage totals
+  and extracted file texts are all consistent
+
+The same seed and reference time always produce the same rows. Ids start at
+1, so ``load`` expects empty tables. The blob files themselves are not
+written; ``file_path`` points to where the blob store would keep them.
+
+``load`` inserts the rows with ``COPY`` on PostgreSQL (psycopg2) and with
+batched executemany elsewhere. ``scripts/seed_dataset.py`` is the command-line
+front end. The query-plan tests and the benchmarks in ``scripts/`` all seed
+their data with this module.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import random
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from models.enums import ApplicationStatus, JobSource
+from models.models import (
+    EXCERPT_LENGTH,
+    Blob,
+    File,
+    FileText,
+    Job,
+    JobStatusEvent,
+    User,
+    UserBlob,
+    UserJobStat,
+    VacancyText,
+    job_stat_keys,
+)
+from sqlalchemy import LargeBinary, text
+from werkzeug.security import generate_password_hash
+
+DEFAULT_PASSWORD = "synthetic-password"
+
+# Insert order respects foreign keys
+TABLES = [
+    User.__table__,
+    VacancyText.__table__,
+    Job.__table__,
+    JobStatusEvent.__table__,
+    UserJobStat.__table__,
+    Blob.__table__,
+    UserBlob.__table__,
+    FileText.__table__,
+    File.__table__,
+]
+
+STATUS_WEIGHTS = {
+    ApplicationStatus.NOT_YET_APPLIED: 12,
+    ApplicationStatus.APPLIED: 30,
+    ApplicationStatus.REJECTED: 27,
+    ApplicationStatus.NO_ANSWER: 6,
+    ApplicationStatus.SCREENING_CALL: 10,
+    ApplicationStatus.TEST_TASK: 6,
+    ApplicationStatus.INTERVIEW: 8,
+    ApplicationStatus.OFFER: 3,
+}
+SOURCE_WEIGHTS = {
+    JobSource.LINKEDIN: 45,
+    JobSource.COMPANY_WEBSITE: 20,
+    JobSource.INDEED: 15,
+    JobSource.REFERRAL: 8,
+    JobSource.OTHER: 12,
+}
+# The stages after APPLIED, in order; REJECTED can follow any of them
+PROGRESSION = [
+    ApplicationStatus.SCREENING_CALL,
+    ApplicationStatus.TEST_TASK,
+    ApplicationStatus.INTERVIEW,
+    ApplicationStatus.OFFER,
+]
+# Statuses with an upcoming call, task deadline or interview
+MILESTONE_STATUSES = {
+    ApplicationStatus.SCREENING_CALL,
+    ApplicationStatus.TEST_TASK,
+    ApplicationStatus.INTERVIEW,
+    ApplicationStatus.OFFER,
+}
+
+FIRST_NAMES = (
+    "Alex Anna Ben Chloe Daniel Elena Farid Grace Hugo Ines Jonas Kate Liam Maya "
+    "Nikolai Olga Pavel Quinn Rosa Sam Tara Umar Vera Will Yuki Zoe"
+).split()
+LAST_NAMES = (
+    "Adams Berg Costa Dubois Evans Fischer Garcia Horvat Ivanova Jensen Kim Lopez "
+    "Meyer Novak Olsen Petrov Rossi Silva Tanaka Usman Varga Weber Young Zielinski"
+).split()
+COMPANY_PARTS = (
+    "acme blue bright cloud core data delta ever fin flow green hyper iron lab "
+    "light metro nova open peak pixel prime quant river scale signal stack star "
+    "swift terra true vector wave"
+).split()
+COMPANY_SUFFIXES = ["", " Labs", " Systems", " Group", " Technologies", " GmbH", " Inc"]
+SENIORITY = ["Junior ", "", "", "Senior ", "Senior ", "Lead ", "Staff ", "Principal "]
+ROLES = [
+    "Backend Engineer",
+    "Frontend Engineer",
+    "Full Stack Developer",
+    "Python Developer",
+    "Data Engineer",
+    "Data Analyst",
+    "DevOps Engineer",
+    "Product Manager",
+    "QA Engineer",
+    "Machine Learning Engineer",
+    "Product Designer",
+    "Engineering Manager",
+]
+VOCABULARY = (
+    "we are looking for an experienced engineer to join our growing team you will "
+    "design build and operate services used by millions of customers requirements "
+    "include python sql distributed systems cloud infrastructure communication "
+    "skills ownership mentoring benefits remote flexible hours equity pension "
+    "responsibilities collaborate with product and design on roadmap deliver "
+    "reliable well tested code review pull requests improve observability and "
+    "performance nice to have experience with kubernetes postgres kafka react "
+    "typescript what we offer competitive salary learning budget parental leave "
+    "hybrid office in the city centre"
+).split()
+PARAGRAPHS = 400
+COMPANIES = 5000
+
+
+def _weights(mapping):
+    return list(mapping), list(accumulate(mapping.values()))
+
+
+def _digest(*parts):
+    return hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest()
+
+
+class SyntheticDataset:
+    """Generates a reproducible dataset of ``users`` users.
+
+    Args:
+        users (int): Number of users
+        jobs_per_user (int): Jobs owned by every user
+        seed (int): Seed for every random choice
+        now (datetime, optional): Reference time for all dates. Defaults to
+            midnight UTC today, so repeated runs on one day match exactly.
+        duplicate_ratio (float): Share of vacancy texts copied from a job
+            saved earlier, usually by another user
+        password (str): Password of every user
+        upload_folder (str): Used to build ``files.file_path``
+    """
+
+    def __init__(
+        self,
+        users=1000,
+        jobs_per_user=50,
+        seed=42,
+        now=None,
+        duplicate_ratio=0.1,
+        password=DEFAULT_PASSWORD,
+        upload_folder="uploads",
+    ):
+        self.users = users
+        self.jobs_per_user = jobs_per_user
+        self.seed = seed
+        self.now = now or datetime.utcnow().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.duplicate_ratio = duplicate_ratio
+        self.password = password
+        self.upload_folder = upload_folder
+        self._password_hash = None
+
+    @staticmethod
+    def email_for(user_id):
+        """Email address of the generated user with id ``user_id``"""
+        return f"user{user_id}@example.com"
+
+    @property
+    def password_hash(self):
+        # Hashing is deliberately slow, so every user shares one hash
+        if self._password_hash is None:
+            self._password_hash = generate_password_hash(self.password)
+        return self._password_hash
+
+    def _vocabulary(self, rng):
+        """Paragraphs and company names that texts are assembled from"""
+        paragraphs = [
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(30, 110)))
+            for _ in range(PARAGRAPHS)
+        ]
+        companies = [
+            rng.choice(COMPANY_PARTS).title()
+            + rng.choice(COMPANY_PARTS)
+            + rng.choice(COMPANY_SUFFIXES)
+            for _ in range(COMPANIES)
+        ]
+        return paragraphs, companies
+
+    def iter_users(self):
+        """Yield the rows of each user, one dict of table name to rows per user.
+
+        Job rows carry the full text under ``vacancy_text`` instead of the
+        ``vacancy_digest`` and ``vacancy_excerpt`` columns; ``chunks``
+        replaces it with a ``vacancy_texts`` row.
+        """
+        rng = random.Random(self.seed)
+        paragraphs, companies = self._vocabulary(rng)
+        statuses, status_weights = _weights(STATUS_WEIGHTS)
+        sources, source_weights = _weights(SOURCE_WEIGHTS)
+        recent_texts = []
+        job_id = file_id = event_id = 0
+        now = self.now
+
+        for user_id in range(1, self.users + 1):
+            joined = now - timedelta(days=rng.uniform(1, 730))
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            records = {table.name: [] for table in TABLES}
+            user = {
+                "id": user_id,
+                "email": self.email_for(user_id),
+                "password_hash": self.password_hash,
+                "first_name": first,
+                "last_name": last,
+                "is_active": True,
+                "storage_bytes": 0,
+                "created_at": joined,
+                "updated_at": joined,
+            }
+            records["users"].append(user)
+
+            # A few resumes reused across many applications
+            resumes = []
+            for number in range(rng.choice((1, 1, 2, 2, 3))):
+                digest = _digest(self.seed, user_id, "resume", number)
+                resumes.append((digest, int(rng.lognormvariate(11.5, 0.6))))
+            used_blobs = {}
+            span = (now - joined).total_seconds()
+
+            for _ in range(self.jobs_per_user):
+                job_id += 1
+                # Squaring favours recent jobs, as job searches are bursty
+                created = now - timedelta(seconds=span * rng.random() ** 2)
+                status = rng.choices(statuses, cum_weights=status_weights)[0]
+                source = rng.choices(sources, cum_weights=source_weights)[0]
+                company = rng.choice(companies)
+                role = rng.choice(SENIORITY) + rng.choice(ROLES)
+
+                applied = milestone = None
+                if status != ApplicationStatus.NOT_YET_APPLIED:
+                    applied = min(now, created + timedelta(hours=rng.uniform(0, 72)))
+                if status in MILESTONE_STATUSES:
+                    milestone = applied + timedelta(days=rng.uniform(2, 28))
+                elif applied and rng.random() < 0.05:
+                    milestone = applied + timedelta(days=14)
+                updated = min(
+                    now, (applied or created) + timedelta(days=rng.uniform(0, 20))
+                )
+
+                vacancy = None
+                roll = rng.random()
+                if recent_texts and roll < self.duplicate_ratio:
+                    vacancy = rng.choice(recent_texts)
+                elif roll < 0.85:
+                    body = "\n\n".join(rng.sample(paragraphs, rng.randint(3, 9)))
+                    vacancy = f"{role} at {company} (ref {job_id})\n\n{body}"
+                    recent_texts.append(vacancy)
+                    if len(recent_texts) > 500:
+                        recent_texts.pop(rng.randrange(500))
+
+                salary_min = salary_max = None
+                if rng.random() < 0.6:
+                    salary_min = int(round(rng.lognormvariate(11.1, 0.35), -3))
+                    salary_max = int(round(salary_min * rng.uniform(1.1, 1.4), -3))
+
+                link = None
+                if rng.random() < 0.85:
+                    link = f"https://jobs.example.com/{source.value}/{job_id}"
+
+                records["jobs"].append(
+                    {
+                        "id": job_id,
+                        "user_id": user_id,
+                        "company_name": company,
+                        "role_title": role,
+                        "vacancy_link": link,
+                        "vacancy_link_hash": Job.link_hash_for(link),
+                        "vacancy_text": vacancy,
+                        "application_status": status,
+                        "source": source,
+                        "date_applied": applied,
+                        "next_milestone_date": milestone,
+                        "salary_min": salary_min,
+                        "salary_max": salary_max,
+                        "telegram_notification_sent": False,
+                        "created_at": created,
+                        "updated_at": updated,
+                    }
+                )
+
+                # The statuses the job went through to reach its current one
+                path = []
+                if status == ApplicationStatus.NOT_YET_APPLIED or rng.random() < 0.4:
+                    path.append((ApplicationStatus.NOT_YET_APPLIED, created))
+                if applied:
+                    path.append((ApplicationStatus.APPLIED, applied))
+                    if status in PROGRESSION:
+                        depth = PROGRESSION.index(status)
+                    elif status == ApplicationStatus.REJECTED:
+                        depth = rng.choice((0, 0, 0, 1, 2, 3))
+                    else:
+                        depth = 0
+                    later = [s for s in PROGRESSION[:depth] if rng.random() < 0.6]
+                    if status != ApplicationStatus.APPLIED:
+                        later.append(status)
+                    times = sorted(
+                        applied + (updated - applied) * rng.random() for _ in later
+                    )
+                    if later:
+                        times[-1] = updated
+                    path.extend(zip(later, times))
+                previous = None
+                for to_status, occurred_at in path:
+                    event_id += 1
+                    records["job_status_events"].append(
+                        {
+                            "id": event_id,
+                            "job_id": job_id,
+                            "user_id": user_id,
+                            "from_status": previous,
+                            "to_status": to_status,
+                            "occurred_at": occurred_at,
+                        }
+                    )
+                    previous = to_status
+
+                attachments = []
+                if applied and rng.random() < 0.45:
+                    attachments.append(("resume", rng.choice(resumes)))
+                if applied and rng.random() < 0.15:
+                    digest = _digest(self.seed, job_id, "cover_letter")
+                    attachments.append(
+                        ("cover_letter", (digest, rng.randint(2_000, 40_000)))
+                    )
+                for file_type, (digest, size) in attachments:
+                    file_id += 1
+                    used_blobs.setdefault(digest, [size, 0])[1] += 1
+                    records["files"].append(
+                        {
+                            "id": file_id,
+                            "job_id": job_id,
+                            "filename": f"{file_type}-{last.lower()}.pdf",
+                            "file_path": os.path.join(
+                                self.upload_folder,
+                                "blobs",
+                                digest[:2],
+                                digest[2:4],
+                                digest,
+                            ),
+                            "file_type": file_type,
+                            "blob_digest": digest,
+                            "created_at": applied,
+                            "updated_at": applied,
+                        }
+                    )
+
+            for digest, (size, references) in used_blobs.items():
+                user["storage_bytes"] += size
+                records["blobs"].append(
+                    {
+                        "digest": digest,
+                        "size": size,
+                        "ref_count": references,
+                        "created_at": joined,
+                        "updated_at": joined,
+                    }
+                )
+                records["user_blobs"].append(
+                    {"user_id": user_id, "blob_digest": digest, "ref_count": references}
+                )
+                records["file_texts"].append(
+                    {
+                        "blob_digest": digest,
+                        "status": FileText.DONE,
+                        "content": f"{first} {last}\n\n"
+                        + "\n\n".join(rng.sample(paragraphs, 3)),
+                        "error": None,
+                        "created_at": joined,
+                        "extracted_at": joined,
+                    }
+                )
+            counters = Counter(
+                key
+                for job in records["jobs"]
+                for key in job_stat_keys(
+                    job["application_status"], job["source"], job["date_applied"]
+                )
+            )
+            records["user_job_stats"] = [
+                {"user_id": user_id, "metric": metric, "bucket": bucket, "count": n}
+                for (metric, bucket), n in sorted(counters.items())
+            ]
+            yield records
+
+    def chunks(self, users_per_chunk=500):
+        """Yield dicts of table name to insertable rows for a batch of users"""
+        seen_texts = set()
+        batch = {table.name: [] for table in TABLES}
+        for count, records in enumerate(self.iter_users(), 1):
+            for job in records["jobs"]:
+                vacancy = job.pop("vacancy_text")
+                job["vacancy_digest"] = job["vacancy_excerpt"] = None
+                if vacancy is None:
+                    continue
+                digest = VacancyText.digest_for(vacancy)
+                job["vacancy_digest"] = digest
+                job["vacancy_excerpt"] = vacancy[:EXCERPT_LENGTH]
+                if digest not in seen_texts:
+                    seen_texts.add(digest)
+                    raw = vacancy.encode("utf-8")
+                    batch["vacancy_texts"].append(
+                        {
+                            "digest": digest,
+                            "body": zlib.compress(raw, 6),
+                            "size": len(raw),
+                            "created_at": job["created_at"],
+                        }
+                    )
+            for name, rows in records.items():
+                batch[name].extend(rows)
+            if count % users_per_chunk == 0:
+                yield batch
+                batch = {table.name: [] for table in TABLES}
+        if batch["users"]:
+            yield batch
+
+
+def _copy_value(value, binary):
+    if value is None:
+        return None
+    if binary:
+        return "\\x" + value.hex()
+    return value
+
+
+def _copy_rows(conn, table, rows):
+    """Stream ``rows`` into ``table`` with COPY ... FROM STDIN"""
+    columns = list(table.columns)
+    processors = [
+        (
+            None
+            if isinstance(column.type, LargeBinary)
+            else column.type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+        )
+        for column in columns
+    ]
+    binary = [isinstance(column.type, LargeBinary) for column in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = []
+        for column, processor, is_binary in zip(columns, processors, binary):
+            value = row.get(column.key)
+            if processor is not None and value is not None:
+                value = processor(value)
+            values.append(_copy_value(value, is_binary))
+        writer.writerow(values)
+    buffer.seek(0)
+    names = ", ".join(conn.dialect.identifier_preparer.quote(c.name) for c in columns)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({names}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def load(engine, dataset, users_per_chunk=500):
+    """Insert ``dataset`` into the empty tables of ``engine``'s database.
+
+    Returns:
+        dict: Rows inserted per table
+    """
+    use_copy = engine.dialect.name == "postgresql" and engine.driver == "psycopg2"
+    counts = {table.name: 0 for table in TABLES}
+    with engine.begin() as conn:
+        for chunk in dataset.chunks(users_per_chunk):
+            for table in TABLES:
+                rows = chunk[table.name]
+                if not rows:
+                    continue
+                if use_copy:
+                    _copy_rows(conn, table, rows)
+                else:
+                    conn.execute(table.insert(), rows)
+                counts[table.name] += len(rows)
+
+        if engine.dialect.name == "postgresql":
+            # Explicit ids leave the sequences behind
+            for table in TABLES:
+                if "id" in table.c:
+                    conn.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                            f"coalesce((SELECT max(id) FROM {table.name}), 0) + 1, false)"
+                        )
+                    )
+    return counts
+
+
+def analyze(engine):
+    """Refresh planner statistics after a bulk load"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+                text("VACUUM ANALYZE")
+            )
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
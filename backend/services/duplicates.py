@@ -0,0 +1,248 @@
+"""Find jobs a user has added more than once.
+
+The same vacancy is often added twice: from a job board link carrying
+tracking parameters and again from the company site, or once as "Acme Inc"
+and once as "ACME". Two of a user's jobs are reported as duplicates when
+
+* their vacancy links are equal after ``normalize_vacancy_link``
+  (``vacancy_link``), or
+* their company names and their role titles are both similar
+  (``similar_name``): SIMILARITY_THRESHOLD or more of their trigrams are
+  shared.
+
+``trigrams`` and ``similarity`` follow pg_trgm. On PostgreSQL the candidates
+come from the ``%`` operator, served by the GIN trigram indexes on
+``company_name`` and ``role_title``, and from the
+``ix_jobs_user_id_vacancy_link_hash`` index; ``%`` matches from
+``pg_trgm.similarity_threshold`` (0.3 unless changed), below
+SIMILARITY_THRESHOLD, so it never misses a duplicate. Other databases (SQLite
+in development and tests) have no trigram index, so there the user's jobs
+are read and compared in Python. Either way candidates are scored here, so
+both report the same duplicates.
+"""
+
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from types import SimpleNamespace
+
+from extensions import db
+from models.models import Job
+from sqlalchemy import and_, or_, select
+
+SIMILARITY_THRESHOLD = 0.5
+MAX_DUPLICATES = 5
+
+jobs = Job.__table__
+# Candidates are scored on these alone; reading every column of the user's
+# jobs on SQLite would take twice as long
+MATCH_COLUMNS = (
+    jobs.c.id,
+    jobs.c.company_name,
+    jobs.c.role_title,
+    jobs.c.vacancy_link_hash,
+)
+COLUMNS = (
+    jobs.c.id,
+    jobs.c.company_name,
+    jobs.c.role_title,
+    jobs.c.vacancy_link,
+    jobs.c.application_status,
+    jobs.c.created_at,
+)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+@lru_cache(maxsize=65536)
+def trigrams(text):
+    """The set of trigrams of ``text``, as ``show_trgm`` returns them
+
+    Each alphanumeric word is lowercased and padded with two spaces in front
+    and one behind, so short words and word starts still count.
+    """
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(first, second):
+    """Shared trigrams over all trigrams of both, from 0 to 1"""
+    first, second = trigrams(first or ""), trigrams(second or "")
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def _similar(first, second):
+    return (
+        similarity(first.company_name, second.company_name) >= SIMILARITY_THRESHOLD
+        and similarity(first.role_title, second.role_title) >= SIMILARITY_THRESHOLD
+    )
+
+
+def _reasons(first, second):
+    reasons = []
+    if first.vacancy_link_hash and first.vacancy_link_hash == second.vacancy_link_hash:
+        reasons.append("vacancy_link")
+    if _similar(first, second):
+        reasons.append("similar_name")
+    return reasons
+
+
+def _serialize(row):
+    return {
+        "id": row.id,
+        "company_name": row.company_name,
+        "role_title": row.role_title,
+        "vacancy_link": row.vacancy_link,
+        "application_status": row.application_status.value,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def _load(ids):
+    """The rows of the jobs with ``ids``, by id"""
+    if not ids:
+        return {}
+    query = select(*COLUMNS).where(jobs.c.id.in_(ids))
+    return {row.id: row for row in db.session.execute(query)}
+
+
+def _has_trigram_index():
+    return db.engine.dialect.name == "postgresql"
+
+
+def _trigram_match(first, second):
+    """Both names pass pg_trgm's ``%``; served by the trigram indexes"""
+    return and_(
+        first.c.company_name.op("%")(second[0]),
+        first.c.role_title.op("%")(second[1]),
+    )
+
+
+def find_duplicates(user_id, company_name, role_title, vacancy_link=None):
+    """The user's jobs that duplicate a job with these fields, newest first
+
+    Returns:
+        list: Up to MAX_DUPLICATES jobs, each with the ``reasons`` it matched
+    """
+    job = SimpleNamespace(
+        company_name=company_name,
+        role_title=role_title,
+        vacancy_link_hash=Job.link_hash_for(vacancy_link),
+    )
+    query = select(*MATCH_COLUMNS).where(jobs.c.user_id == user_id)
+    if _has_trigram_index():
+        match = _trigram_match(jobs, (company_name, role_title))
+        if job.vacancy_link_hash:
+            match = or_(match, jobs.c.vacancy_link_hash == job.vacancy_link_hash)
+        query = query.where(match)
+
+    matches = []
+    for row in db.session.execute(query):
+        reasons = _reasons(job, row)
+        if reasons:
+            matches.append((row.id, reasons))
+    matches = sorted(matches, reverse=True)[:MAX_DUPLICATES]
+    rows = _load([job_id for job_id, _ in matches])
+    return [
+        {**_serialize(rows[job_id]), "reasons": reasons} for job_id, reasons in matches
+    ]
+
+
+def _candidate_pairs(rows):
+    """Pairs of rows sharing a link hash or similar enough company names
+
+    Counts the company trigrams each row shares with the earlier ones through
+    an inverted index, so rows without a trigram in common are never
+    compared.
+    """
+    by_hash = defaultdict(list)
+    by_gram = defaultdict(list)
+    pairs = set()
+    for index, row in enumerate(rows):
+        if row.vacancy_link_hash:
+            pairs.update((other, index) for other in by_hash[row.vacancy_link_hash])
+            by_hash[row.vacancy_link_hash].append(index)
+        grams = trigrams(row.company_name)
+        shared = Counter(other for gram in grams for other in by_gram[gram])
+        for other, count in shared.items():
+            total = len(grams) + len(trigrams(rows[other].company_name)) - count
+            if count / total >= SIMILARITY_THRESHOLD:
+                pairs.add((other, index))
+        for gram in grams:
+            by_gram[gram].append(index)
+    return [(rows[first], rows[second]) for first, second in pairs]
+
+
+def _indexed_pairs(user_id):
+    first, second = jobs.alias("first"), jobs.alias("second")
+    pairs = db.session.execute(
+        select(first.c.id, second.c.id).where(
+            first.c.user_id == user_id,
+            second.c.user_id == user_id,
+            first.c.id < second.c.id,
+            or_(
+                first.c.vacancy_link_hash == second.c.vacancy_link_hash,
+                _trigram_match(first, (second.c.company_name, second.c.role_title)),
+            ),
+        )
+    ).all()
+    if not pairs:
+        return []
+    ids = {job_id for pair in pairs for job_id in pair}
+    query = select(*MATCH_COLUMNS).where(jobs.c.id.in_(ids))
+    rows = {row.id: row for row in db.session.execute(query)}
+    return [(rows[first_id], rows[second_id]) for first_id, second_id in pairs]
+
+
+def duplicate_groups(user_id):
+    """The user's jobs that duplicate one another, grouped
+
+    Jobs are grouped transitively: if A duplicates B and B duplicates C, all
+    three form one group.
+
+    Returns:
+        list: Groups, newest first, with their ``jobs`` (oldest first) and
+        the ``reasons`` any two of them matched
+    """
+    if _has_trigram_index():
+        pairs = _indexed_pairs(user_id)
+    else:
+        rows = db.session.execute(
+            select(*MATCH_COLUMNS).where(jobs.c.user_id == user_id).order_by(jobs.c.id)
+        ).all()
+        pairs = _candidate_pairs(rows)
+    parent = {}
+
+    def root(job_id):
+        while parent.setdefault(job_id, job_id) != job_id:
+            parent[job_id] = parent[parent[job_id]]
+            job_id = parent[job_id]
+        return job_id
+
+    matches = []
+    for first, second in pairs:
+        reasons = _reasons(first, second)
+        if reasons:
+            parent[root(second.id)] = root(first.id)
+            matches.append((first.id, reasons))
+
+    rows = _load(list(parent))
+    groups = defaultdict(lambda: {"jobs": [], "reasons": set()})
+    for job_id in sorted(rows):
+        groups[root(job_id)]["jobs"].append(_serialize(rows[job_id]))
+    for job_id, reasons in matches:
+        groups[root(job_id)]["reasons"].update(reasons)
+    return sorted(
+        (
+            {"jobs": group["jobs"], "reasons": sorted(group["reasons"])}
+            for group in groups.values()
+        ),
+        key=lambda group: group["jobs"][-1]["id"],
+        reverse=True,
+    )
@@ -0,0 +1,185 @@
+import logging
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+from sqlalchemy import func
+
+logger = logging.getLogger(__name__)
+
+# Extracted text beyond this many characters is not useful for search.
+MAX_TEXT_CHARS = 1_000_000
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class UnsupportedFormat(Exception):
+    """Raised when no extractor is available for a file"""
+
+
+def _extract_txt(path):
+    with open(path, "rb") as fh:
+        return fh.read(MAX_TEXT_CHARS * 4).decode("utf-8", errors="replace")
+
+
+def _extract_docx(path):
+    paragraphs = []
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as document:
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == WORD_NS + "p":
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == WORD_NS + "t" and node.text:
+                            parts.append(node.text)
+                        elif node.tag == WORD_NS + "tab":
+                            parts.append("\t")
+                        elif node.tag in (WORD_NS + "br", WORD_NS + "cr"):
+                            parts.append("\n")
+                    paragraphs.append("".join(parts))
+                    element.clear()
+    return "\n".join(paragraphs)
+
+
+def _extract_pdf(path):
+    # Imported on first use so workers do not load pypdf at startup
+    try:
+        from pypdf import PdfReader
+    except ImportError:  # pragma: no cover - optional dependency
+        raise UnsupportedFormat("pypdf is not installed")
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+EXTRACTORS = {
+    "txt": _extract_txt,
+    "docx": _extract_docx,
+    "pdf": _extract_pdf,
+}
+
+
+def extract_text(path, filename):
+    """Extract plain text from an uploaded file.
+
+    Args:
+        path (str): Path of the stored file
+        filename (str): Original filename, used to pick the extractor
+
+    Returns:
+        str: The extracted text, truncated to ``MAX_TEXT_CHARS``
+
+    Raises:
+        UnsupportedFormat: If the file type cannot be extracted
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise UnsupportedFormat(f"No text extractor for .{extension} files")
+    return extractor(path)[:MAX_TEXT_CHARS].replace("\x00", "")
+
+
+class TextExtractor:
+    """Background pool that extracts text from uploaded blobs.
+
+    Work is keyed by blob digest: the first task to insert the ``file_texts``
+    row for a digest does the extraction, every later upload of the same
+    content is a no-op. The pool is created lazily in each process so it is
+    safe to use with forking servers.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_workers = 2
+        self._executor = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get("EXTRACTION_WORKERS", 2)
+        app.extensions["text_extractor"] = self
+
+    @property
+    def executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="text-extract"
+            )
+            self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, digest, path, filename):
+        """Queue extraction for a blob; returns immediately"""
+        if digest is None or self.max_workers <= 0:
+            return None
+        return self.executor.submit(self.run, digest, path, filename)
+
+    def run(self, digest, path, filename):
+        """Extract and store the text of one blob unless already done"""
+        from extensions import db
+        from models.models import FileText
+
+        with self.app.app_context():
+            try:
+                if not FileText.claim(digest):
+                    return
+                db.session.commit()
+
+                try:
+                    content = extract_text(path, filename)
+                    status, error = FileText.DONE, None
+                except UnsupportedFormat as e:
+                    content, status, error = None, FileText.UNSUPPORTED, str(e)
+                except Exception as e:
+                    logger.exception("Text extraction failed for %s", digest)
+                    content, status, error = None, FileText.FAILED, str(e)[:255]
+
+                file_text = db.session.get(FileText, digest)
+                file_text.content = content
+                file_text.status = status
+                file_text.error = error
+                file_text.extracted_at = datetime.utcnow()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Could not record extracted text for %s", digest)
+
+    def backfill(self, stale_after=timedelta(minutes=30)):
+        """Extract text for blobs that were never processed.
+
+        Also retries rows stuck in ``pending``, e.g. because the worker that
+        claimed them was restarted. Runs synchronously.
+
+        Returns:
+            int: Number of blobs processed
+        """
+        from extensions import db
+        from models.models import File, FileText
+
+        with self.app.app_context():
+            stale = FileText.query.filter(
+                FileText.status == FileText.PENDING,
+                FileText.created_at < datetime.utcnow() - stale_after,
+            )
+            stale.delete(synchronize_session=False)
+            db.session.commit()
+
+            # One representative File row per unprocessed digest
+            first_files = (
+                db.session.query(func.min(File.id))
+                .outerjoin(FileText, FileText.blob_digest == File.blob_digest)
+                .filter(File.blob_digest.isnot(None), FileText.blob_digest.is_(None))
+                .group_by(File.blob_digest)
+            )
+            missing = (
+                db.session.query(File.blob_digest, File.file_path, File.filename)
+                .filter(File.id.in_(first_files))
+                .all()
+            )
+
+        for digest, path, filename in missing:
+            self.run(digest, path, filename)
+        return len(missing)
@@ -0,0 +1,219 @@
+"""Live job updates for open tabs, streamed as Server-Sent Events.
+
+Every job insert, update and delete appends a ``job_changes`` row in the
+same transaction (``models/models.py``). The row ids are the SSE event ids,
+so a client that reconnects with ``Last-Event-ID`` is sent exactly the
+changes it missed, whichever worker it lands on.
+
+Streams only need to be woken up when their user's jobs change:
+
+* On PostgreSQL (psycopg2) the writing transaction sends
+  ``NOTIFY job_changes, '<user_id>'``. Each worker runs one listener thread
+  on a dedicated connection (JOB_EVENTS_LISTEN_URL, default DATABASE_URL;
+  point it past PgBouncer, which cannot relay LISTEN in transaction mode)
+  and wakes the streams of that user in its process.
+* Elsewhere (SQLite, tests) the users are published to the streams of the
+  current process after the commit, a local stand-in for NOTIFY.
+
+Streams hold no database connection while they wait. They send a comment
+every JOB_EVENTS_HEARTBEAT seconds so proxies keep them open, and re-read
+the log on each heartbeat too, so a lost notification only delays events.
+After JOB_EVENTS_MAX_SECONDS a stream ends and the client reconnects with
+``Last-Event-ID``, which keeps threads from being held forever by tabs that
+went away without closing the connection.
+"""
+
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL = 3600
+
+
+class JobEvents:
+    """Wakes the open job event streams of users whose jobs changed"""
+
+    def __init__(self, app=None, db=None):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._listener_pid = None
+        self._last_prune = 0.0
+        self.listen_url = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        self.heartbeat = app.config["JOB_EVENTS_HEARTBEAT"]
+        self.max_seconds = app.config["JOB_EVENTS_MAX_SECONDS"]
+        self.retention = timedelta(seconds=app.config["JOB_EVENTS_RETENTION"])
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name == "postgresql" and engine.driver == "psycopg2":
+            url = app.config.get("JOB_EVENTS_LISTEN_URL") or engine.url.set(
+                drivername="postgresql"
+            ).render_as_string(hide_password=False)
+            self.listen_url = url
+        app.extensions["job_events"] = self
+        if not event.contains(Session, "after_commit", self._after_commit):
+            event.listen(Session, "after_commit", self._after_commit)
+
+    def _after_commit(self, session):
+        # Only set without LISTEN/NOTIFY; see models.record_job_changes
+        user_ids = session.info.pop("changed_users", None)
+        if user_ids:
+            self.publish(user_ids)
+
+    def publish(self, user_ids):
+        """Wake the streams of ``user_ids`` in this process"""
+        with self._lock:
+            queues = [
+                q for user_id in user_ids for q in self._subscribers.get(user_id, ())
+            ]
+        for q in queues:
+            q.put_nowait(True)
+
+    def _publish_all(self):
+        with self._lock:
+            user_ids = list(self._subscribers)
+        self.publish(user_ids)
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """Queue that receives a value whenever the user's jobs change"""
+        if self.listen_url:
+            self._ensure_listener()
+        wakeups = queue.SimpleQueue()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(wakeups)
+        try:
+            yield wakeups
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id, set())
+                subscribers.discard(wakeups)
+                if not subscribers:
+                    self._subscribers.pop(user_id, None)
+
+    def _ensure_listener(self):
+        # One thread per worker; a forked worker starts its own
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(
+            target=self._listen, name="job-events-listen", daemon=True
+        ).start()
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+        from models.models import JOB_CHANGES_CHANNEL
+
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(self.listen_url)
+                connection.set_isolation_level(
+                    psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+                )
+                connection.cursor().execute(f"LISTEN {JOB_CHANGES_CHANNEL}")
+                while True:
+                    if select.select([connection], [], [], self.heartbeat)[0]:
+                        connection.poll()
+                        user_ids = {int(n.payload) for n in connection.notifies}
+                        connection.notifies.clear()
+                        self.publish(user_ids)
+            except (psycopg2.Error, OSError, ValueError) as e:
+                logger.warning("Job event listener failed, reconnecting: %s", e)
+                # Notifications may have been missed; let every stream re-read
+                self._publish_all()
+                time.sleep(1)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def changes_since(self, user_id, after_id, limit=500):
+        """The user's changes after ``after_id``, oldest first"""
+        from models.models import JobChange
+
+        return self.db.session.execute(
+            sql_select(JobChange.id, JobChange.job_id, JobChange.action)
+            .where(JobChange.user_id == user_id, JobChange.id > after_id)
+            .order_by(JobChange.id)
+            .limit(limit)
+        ).all()
+
+    def latest_id(self, user_id):
+        from models.models import JobChange
+
+        return (
+            self.db.session.scalar(
+                sql_select(func.max(JobChange.id)).where(JobChange.user_id == user_id)
+            )
+            or 0
+        )
+
+    def is_pruned(self, user_id, after_id):
+        """Whether changes of the user after ``after_id`` may have been pruned
+
+        A user's changes are pruned oldest first, so while the change
+        ``after_id`` is left none after it has gone. Otherwise changes were
+        pruned if ids are missing before the user's next change.
+        """
+        from models.models import JobChange
+
+        session = self.db.session
+        mine = JobChange.user_id == user_id
+        if session.scalar(
+            sql_select(JobChange.id).where(mine, JobChange.id == after_id)
+        ):
+            return False
+        following = session.scalar(
+            sql_select(func.min(JobChange.id)).where(mine, JobChange.id > after_id)
+        )
+        if following is None:
+            return False
+        between = session.scalar(
+            sql_select(func.count()).where(
+                JobChange.id > after_id, JobChange.id < following
+            )
+        )
+        return between < following - after_id - 1
+
+    def prune(self):
+        """Delete changes older than JOB_EVENTS_RETENTION, at most hourly
+
+        Each user's newest change is kept, so ``latest_id``, which versions
+        the job list and the dashboard, never goes back.
+        """
+        from models.models import JobChange
+
+        if time.monotonic() - self._last_prune < PRUNE_INTERVAL:
+            return
+        self._last_prune = time.monotonic()
+        table = JobChange.__table__
+        newer = table.alias()
+        newest = (
+            sql_select(func.max(newer.c.id))
+            .where(newer.c.user_id == table.c.user_id)
+            .scalar_subquery()
+        )
+        self.db.session.execute(
+            table.delete().where(
+                table.c.occurred_at < datetime.utcnow() - self.retention,
+                table.c.id < newest,
+            )
+        )
+        self.db.session.commit()
@@ -0,0 +1,124 @@
+"""Per-user job counters read by the dashboard, and their repair.
+
+``user_job_stats`` is maintained by the Job mapper events in
+``models/models.py``, in the same transaction as the change to ``jobs``, so
+reading a summary never touches ``jobs``. Anything that writes ``jobs``
+without the ORM (raw SQL, bulk loads, restores) bypasses those events;
+``check`` finds the users whose counters drifted and ``rebuild`` recomputes
+them. ``scripts/job_stats.py`` runs both from the command line.
+"""
+
+from collections import Counter
+
+from extensions import db
+from models.enums import ApplicationStatus, JobSource
+from models.models import Job, UserJobStat, job_stat_keys
+from sqlalchemy import select
+
+stats = UserJobStat.__table__
+
+
+def summary(user_id):
+    """Counts of a user's jobs by status, source and week applied"""
+    rows = db.session.execute(
+        select(stats.c.metric, stats.c.bucket, stats.c.count).where(
+            stats.c.user_id == user_id
+        )
+    ).all()
+    counters = {}
+    for metric, bucket, count in rows:
+        counters.setdefault(metric, {})[bucket] = count
+    by_status = counters.get("status", {})
+    by_source = counters.get("source", {})
+    return {
+        "total": counters.get("total", {}).get("", 0),
+        "active": counters.get("active", {}).get("", 0),
+        "by_status": {
+            status.value: by_status.get(status.value, 0) for status in ApplicationStatus
+        },
+        "by_source": {
+            source.value: by_source.get(source.value, 0) for source in JobSource
+        },
+        "applied_per_week": [
+            {"week": week, "jobs": count}
+            for week, count in sorted(counters.get("applied_week", {}).items())
+            if count
+        ],
+    }
+
+
+def expected_counts(user_ids=None, batch_size=1000):
+    """Recompute every counter from ``jobs``
+
+    Uses ``job_stat_keys`` like the mapper events, so both agree on what a
+    job counts towards.
+
+    Returns:
+        Counter: ``(user_id, metric, bucket)`` to count
+    """
+    query = select(
+        Job.user_id, Job.application_status, Job.source, Job.date_applied
+    ).execution_options(yield_per=batch_size)
+    if user_ids is not None:
+        query = query.where(Job.user_id.in_(user_ids))
+    counts = Counter()
+    for user_id, status, source, date_applied in db.session.execute(query):
+        for metric, bucket in job_stat_keys(status, source, date_applied):
+            counts[user_id, metric, bucket] += 1
+    return counts
+
+
+def stored_counts(user_ids=None):
+    """The counters as currently stored, without zero rows"""
+    query = select(stats.c.user_id, stats.c.metric, stats.c.bucket, stats.c.count)
+    if user_ids is not None:
+        query = query.where(stats.c.user_id.in_(user_ids))
+    return Counter(
+        {
+            (user_id, metric, bucket): count
+            for user_id, metric, bucket, count in db.session.execute(query)
+            if count
+        }
+    )
+
+
+def check(user_ids=None):
+    """Compare the stored counters with ``jobs``
+
+    Returns:
+        dict: User id to a list of ``(metric, bucket, stored, expected)``
+        for every counter that differs; empty when consistent
+    """
+    expected, stored = expected_counts(user_ids), stored_counts(user_ids)
+    drift = {}
+    for key in sorted(expected.keys() | stored.keys()):
+        if expected[key] != stored[key]:
+            user_id, metric, bucket = key
+            drift.setdefault(user_id, []).append(
+                (metric, bucket, stored[key], expected[key])
+            )
+    return drift
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """Replace the counters of ``user_ids`` (default: everyone) from ``jobs``
+
+    Runs in one transaction, so readers see either the old or the new
+    counters.
+
+    Returns:
+        int: Counter rows written
+    """
+    expected = expected_counts(user_ids, batch_size)
+    delete = stats.delete()
+    if user_ids is not None:
+        delete = delete.where(stats.c.user_id.in_(user_ids))
+    db.session.execute(delete)
+    rows = [
+        {"user_id": user_id, "metric": metric, "bucket": bucket, "count": count}
+        for (user_id, metric, bucket), count in sorted(expected.items())
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(stats.insert(), rows[start : start + batch_size])
+    db.session.commit()
+    return len(rows)
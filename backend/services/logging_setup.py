@@ -0,0 +1,258 @@
+"""Structured, non-blocking logging.
+
+Request threads never write log output themselves. Records are put on a queue
+(``QueueHandler``) and a background thread (``QueueListener``) formats and
+writes them, so a slow stdout or log collector does not slow down requests.
+
+Before a record is queued it passes two filters:
+
+* secrets are redacted from the message, the arguments and any ``extra``
+  fields (passwords, tokens, cookies, Authorization headers, ...)
+* DEBUG records are rate limited per logger, so turning on debug logging
+  under load cannot flood the output. Records dropped by the limit are
+  counted and reported on the next record that gets through.
+
+Configuration comes from the environment:
+
+    LOG_LEVEL           level of the root logger (default INFO)
+    LOG_LEVELS          per-logger levels, e.g.
+                        "routes.auth=DEBUG,sqlalchemy.engine=INFO"
+    LOG_FORMAT          json (default) or text
+    LOG_DEBUG_RATE      DEBUG records per second and logger (default 50,
+                        0 disables the limit)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+REDACTED = "[REDACTED]"
+SECRET_KEY_PATTERN = re.compile(
+    r"pass(word|wd)?|secret|token|authorization|cookie|api[_-]?key|credential",
+    re.IGNORECASE,
+)
+SECRET_VALUE_PATTERNS = [
+    # "password": "hunter2", password=hunter2, 'access_token': '...'
+    re.compile(
+        r"(?P<key>[\"']?[\w-]*(?:pass(?:word|wd)?|secret|token|authorization|"
+        r"cookie|api[_-]?key)[\w-]*[\"']?\s*[:=]\s*)(?P<value>\"[^\"]*\"|'[^']*'|"
+        r"(?:(?:Bearer|Basic)\s+)?[^\s,;}&]+)",
+        re.IGNORECASE,
+    ),
+    # Authorization: Bearer <token>
+    re.compile(r"(?P<key>\bBearer\s+)(?P<value>[\w.~+/=-]+)", re.IGNORECASE),
+]
+
+# Attributes every LogRecord has; everything else came in through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message",
+    "asctime",
+}
+
+
+def redact_text(text):
+    """Replace secret values in a free-form string"""
+    for pattern in SECRET_VALUE_PATTERNS:
+        text = pattern.sub(lambda m: m.group("key") + REDACTED, text)
+    return text
+
+
+def redact(value, key=None):
+    """Return ``value`` with secrets replaced, recursing into containers"""
+    if key is not None and SECRET_KEY_PATTERN.search(str(key)):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(v) for v in value)
+    if isinstance(value, str):
+        return redact_text(value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Redacts secrets from a record before it leaves the calling thread"""
+
+    def filter(self, record):
+        # Render the message here: a secret can be split between the format
+        # string ("password=%s") and its arguments
+        if record.args:
+            record.args = redact(record.args)
+        if not isinstance(record.msg, str):
+            record.msg = redact(record.msg)
+        record.msg = redact_text(record.getMessage())
+        record.args = None
+        for name in set(vars(record)) - _RECORD_ATTRIBUTES:
+            setattr(record, name, redact(getattr(record, name), name))
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Token bucket limiting DEBUG records per logger and second"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0 or record.levelno > logging.DEBUG:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, dropped = self._buckets.get(
+                record.name, (self.rate, now, 0)
+            )
+            tokens = min(self.rate, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[record.name] = (tokens, now, dropped + 1)
+                return False
+            self._buckets[record.name] = (tokens - 1, now, 0)
+        if dropped:
+            record.debug_dropped = dropped
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including ``extra`` fields"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in set(vars(record)) - _RECORD_ATTRIBUTES:
+            entry[name] = getattr(record, name)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+JsonFormatter.converter = time.gmtime
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with ``extra`` fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        extra = sorted(set(vars(record)) - _RECORD_ATTRIBUTES)
+        if extra:
+            line += " " + " ".join(f"{k}={getattr(record, k)!r}" for k in extra)
+        return line
+
+
+class StructuredQueueHandler(QueueHandler):
+    """Queues records with their message rendered but ``extra`` kept intact.
+
+    The stock handler flattens the record into a formatted string. Here only
+    the message and the traceback are rendered (the arguments and traceback
+    objects should not be used from another thread), so the listener can
+    still emit the extra fields as structured data.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def parse_levels(spec):
+    """Parse ``"name=LEVEL,other=LEVEL"`` into a dict"""
+    levels = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        if not level:
+            raise ValueError(f"LOG_LEVELS entry {item!r} is not name=LEVEL")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+_handler = None
+_listener = None
+
+
+def configure_logging(environ=os.environ, stream=None):
+    """Route all logging through a queue and apply the LOG_* settings.
+
+    Safe to call more than once (both app factories call it): later calls
+    replace the handler and listener installed by earlier ones and leave
+    handlers added by others (e.g. test frameworks) alone.
+    """
+    global _handler, _listener
+
+    formatter = (
+        TextFormatter()
+        if environ.get("LOG_FORMAT", "json").lower() == "text"
+        else JsonFormatter()
+    )
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(formatter)
+
+    handler = StructuredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(DebugSampler(float(environ.get("LOG_DEBUG_RATE", 50))))
+    handler.addFilter(RedactingFilter())
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    root.addHandler(handler)
+    root.setLevel(environ.get("LOG_LEVEL", "INFO").upper())
+    for name, level in parse_levels(environ.get("LOG_LEVELS")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _handler, _listener = handler, listener
+    listener.start()
+    return listener
+
+
+def flush_logging():
+    """Write out everything queued so far and restart the listener"""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def _restart_listener_in_child():
+    # The listener thread does not survive a fork (gunicorn --preload), and the
+    # queue's internal lock may have been held by it at fork time
+    if _listener is None:
+        return
+    _handler.queue = _listener.queue = queue.SimpleQueue()
+    _listener._thread = None
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
@@ -0,0 +1,207 @@
+"""Prometheus request metrics and the ``/metrics`` endpoint.
+
+Per request we record, labelled by HTTP method and route pattern (never the
+raw path, so ``/api/jobs/<int:job_id>`` is a single series):
+
+    jobpal_http_requests_total                  by status code
+    jobpal_http_request_duration_seconds        latency histogram
+    jobpal_http_requests_in_flight              requests being served
+    jobpal_http_request_size_bytes              request body sizes
+    jobpal_http_response_size_bytes             response body sizes
+    jobpal_db_queries_per_request               SQL statements per request
+    jobpal_db_query_seconds_per_request         SQL time per request
+
+Every gunicorn worker is its own process with its own counters. When
+PROMETHEUS_MULTIPROC_DIR is set (``gunicorn.conf.py`` does this), workers
+write their values to files in that directory and ``/metrics`` adds up the
+files of all workers, so any worker can answer a scrape. Without it (the
+development server, tests) the metrics of the current process are served.
+
+Set METRICS_TOKEN to require ``Authorization: Bearer <token>`` on scrapes.
+Without it ``/metrics`` only answers requests from this host.
+"""
+
+import hmac
+import os
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+SIZE_BUCKETS = tuple(4**n for n in range(3, 14))  # 64 B .. 64 MiB
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+UNMATCHED_ROUTE = "<unmatched>"
+LOCAL_ADDRESSES = frozenset({"127.0.0.1", "::1"})
+
+REQUESTS = Counter(
+    "jobpal_http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+LATENCY = Histogram(
+    "jobpal_http_request_duration_seconds",
+    "Time spent handling a request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "jobpal_http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+REQUEST_SIZE = Histogram(
+    "jobpal_http_request_size_bytes",
+    "Request body size",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "jobpal_http_response_size_bytes",
+    "Response body size (unknown for streamed responses)",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "jobpal_db_queries_per_request",
+    "SQL statements executed while handling a request",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "jobpal_db_query_seconds_per_request",
+    "Time spent in SQL statements while handling a request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    if has_request_context():
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    starts = conn.info.get("metrics_query_start")
+    if not starts or not has_request_context():
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    g.metrics_db_queries = g.get("metrics_db_queries", 0) + 1
+    g.metrics_db_seconds = g.get("metrics_db_seconds", 0.0) + elapsed
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    connection = context.connection
+    starts = connection.info.get("metrics_query_start") if connection else None
+    if starts and has_request_context():
+        starts.pop()
+
+
+def instrument_engine(engine):
+    """Count the statements ``engine`` runs on behalf of requests"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def scrape_allowed():
+    """Whether the request may read metrics and other operational endpoints
+
+    With METRICS_TOKEN set it must carry the token; without one only requests
+    from this host are allowed.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return request.remote_addr in LOCAL_ADDRESSES
+    return hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode(),
+    )
+
+
+def metrics_registry():
+    """Registry to scrape: all workers in multiprocess mode, else this one"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class RequestMetrics:
+    """Records request metrics and serves them at ``/metrics``"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, db=None):
+        app.extensions["request_metrics"] = self
+        app.before_request(self._start)
+        app.after_request(self._observe)
+        app.teardown_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self._metrics, methods=["GET"])
+        if db is not None:
+            with app.app_context():
+                for engine in db.engines.values():
+                    instrument_engine(engine)
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+        IN_FLIGHT.inc()
+
+    def _observe(self, response):
+        started = g.get("metrics_started")
+        if started is None:
+            return response
+        method, route = request.method, _route()
+        REQUESTS.labels(method, route, str(response.status_code)).inc()
+        LATENCY.labels(method, route).observe(time.perf_counter() - started)
+        REQUEST_SIZE.labels(method, route).observe(request.content_length or 0)
+        if response.content_length is not None:
+            RESPONSE_SIZE.labels(method, route).observe(response.content_length)
+        DB_QUERIES.labels(method, route).observe(g.get("metrics_db_queries", 0))
+        DB_SECONDS.labels(method, route).observe(g.get("metrics_db_seconds", 0.0))
+        return response
+
+    def _finish(self, exc):
+        if g.pop("metrics_started", None) is not None:
+            IN_FLIGHT.dec()
+
+    def _metrics(self):
+        if not scrape_allowed():
+            return {"error": "Unauthorized"}, 401
+        return Response(
+            generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST
+        )
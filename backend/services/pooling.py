@@ -0,0 +1,182 @@
+"""Database connection pool configuration and statistics.
+
+Pool settings are read from the environment so they can be tuned per
+deployment. Every gunicorn worker has its own pool, so a deployment opens up
+to ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` connections:
+
+    DB_POOL_SIZE        connections kept open per worker (default 5)
+    DB_MAX_OVERFLOW     extra connections allowed under load (default 10)
+    DB_POOL_TIMEOUT     seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE     reconnect connections older than this (default 1800)
+    DB_POOL_PRE_PING    test connections before use (default true)
+    DB_PGBOUNCER        set when connecting through PgBouncer in transaction
+                        pooling mode
+
+In PgBouncer mode pooling is left to PgBouncer. Connections are opened per
+checkout (``NullPool``) and server-side prepared statements are disabled,
+because consecutive transactions may run on different server connections.
+"""
+
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+_forkable_engines = weakref.WeakSet()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, max_overflow=10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # QueuePool keeps the configured limit in a private attribute only
+        self.max_overflow = max_overflow
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def _env_flag(environ, name, default):
+    value = environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def engine_options_from_env(database_url, environ=os.environ):
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` for ``database_url``.
+
+    Args:
+        database_url (str): The SQLAlchemy database URL
+        environ (Mapping): Source of the DB_* settings
+
+    Returns:
+        dict: Keyword arguments for ``create_engine``
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        # SQLite has no server connections worth pooling or tuning
+        return {}
+
+    if _env_flag(environ, "DB_PGBOUNCER", False):
+        options = {"poolclass": NullPool}
+        if url.get_driver_name() == "psycopg":
+            # psycopg 3 prepares statements automatically after a few runs.
+            # psycopg2 never uses server-side prepared statements.
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": _env_flag(environ, "DB_POOL_PRE_PING", True),
+    }
+
+
+class CheckoutCounter:
+    """Counts checked-out connections for pools without their own counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked_out = 0
+
+    def checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checked_out += 1
+
+    def checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+
+def track_checkouts(engine):
+    """Attach a ``CheckoutCounter`` to engines that do not use a QueuePool"""
+    if isinstance(engine.pool, QueuePool):
+        return
+    counter = CheckoutCounter()
+    event.listen(engine, "checkout", counter.checkout)
+    event.listen(engine, "checkin", counter.checkin)
+    # Kept on the engine: the listeners survive dispose(), the pool does not
+    engine.checkout_counter = counter
+
+
+def pool_stats(engine):
+    """Return a snapshot of the engine's connection pool.
+
+    Returns:
+        dict: Pool class, checked-out and overflow counts, and wait times
+    """
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                # Negative while fewer than pool_size connections were opened
+                "overflow": pool.overflow(),
+            }
+        )
+    else:
+        counter = getattr(engine, "checkout_counter", None)
+        stats["checked_out"] = counter.checked_out if counter else None
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(
+                {
+                    "max_overflow": pool.max_overflow,
+                    "checkouts": pool.checkouts,
+                    "timeouts": pool.timeouts,
+                    "wait_seconds_total": round(pool.wait_seconds, 6),
+                    "wait_seconds_max": round(pool.max_wait_seconds, 6),
+                }
+            )
+    return stats
+
+
+def dispose_after_fork(engine):
+    """Make forked child processes start ``engine`` with an empty pool.
+
+    With ``gunicorn --preload`` the app (and possibly pooled connections) is
+    created in the master. A connection must never be shared between
+    processes, so each child drops the inherited pool without closing the
+    parent's sockets.
+    """
+    _forkable_engines.add(engine)
+
+
+def _reset_engines_in_child():
+    for engine in list(_forkable_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_engines_in_child)
@@ -0,0 +1,282 @@
+"""On-demand CPU and memory profiling of a running worker.
+
+Disabled unless PROFILER_SECRET is set. When disabled nothing is registered:
+no request hooks, no routes, no threads. When enabled, every use needs a
+short-lived token signed with the secret, sent in the ``X-Profiler-Token``
+header (``scripts/profiler_token.py`` prints one).
+
+Per-request cProfile
+    Send the token with any request. That request runs under cProfile. The
+    stats are saved in PROFILER_OUTPUT_DIR and their name is returned in the
+    ``X-Profile-Id`` response header.
+    ``GET /api/admin/profile/requests/<id>`` shows them (``?sort=tottime``)
+    or downloads the raw pstats file (``?format=pstats``, for snakeviz etc.).
+
+Stack sampling
+    ``POST /api/admin/profile/stacks?seconds=10&interval=0.01`` starts a
+    background thread that samples the stacks of every thread in the worker
+    that served the call. ``GET /api/admin/profile/stacks/<id>`` returns the
+    result in collapsed-stack format (one ``frame;frame;frame count`` line
+    per stack), ready for flamegraph.pl or speedscope.
+
+Allocation snapshots
+    ``POST /api/admin/profile/memory/start`` starts ``tracemalloc`` in the
+    worker. ``GET /api/admin/profile/memory/snapshot`` lists the top
+    allocation sites, and with ``?diff=true`` what changed since the
+    previous snapshot. ``POST /api/admin/profile/memory/stop`` stops it.
+
+Every gunicorn worker is a separate process and admin calls reach whichever
+worker the request lands on. Responses include the worker's ``pid``.
+Sampling and tracemalloc results stay with that worker.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+from flask import Blueprint, Response, abort, g, request, send_file
+
+TOKEN_HEADER = "X-Profiler-Token"
+MAX_TOKEN_TTL = 60 * 60
+MAX_SAMPLE_SECONDS = 300
+DEFAULT_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "jobpal-profiles")
+PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+
+def _signature(secret, expires):
+    return hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def sign_token(secret, ttl=300):
+    """Return a profiler token valid for ``ttl`` seconds"""
+    expires = int(time.time()) + min(int(ttl), MAX_TOKEN_TTL)
+    return f"{expires}.{_signature(secret, expires)}"
+
+
+def verify_token(secret, token):
+    """Whether ``token`` was signed with ``secret`` and has not expired"""
+    expires, _, signature = (token or "").partition(".")
+    if not expires.isdigit():
+        return False
+    remaining = int(expires) - time.time()
+    return 0 < remaining <= MAX_TOKEN_TTL and hmac.compare_digest(
+        signature, _signature(secret, expires)
+    )
+
+
+def collapse_stack(frame):
+    """``root;...;leaf`` for a frame, in collapsed-stack notation"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """Samples every other thread's stack at a fixed interval"""
+
+    def __init__(self, seconds, interval, output_path):
+        super().__init__(name="profiler-stack-sampler", daemon=True)
+        self.seconds = seconds
+        self.interval = interval
+        self.output_path = output_path
+        self.samples = Counter()
+
+    def run(self):
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                thread = names.get(ident, str(ident)).replace(" ", "_")
+                self.samples[f"{thread};{collapse_stack(frame)}"] += 1
+            time.sleep(self.interval)
+
+        partial = f"{self.output_path}.partial"
+        with open(partial, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(partial, self.output_path)
+
+
+class Profiler:
+    """Admin-only profiling endpoints and per-request cProfile"""
+
+    def __init__(self, app=None):
+        self._sampler = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        secret = app.config.get("PROFILER_SECRET")
+        if not secret:
+            return
+        self.secret = secret
+        self.output_dir = app.config.get("PROFILER_OUTPUT_DIR") or DEFAULT_OUTPUT_DIR
+        os.makedirs(self.output_dir, exist_ok=True)
+        app.extensions["profiler"] = self
+        app.before_request(self._start_request_profile)
+        app.after_request(self._save_request_profile)
+        app.register_blueprint(self._blueprint(), url_prefix="/api/admin/profile")
+
+    def _authorized(self):
+        return verify_token(self.secret, request.headers.get(TOKEN_HEADER))
+
+    def _output_path(self, kind, profile_id):
+        if not PROFILE_ID.match(profile_id):
+            abort(404)
+        return os.path.join(self.output_dir, f"{profile_id}.{kind}")
+
+    # Per-request cProfile
+
+    def _start_request_profile(self):
+        if TOKEN_HEADER not in request.headers or request.blueprint == "profiler":
+            return
+        if not self._authorized():
+            return
+        g.cprofile = cProfile.Profile()
+        g.cprofile.enable()
+
+    def _save_request_profile(self, response):
+        profile = g.pop("cprofile", None)
+        if profile is None:
+            return response
+        profile.disable()
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        slug = re.sub(r"[^\w]+", "-", route).strip("-") or "root"
+        profile_id = f"{int(time.time())}-{os.getpid()}-{request.method}-{slug}"
+        profile_id += f"-{uuid.uuid4().hex[:6]}"
+        profile.dump_stats(self._output_path("prof", profile_id))
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    # Admin endpoints
+
+    def _blueprint(self):
+        bp = Blueprint("profiler", __name__)
+
+        @bp.before_request
+        def require_token():
+            if not self._authorized():
+                abort(404)
+
+        bp.add_url_rule(
+            "/requests/<profile_id>", view_func=self.request_profile, methods=["GET"]
+        )
+        bp.add_url_rule("/stacks", view_func=self.start_sampling, methods=["POST"])
+        bp.add_url_rule(
+            "/stacks/<profile_id>", view_func=self.sampled_stacks, methods=["GET"]
+        )
+        bp.add_url_rule("/memory/start", view_func=self.start_memory, methods=["POST"])
+        bp.add_url_rule("/memory/stop", view_func=self.stop_memory, methods=["POST"])
+        bp.add_url_rule(
+            "/memory/snapshot", view_func=self.memory_snapshot, methods=["GET"]
+        )
+        return bp
+
+    def request_profile(self, profile_id):
+        """Show or download a saved per-request profile"""
+        path = self._output_path("prof", profile_id)
+        if not os.path.exists(path):
+            abort(404)
+        if request.args.get("format") == "pstats":
+            return send_file(
+                path, as_attachment=True, download_name=f"{profile_id}.prof"
+            )
+
+        sort = request.args.get("sort", "cumulative")
+        if sort not in {key.value for key in pstats.SortKey}:
+            return {"error": f"Unknown sort key {sort!r}"}, 400
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.strip_dirs().sort_stats(sort)
+        stats.print_stats(request.args.get("limit", 50, type=int))
+        return Response(out.getvalue(), mimetype="text/plain")
+
+    def start_sampling(self):
+        """Sample this worker's stacks in the background"""
+        seconds = min(request.args.get("seconds", 10, type=float), MAX_SAMPLE_SECONDS)
+        interval = max(request.args.get("interval", 0.01, type=float), 0.001)
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive():
+                return {"error": "Already sampling", "pid": os.getpid()}, 409
+            profile_id = f"{int(time.time())}-{os.getpid()}-stacks"
+            self._sampler = StackSampler(
+                seconds, interval, self._output_path("collapsed", profile_id)
+            )
+            self._sampler.start()
+        return {"id": profile_id, "pid": os.getpid(), "seconds": seconds}, 202
+
+    def sampled_stacks(self, profile_id):
+        """Collapsed stacks of a finished sampling run"""
+        path = self._output_path("collapsed", profile_id)
+        if not os.path.exists(path):
+            return {"status": "running or unknown", "pid": os.getpid()}, 404
+        return send_file(path, mimetype="text/plain")
+
+    def start_memory(self):
+        """Start tracing allocations in this worker"""
+        frames = request.args.get("frames", 10, type=int)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._snapshot = None
+        return {"tracing": True, "pid": os.getpid()}, 200
+
+    def stop_memory(self):
+        """Stop tracing allocations in this worker"""
+        tracemalloc.stop()
+        self._snapshot = None
+        return {"tracing": False, "pid": os.getpid()}, 200
+
+    def memory_snapshot(self):
+        """Top allocation sites, or the change since the previous snapshot"""
+        if not tracemalloc.is_tracing():
+            return {"error": "tracemalloc is not running", "pid": os.getpid()}, 409
+        limit = request.args.get("limit", 25, type=int)
+        key = request.args.get("group_by", "lineno")
+        if key not in ("lineno", "filename", "traceback"):
+            return {"error": "group_by must be lineno, filename or traceback"}, 400
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        previous, self._snapshot = self._snapshot, snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        result = {"pid": os.getpid(), "traced_bytes": current, "peak_bytes": peak}
+
+        if request.args.get("diff") == "true":
+            if previous is None:
+                return {**result, "error": "No previous snapshot to compare"}, 409
+            result["diff"] = [
+                {
+                    "site": str(stat.traceback),
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                }
+                for stat in snapshot.compare_to(previous, key)[:limit]
+            ]
+        else:
+            result["top"] = [
+                {"site": str(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics(key)[:limit]
+            ]
+        return result, 200
@@ -0,0 +1,183 @@
+"""Per-request SQL statement profiling and query budgets.
+
+When QUERY_PROFILER is enabled, every statement a request executes is
+recorded. After the request a warning is logged when:
+
+* the same SQL statement ran QUERY_REPEAT_THRESHOLD times or more, which is
+  almost always an N+1 pattern: a lazy relationship (``job.files``,
+  ``job.user``) loaded once per row instead of once per request
+* the request ran more than QUERY_BUDGET statements
+
+Each warning includes the application stack that issued the statement, so
+the offending line can be found from the log alone. The statement count is
+also returned in an ``X-Query-Count`` response header. When the profiler is
+off, nothing is hooked into the engines.
+
+``query_budget`` is the same recording as a context manager, for tests.
+"""
+
+import contextlib
+import logging
+import os
+import traceback
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENT_PREVIEW = 500
+
+
+def _application_stack():
+    """The caller's stack, limited to frames in this application"""
+    return [
+        f"{os.path.relpath(frame.filename, APP_ROOT)}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(APP_ROOT)
+        and "site-packages" not in frame.filename
+        and frame.filename != os.path.abspath(__file__)
+    ]
+
+
+class QueryLog:
+    """Statements executed while recording"""
+
+    def __init__(self, repeat_threshold=5):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.statements = Counter()
+        self.stacks = {}
+
+    def record(self, statement):
+        self.count += 1
+        self.statements[statement] += 1
+        if self.statements[statement] == self.repeat_threshold:
+            self.stacks[statement] = _application_stack()
+
+    def repeated(self):
+        """``(statement, count)`` pairs at or above the repeat threshold"""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= self.repeat_threshold
+        ]
+
+    def report(self):
+        """Human-readable summary, most frequent statements first"""
+        lines = [f"{self.count} statements"]
+        for statement, count in self.statements.most_common():
+            lines.append(f"  {count}x {' '.join(statement.split())[:200]}")
+            for frame in self.stacks.get(statement, ()):
+                lines.append(f"       {frame}")
+        return "\n".join(lines)
+
+
+def _listen(engines, callback):
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", callback)
+
+
+def _remove(engines, callback):
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", callback)
+
+
+@contextlib.contextmanager
+def query_budget(max_queries, engines, repeat_threshold=None):
+    """Fail if the block runs more than ``max_queries`` statements.
+
+    Args:
+        max_queries (int): Highest acceptable number of statements
+        engines (Iterable[Engine]): Engines to watch, e.g.
+            ``db.engines.values()``
+        repeat_threshold (int, optional): Also fail when one statement runs
+            this many times
+
+    Yields:
+        QueryLog: The statements recorded so far
+    """
+    engines = list(engines)
+    log = QueryLog(repeat_threshold or max_queries + 1)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        log.record(statement)
+
+    _listen(engines, record)
+    try:
+        yield log
+    finally:
+        _remove(engines, record)
+    if log.count > max_queries:
+        raise AssertionError(
+            f"Expected at most {max_queries} statements, got {log.report()}"
+        )
+    if repeat_threshold and log.repeated():
+        raise AssertionError(f"Repeated statements (N+1?): {log.report()}")
+
+
+class QueryProfiler:
+    """Logs requests that exceed the query budget or repeat statements"""
+
+    def __init__(self, app=None):
+        self.budget = 0
+        self.repeat_threshold = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, db=None):
+        app.extensions["query_profiler"] = self
+        if not app.config.get("QUERY_PROFILER"):
+            return
+        self.budget = app.config.get("QUERY_BUDGET", 0)
+        self.repeat_threshold = app.config.get("QUERY_REPEAT_THRESHOLD", 5)
+        app.before_request(self._start)
+        app.after_request(self._report)
+        if db is not None:
+            with app.app_context():
+                engines = list(db.engines.values())
+            _listen(engines, self._record)
+
+    def _start(self):
+        g.query_log = QueryLog(self.repeat_threshold)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            log = g.get("query_log")
+            if log is not None:
+                log.record(statement)
+
+    def _report(self, response):
+        log = g.pop("query_log", None)
+        if log is None:
+            return response
+        response.headers["X-Query-Count"] = str(log.count)
+        route = request.url_rule.rule if request.url_rule else request.path
+        for statement, count in log.repeated():
+            logger.warning(
+                "Statement repeated %d times in %s %s (possible N+1)",
+                count,
+                request.method,
+                route,
+                extra={
+                    "statement": statement[:STATEMENT_PREVIEW],
+                    "stack": log.stacks.get(statement, []),
+                },
+            )
+        if self.budget and log.count > self.budget:
+            logger.warning(
+                "%s %s ran %d statements (budget %d)",
+                request.method,
+                route,
+                log.count,
+                self.budget,
+                extra={
+                    "statements": [
+                        [count, statement[:STATEMENT_PREVIEW]]
+                        for statement, count in log.statements.most_common(5)
+                    ]
+                },
+            )
+        return response
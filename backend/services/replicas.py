@@ -0,0 +1,139 @@
+"""Route read-only requests to read replicas.
+
+Replicas are configured with DATABASE_REPLICA_URLS, a comma-separated list
+of database URLs. Each URL becomes a ``replica_<n>`` bind. ``GET``, ``HEAD``
+and ``OPTIONS`` requests read from a randomly chosen replica. All other
+requests, work outside a request (background threads, scripts) and every
+INSERT, UPDATE, DELETE or flush use the primary.
+
+Replicas lag behind the primary. After a user's own successful write, their
+reads stay on the primary for DB_REPLICA_STICKY_SECONDS, so they always see
+what they just changed. The deadline is kept in a cookie, so it works no
+matter which worker serves the next request. It is also kept per user in
+process memory for clients that do not send cookies.
+"""
+
+import random
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_PREFIX = "replica_"
+STICKY_COOKIE = "jobpal_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+MAX_TRACKED_USERS = 10_000
+
+
+def replica_binds(urls, engine_options=None):
+    """Build ``SQLALCHEMY_BINDS`` entries for a comma-separated URL list.
+
+    Args:
+        urls (str): Replica database URLs, separated by commas
+        engine_options (Callable[[str], dict], optional): Returns the engine
+            options for a URL
+
+    Returns:
+        dict: Bind key to engine configuration
+    """
+    binds = {}
+    for index, url in enumerate(u.strip() for u in (urls or "").split(",")):
+        if not url:
+            continue
+        options = engine_options(url) if engine_options else {}
+        binds[f"{REPLICA_BIND_PREFIX}{index}"] = {"url": url, **options}
+    return binds
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica chosen for the request"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+            and has_request_context()
+        ):
+            replica_key = g.get("db_replica")
+            if replica_key is not None:
+                return self._db.engines[replica_key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Chooses primary or replica per request and tracks read-your-writes"""
+
+    def __init__(self, app=None):
+        self.replica_keys = []
+        self.sticky_seconds = 0
+        self._primary_until = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.replica_keys = sorted(
+            key
+            for key in app.config.get("SQLALCHEMY_BINDS", {})
+            if key.startswith(REPLICA_BIND_PREFIX)
+        )
+        self.sticky_seconds = app.config.get("DB_REPLICA_STICKY_SECONDS", 10)
+        self.cookie_secure = app.config.get("JWT_COOKIE_SECURE", False)
+        app.extensions["replica_router"] = self
+        if self.replica_keys:
+            app.before_request(self._choose_bind)
+            app.after_request(self._remember_write)
+
+    def _current_user_id(self):
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+        try:
+            verify_jwt_in_request(optional=True)
+            return get_jwt_identity()
+        except Exception:
+            # The view reports bad tokens itself
+            return None
+
+    def _is_pinned(self):
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        user_id = self._current_user_id()
+        if user_id is None:
+            return False
+        with self._lock:
+            return self._primary_until.get(user_id, 0) > time.time()
+
+    def _choose_bind(self):
+        if request.method in SAFE_METHODS and not self._is_pinned():
+            g.db_replica = random.choice(self.replica_keys)
+
+    def _remember_write(self, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return response
+        until = time.time() + self.sticky_seconds
+        user_id = self._current_user_id()
+        if user_id is not None:
+            with self._lock:
+                if len(self._primary_until) >= MAX_TRACKED_USERS:
+                    now = time.time()
+                    self._primary_until = {
+                        key: value
+                        for key, value in self._primary_until.items()
+                        if value > now
+                    }
+                self._primary_until[user_id] = until
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(int(until) + 1),
+            max_age=self.sticky_seconds + 1,
+            httponly=True,
+            samesite="Lax",
+            secure=self.cookie_secure,
+        )
+        return response
@@ -0,0 +1,133 @@
+"""Startup check that the database schema matches the migrations.
+
+Workers used to run ``db.create_all()`` on every boot. That costs a round
+trip per table and cannot apply changes to tables that already exist. The
+schema is owned by the Alembic migrations in ``backend/migrations``
+(``flask db upgrade``). At startup we only compare the revision stored in
+``alembic_version`` with the newest migration.
+
+DB_SCHEMA_CHECK selects what happens at startup:
+
+    off     do nothing
+    warn    log a warning if the database is not at the newest revision
+    strict  refuse to start if the database is not at the newest revision
+            (the default)
+    create  run ``db.create_all()`` (local development and tests)
+
+``flask db`` itself builds the app, so it is run with DB_SCHEMA_CHECK=off;
+the container's start.sh does that before starting gunicorn. Databases built
+by ``create_all()`` have no ``alembic_version`` row and must be stamped with
+the initial revision first::
+
+    DB_SCHEMA_CHECK=off flask db stamp 4b1d6c2e9a01
+    DB_SCHEMA_CHECK=off flask db upgrade
+"""
+
+import logging
+import os
+
+import click
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+SCHEMA_CHECK_MODES = {"off", "warn", "strict", "create"}
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised in strict mode when the database needs ``flask db upgrade``"""
+
+
+class LazyMigrateCommands(click.Group):
+    """The ``flask db`` command group, loaded on first use.
+
+    Flask-Migrate imports Alembic, which workers never need. The real group
+    from ``flask_migrate.cli`` is only imported when a ``flask db`` command is
+    listed or run.
+    """
+
+    def __init__(self, db):
+        super().__init__(name="db", help="Perform database migrations.")
+        self.db = db
+
+    def _commands(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli_group
+
+        if "migrate" not in current_app.extensions:
+            Migrate(current_app, self.db)
+        return db_cli_group
+
+    def list_commands(self, ctx):
+        return self._commands().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands().get_command(ctx, name)
+
+
+def migration_heads(directory=MIGRATIONS_DIR):
+    """Return the head revision(s) of the migration scripts"""
+    # Alembic is only imported here, so workers that skip the check never
+    # pay for it
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", directory)
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def database_revisions(engine):
+    """Return the revision(s) recorded in ``alembic_version``"""
+    with engine.connect() as conn:
+        try:
+            return {
+                row[0]
+                for row in conn.execute(text("SELECT version_num FROM alembic_version"))
+            }
+        except SQLAlchemyError:
+            return set()
+
+
+def check_schema(app, db, mode):
+    """Apply the DB_SCHEMA_CHECK ``mode`` for ``app``.
+
+    Connections opened for the check are returned to the pool and the pool
+    is disposed afterwards, so a preloading server does not hand them to
+    forked workers.
+    """
+    if mode not in SCHEMA_CHECK_MODES:
+        raise ValueError(f"DB_SCHEMA_CHECK must be one of {sorted(SCHEMA_CHECK_MODES)}")
+    if mode == "off":
+        return
+
+    with app.app_context():
+        try:
+            if mode == "create":
+                # Only the primary; replicas receive the schema by replication
+                db.create_all(bind_key=None)
+                return
+
+            try:
+                current = database_revisions(db.engine)
+            except SQLAlchemyError as e:
+                if mode == "strict":
+                    raise
+                logger.warning("Could not check the database schema: %s", e)
+                return
+            heads = migration_heads()
+            if current == heads:
+                return
+            message = (
+                f"Database schema is at {sorted(current) or 'no revision'}, "
+                f"migrations are at {sorted(heads)}; "
+                "run `DB_SCHEMA_CHECK=off flask db upgrade`"
+            )
+            if mode == "strict":
+                raise SchemaOutOfDate(message)
+            logger.warning(message)
+        finally:
+            db.engine.dispose()
@@ -0,0 +1,225 @@
+"""Mark applications that never got a reply as NO_ANSWER.
+
+Most of a user's rejections arrive within some number of days of applying;
+an application still waiting far beyond that will most likely never hear
+back. Each user's threshold comes from their own rejected jobs, as the mean
+plus two standard deviations of the days from ``date_applied`` to the
+REJECTED event, and is never below ``min_days``. Users with fewer than
+``min_samples`` rejections fall back to ``default_days``. Only jobs still in
+APPLIED are swept; anything further along has had an answer.
+
+Users are handled in batches of ids. Per batch, the thresholds and the stale
+jobs are computed in SQL and changed with one ``UPDATE ... RETURNING``. A
+set-based UPDATE bypasses the Job mapper events, so the returned rows are
+recorded in ``job_status_events``, ``user_job_stats`` and ``job_changes``
+explicitly, in the same transaction.
+
+The comparison avoids a square root, which SQLite lacks:
+``age > mean + 2 * sd`` is ``age > mean and (age - mean)² > 4 * variance``.
+
+``scripts/sweep_no_answer.py`` runs the sweep from cron or as a loop.
+"""
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import (
+    Job,
+    JobChange,
+    JobStatusEvent,
+    User,
+    adjust_job_stats,
+    job_stat_keys,
+    record_job_changes,
+)
+from prometheus_client import Counter as CounterMetric
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import DateTime, and_, func, literal, or_, select
+
+from .analytics import seconds_between
+
+logger = logging.getLogger(__name__)
+
+SWEPT = CounterMetric(
+    "jobpal_no_answer_jobs_total",
+    "Jobs found stale by the NO_ANSWER sweeper (mode=dry_run when not changed)",
+    ["mode"],
+)
+SWEEP_SECONDS = Histogram(
+    "jobpal_no_answer_sweep_seconds",
+    "Duration of a full NO_ANSWER sweep",
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900),
+)
+LAST_SWEEP = Gauge(
+    "jobpal_no_answer_last_sweep_timestamp_seconds",
+    "When the last NO_ANSWER sweep finished",
+    multiprocess_mode="max",
+)
+
+jobs = Job.__table__
+events = JobStatusEvent.__table__
+users = User.__table__
+
+
+def _days(later, earlier):
+    return seconds_between(later, earlier) / 86400.0
+
+
+def _thresholds(user_ids):
+    """Per user: rejections, and mean and mean square of days to rejection"""
+    days = _days(events.c.occurred_at, jobs.c.date_applied)
+    return (
+        select(
+            events.c.user_id,
+            func.count().label("samples"),
+            func.avg(days).label("mean"),
+            func.avg(days * days).label("mean_square"),
+        )
+        .select_from(events.join(jobs, jobs.c.id == events.c.job_id))
+        .where(
+            events.c.user_id.in_(user_ids),
+            events.c.to_status == ApplicationStatus.REJECTED,
+            jobs.c.date_applied.isnot(None),
+        )
+        .group_by(events.c.user_id)
+        .subquery("thresholds")
+    )
+
+
+def stale_jobs(user_ids, now, min_days, default_days, min_samples):
+    """Select of the ids of the given users' jobs that are past threshold"""
+    # Aliased so the select does not correlate with an UPDATE of jobs
+    stale = jobs.alias("stale")
+    thresholds = _thresholds(user_ids)
+    age = _days(literal(now, DateTime), stale.c.date_applied)
+    mean = thresholds.c.mean
+    variance = thresholds.c.mean_square - mean * mean
+    samples = func.coalesce(thresholds.c.samples, 0)
+    return (
+        select(stale.c.id)
+        .select_from(
+            stale.outerjoin(thresholds, thresholds.c.user_id == stale.c.user_id)
+        )
+        .where(
+            stale.c.user_id.in_(user_ids),
+            stale.c.application_status == ApplicationStatus.APPLIED,
+            stale.c.date_applied.isnot(None),
+            age > min_days,
+            or_(
+                and_(
+                    samples >= min_samples,
+                    age > mean,
+                    (age - mean) * (age - mean) > 4 * variance,
+                ),
+                and_(samples < min_samples, age > default_days),
+            ),
+        )
+    )
+
+
+def _record_swept(rows, now):
+    """Write the history, counters and change log the Job events would have
+    written"""
+    db.session.execute(
+        events.insert(),
+        [
+            {
+                "job_id": job_id,
+                "user_id": user_id,
+                "from_status": ApplicationStatus.APPLIED,
+                "to_status": ApplicationStatus.NO_ANSWER,
+                "occurred_at": now,
+            }
+            for job_id, user_id in rows
+        ],
+    )
+    # Source and week applied are unchanged, so only status counters move
+    before = Counter(job_stat_keys(ApplicationStatus.APPLIED, None, None))
+    after = Counter(job_stat_keys(ApplicationStatus.NO_ANSWER, None, None))
+    deltas = {}
+    for user_id, count in Counter(user_id for _, user_id in rows).items():
+        for key in before | after:
+            deltas[(user_id, *key)] = (after[key] - before[key]) * count
+    adjust_job_stats(db.session.connection(), deltas)
+    record_job_changes(
+        db.session,
+        [(user_id, job_id, JobChange.UPDATED) for job_id, user_id in rows],
+    )
+
+
+def sweep(
+    batch_size=500,
+    min_days=14,
+    default_days=30,
+    min_samples=3,
+    dry_run=False,
+    now=None,
+):
+    """Mark every user's stale applications as NO_ANSWER
+
+    Args:
+        batch_size (int): Users per batch, i.e. per UPDATE and transaction
+        min_days (float): Never sweep an application younger than this
+        default_days (float): Threshold for users with too few rejections
+        min_samples (int): Rejections needed for a per-user threshold
+        dry_run (bool): Only count the jobs that would be changed
+
+    Returns:
+        Counter: Users and batches processed, and jobs (that would be) swept
+    """
+    now = now or datetime.utcnow()
+    stats = Counter()
+    started = time.monotonic()
+    last_id = 0
+    while True:
+        user_ids = db.session.scalars(
+            select(users.c.id)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(batch_size)
+        ).all()
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+        stale = stale_jobs(user_ids, now, min_days, default_days, min_samples)
+
+        if dry_run:
+            count = db.session.scalar(
+                select(func.count()).select_from(stale.subquery())
+            )
+            db.session.rollback()
+        else:
+            rows = db.session.execute(
+                jobs.update()
+                .where(
+                    jobs.c.id.in_(stale),
+                    # Re-checked against rows changed by concurrent edits
+                    jobs.c.application_status == ApplicationStatus.APPLIED,
+                )
+                .values(application_status=ApplicationStatus.NO_ANSWER, updated_at=now)
+                .returning(jobs.c.id, jobs.c.user_id)
+            ).all()
+            if rows:
+                _record_swept(rows, now)
+            db.session.commit()
+            count = len(rows)
+
+        SWEPT.labels("dry_run" if dry_run else "applied").inc(count)
+        stats["users"] += len(user_ids)
+        stats["batches"] += 1
+        stats["jobs"] += count
+
+    elapsed = time.monotonic() - started
+    SWEEP_SECONDS.observe(elapsed)
+    LAST_SWEEP.set_to_current_time()
+    logger.info(
+        "NO_ANSWER sweep finished in %.1fs%s: %s",
+        elapsed,
+        " (dry run)" if dry_run else "",
+        dict(stats),
+    )
+    return stats
@@ -0,0 +1,343 @@
+"""Garbage collection of upload bytes that no row references any more.
+
+Deleting a File only decrements its blob's reference count. This module
+reclaims blobs that have stayed unreferenced for a grace period, blob files
+without a row at all, stale temporary and partial files and vacancy texts
+that no job points at any more. Legacy uploads stored directly in
+UPLOAD_FOLDER are only collected on request (``legacy_files``). Both the
+database and the filesystem are walked in bounded batches, so memory use does
+not grow with the number of uploads.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from . import uploads
+
+logger = logging.getLogger(__name__)
+
+
+def _graveyard_path(blobs, digest):
+    return os.path.join(blobs.tmp_dir, f"{digest}.gc")
+
+
+def _bury(blobs, digest, cutoff_ts):
+    """Move a blob file aside if it has not been touched since the cutoff.
+
+    Renaming first means an upload of the same content that races with the
+    collector either refreshed the mtime before the rename (and the file is
+    put back) or finds no file afterwards and writes a fresh copy.
+
+    Returns:
+        str or None: Path of the moved file, or None if it was kept
+    """
+    path = blobs.path_for(digest)
+    grave = _graveyard_path(blobs, digest)
+    os.makedirs(blobs.tmp_dir, exist_ok=True)
+    try:
+        os.rename(path, grave)
+    except FileNotFoundError:
+        return None
+    if os.stat(grave).st_mtime >= cutoff_ts:
+        _resurrect(blobs, digest)
+        return None
+    return grave
+
+
+def _resurrect(blobs, digest):
+    grave = _graveyard_path(blobs, digest)
+    path = blobs.path_for(digest)
+    if os.path.exists(path):
+        os.unlink(grave)
+    else:
+        os.rename(grave, path)
+
+
+def collect_unreferenced_blobs(blobs, cutoff, batch_size, dry_run, stats):
+    """Delete blob rows and files whose ref_count stayed at zero past ``cutoff``"""
+    from extensions import db
+    from models.models import Blob, FileText
+
+    last_digest = ""
+    while True:
+        candidates = (
+            db.session.query(Blob.digest, Blob.size)
+            .filter(
+                Blob.ref_count <= 0,
+                Blob.updated_at < cutoff,
+                Blob.digest > last_digest,
+            )
+            .order_by(Blob.digest)
+            .limit(batch_size)
+            .all()
+        )
+        db.session.commit()
+        if not candidates:
+            return
+        last_digest = candidates[-1].digest
+
+        for digest, size in candidates:
+            if dry_run:
+                stats["blobs"] += 1
+                stats["bytes"] += size
+                continue
+
+            grave = _bury(blobs, digest, cutoff.timestamp())
+            if grave is None and os.path.exists(blobs.path_for(digest)):
+                continue
+
+            FileText.query.filter_by(blob_digest=digest).delete()
+            # Re-check under the row lock: a new File may have linked the blob
+            deleted = (
+                Blob.query.filter(
+                    Blob.digest == digest,
+                    Blob.ref_count <= 0,
+                    Blob.updated_at < cutoff,
+                ).delete()
+                == 1
+            )
+            if deleted:
+                db.session.commit()
+                if grave is not None:
+                    os.unlink(grave)
+                stats["blobs"] += 1
+                stats["bytes"] += size
+            else:
+                db.session.rollback()
+                if grave is not None:
+                    _resurrect(blobs, digest)
+
+
+def collect_orphaned_blob_files(blobs, cutoff, batch_size, dry_run, stats):
+    """Delete blob files on disk that have no ``blobs`` row"""
+    from extensions import db
+    from models.models import Blob
+
+    def flush(batch):
+        known = set(
+            db.session.scalars(
+                select(Blob.digest).where(Blob.digest.in_([d for d, _ in batch]))
+            )
+        )
+        db.session.commit()
+        for digest, path in batch:
+            if digest in known:
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if st.st_mtime >= cutoff.timestamp():
+                continue
+            if not dry_run:
+                grave = _bury(blobs, digest, cutoff.timestamp())
+                if grave is None:
+                    continue
+                os.unlink(grave)
+            stats["orphan_files"] += 1
+            stats["bytes"] += st.st_size
+
+    batch = []
+    for digest, path in blobs.iter_blobs():
+        batch.append((digest, path))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+
+def collect_stale_scratch_files(blobs, cutoff, dry_run, stats):
+    """Delete abandoned temp files and partial uploads without a session"""
+    from extensions import db
+    from models.models import UploadSession
+
+    cutoff_ts = cutoff.timestamp()
+    for directory in (blobs.tmp_dir, blobs.partial_dir):
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat()
+                if st.st_mtime >= cutoff_ts:
+                    continue
+                if directory == blobs.partial_dir:
+                    upload_id = entry.name.split(".", 1)[0]
+                    if db.session.get(UploadSession, upload_id) is not None:
+                        continue
+                if not dry_run:
+                    os.unlink(entry.path)
+                stats["scratch_files"] += 1
+                stats["bytes"] += st.st_size
+    db.session.commit()
+
+
+def _legacy_file_names(batch_size):
+    """Base names of the files that File rows from before the blob store use
+
+    Those rows stored ``os.path.join(UPLOAD_FOLDER, filename)`` with whatever
+    UPLOAD_FOLDER was then, often a relative path, so only the name is
+    compared. No new legacy rows are written, so the set stays bounded.
+    """
+    from extensions import db
+    from models.models import File
+
+    names = set()
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(File.id, File.file_path)
+            .where(File.blob_digest.is_(None), File.id > last_id)
+            .order_by(File.id)
+            .limit(batch_size)
+        ).all()
+        db.session.commit()
+        if not rows:
+            return names
+        last_id = rows[-1].id
+        names.update(os.path.basename(path) for _, path in rows)
+
+
+def collect_legacy_files(blobs, cutoff, batch_size, dry_run, stats):
+    """Delete pre-blob-store uploads in UPLOAD_FOLDER that no File references"""
+    referenced = _legacy_file_names(batch_size)
+    cutoff_ts = cutoff.timestamp()
+    try:
+        entries = os.scandir(blobs.root)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if entry.name in referenced:
+                continue
+            st = entry.stat()
+            if st.st_mtime >= cutoff_ts:
+                continue
+            if not dry_run:
+                os.unlink(entry.path)
+            stats["legacy_files"] += 1
+            stats["bytes"] += st.st_size
+
+
+def collect_unreferenced_vacancy_texts(cutoff, batch_size, dry_run, stats):
+    """Delete stored vacancy texts that no job points at any more"""
+    from extensions import db
+    from models.models import Job, VacancyText
+
+    unreferenced = (
+        select(VacancyText.digest)
+        .where(
+            VacancyText.created_at < cutoff,
+            ~select(Job.id).where(Job.vacancy_digest == VacancyText.digest).exists(),
+        )
+        .order_by(VacancyText.digest)
+    )
+    last_digest = ""
+    while True:
+        digests = list(
+            db.session.scalars(
+                unreferenced.where(VacancyText.digest > last_digest).limit(batch_size)
+            )
+        )
+        if not digests:
+            db.session.commit()
+            return
+        last_digest = digests[-1]
+        if not dry_run:
+            # Re-check in the DELETE itself: a job may have linked the text
+            db.session.execute(
+                VacancyText.__table__.delete().where(
+                    VacancyText.digest.in_(digests),
+                    ~select(Job.id)
+                    .where(Job.vacancy_digest == VacancyText.digest)
+                    .exists(),
+                )
+            )
+        db.session.commit()
+        stats["vacancy_texts"] += len(digests)
+
+
+def collect_garbage(
+    grace=timedelta(hours=24), batch_size=500, dry_run=False, legacy_files=False
+):
+    """Run every collection pass once.
+
+    Args:
+        grace (timedelta): Minimum time something must have been unreferenced
+        batch_size (int): Rows or directory entries handled per query
+        dry_run (bool): Only count what would be deleted
+        legacy_files (bool): Also delete files directly in UPLOAD_FOLDER that
+            no File row names. Off by default: run it with ``dry_run`` first
+            to check the result, since those files have no digest to verify.
+
+    Returns:
+        Counter: Items and bytes reclaimed per category
+    """
+    from flask import current_app
+
+    blobs = current_app.extensions["blobstore"]
+    cutoff = datetime.utcnow() - grace
+    stats = Counter()
+    started = time.monotonic()
+
+    if not dry_run:
+        stats["upload_sessions"] = uploads.purge_stale_sessions(
+            timedelta(seconds=current_app.config["UPLOAD_SESSION_TTL"])
+        )
+    collect_unreferenced_blobs(blobs, cutoff, batch_size, dry_run, stats)
+    collect_orphaned_blob_files(blobs, cutoff, batch_size, dry_run, stats)
+    collect_stale_scratch_files(blobs, cutoff, dry_run, stats)
+    if legacy_files:
+        collect_legacy_files(blobs, cutoff, batch_size, dry_run, stats)
+    collect_unreferenced_vacancy_texts(cutoff, batch_size, dry_run, stats)
+
+    logger.info(
+        "Upload GC finished in %.1fs%s: %s",
+        time.monotonic() - started,
+        " (dry run)" if dry_run else "",
+        dict(stats),
+    )
+    return stats
+
+
+def rebuild_storage_totals():
+    """Recompute ``user_blobs`` and ``users.storage_bytes`` from scratch.
+
+    The totals are normally maintained incrementally by File events; this
+    repairs drift, e.g. after rows were changed with raw SQL.
+    """
+    from extensions import db
+    from models.models import Blob, File, Job, User, UserBlob
+
+    db.session.query(UserBlob).delete()
+    db.session.execute(
+        UserBlob.__table__.insert().from_select(
+            ["user_id", "blob_digest", "ref_count"],
+            select(Job.user_id, File.blob_digest, func.count(File.id))
+            .join(Job, File.job_id == Job.id)
+            .where(File.blob_digest.isnot(None))
+            .group_by(Job.user_id, File.blob_digest),
+        )
+    )
+    usage = (
+        select(func.coalesce(func.sum(Blob.size), 0))
+        .select_from(UserBlob)
+        .join(Blob, Blob.digest == UserBlob.blob_digest)
+        .where(UserBlob.user_id == User.id)
+        .scalar_subquery()
+    )
+    db.session.query(User).update(
+        {User.storage_bytes: usage}, synchronize_session=False
+    )
+    db.session.commit()
@@ -0,0 +1,214 @@
+"""Chunk handling for resumable uploads.
+
+The partial file on disk is the source of truth for how much of an upload has
+been received, so any worker can accept the next chunk. Each worker keeps the
+running sha256 of the uploads it has seen in memory; if the next chunk lands on
+a different worker the hash is simply recomputed from disk when the upload is
+completed.
+
+Writing a chunk and completing an upload both hold an exclusive ``flock`` on
+the partial file (``locked``), so a chunk can never land while the upload is
+hashed and moved into the blob store.
+"""
+
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+CHUNK_SIZE = 64 * 1024
+MAX_CACHED_HASHERS = 256
+PURGE_INTERVAL = 600  # seconds between opportunistic stale-session sweeps
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+_last_purge = 0.0
+
+
+class ChunkConflict(Exception):
+    """Raised when a chunk does not start at the current upload offset"""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected chunk at offset {offset}")
+        self.offset = offset
+
+
+class UploadBusy(Exception):
+    """Raised when another request is writing to the same upload"""
+
+
+class UploadTooLarge(Exception):
+    """Raised when a chunk runs past the declared upload size"""
+
+
+class UploadClosed(Exception):
+    """Raised when the upload was completed or discarded while being opened"""
+
+
+def _take_hasher(upload_id, offset):
+    """Return the running hash for ``upload_id`` if it covers ``offset`` bytes"""
+    with _hashers_lock:
+        entry = _hashers.pop(upload_id, None)
+    if offset == 0:
+        return hashlib.sha256()
+    if entry is not None and entry[0] == offset:
+        return entry[1]
+    return None
+
+
+def _store_hasher(upload_id, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload_id] = (offset, hasher)
+        _hashers.move_to_end(upload_id)
+        while len(_hashers) > MAX_CACHED_HASHERS:
+            _hashers.popitem(last=False)
+
+
+def discard(path, upload_id):
+    """Forget an upload and remove its partial file"""
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def received_bytes(path):
+    """Return how many bytes of an upload are on disk"""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+@contextmanager
+def locked(path):
+    """Open the partial file of an upload under an exclusive lock
+
+    Yields:
+        The partial file, opened for reading and writing
+
+    Raises:
+        UploadBusy: If another request holds the lock
+        UploadClosed: If the file was moved or removed before the lock was
+            taken, so writing to it would change a finished blob
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+b") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadBusy()
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            raise UploadClosed()
+        if not os.path.samestat(os.fstat(fh.fileno()), current):
+            raise UploadClosed()
+        yield fh
+
+
+def write_chunk(path, upload_id, offset, stream, total_size):
+    """Stream a request body into the partial file at ``offset``.
+
+    Bytes go straight from the request stream to disk in small pieces. If the
+    client disconnects halfway, whatever reached the disk still counts and
+    the client resumes from the new offset.
+
+    Args:
+        path (str): Partial file for the upload
+        upload_id (str): Upload session id
+        offset (int): Offset the client claims the chunk starts at
+        stream: Readable request body
+        total_size (int): Declared size of the complete upload
+
+    Returns:
+        int: The new offset after the chunk was written
+
+    Raises:
+        ChunkConflict: If ``offset`` does not match the bytes already received
+        UploadBusy: If another request is writing or completing this upload
+        UploadClosed: If the upload was completed or discarded meanwhile
+        UploadTooLarge: If the chunk runs past ``total_size``
+    """
+    with locked(path) as out:
+        current = out.seek(0, os.SEEK_END)
+        if offset != current:
+            raise ChunkConflict(current)
+
+        hasher = _take_hasher(upload_id, offset)
+        written = 0
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if offset + written + len(chunk) > total_size:
+                    raise UploadTooLarge()
+                out.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                written += len(chunk)
+        finally:
+            out.flush()
+            if hasher is not None:
+                _store_hasher(upload_id, offset + written, hasher)
+
+    return offset + written
+
+
+def finalize(path, upload_id, total_size):
+    """Flush the partial file to disk and return its sha256 digest
+
+    Call it holding ``locked(path)``.
+    """
+    hasher = _take_hasher(upload_id, total_size)
+    with open(path, "rb") as fh:
+        if hasher is None:
+            hasher = hashlib.sha256()
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        os.fsync(fh.fileno())
+    return hasher.hexdigest()
+
+
+def purge_stale_sessions(ttl, batch_size=100):
+    """Delete upload sessions that have not received data for ``ttl``.
+
+    Returns:
+        int: Number of sessions removed
+    """
+    from extensions import blobs, db
+    from models.models import UploadSession
+
+    cutoff = datetime.utcnow() - ttl
+    purged = 0
+    while True:
+        stale = (
+            UploadSession.query.filter(UploadSession.updated_at < cutoff)
+            .limit(batch_size)
+            .all()
+        )
+        if not stale:
+            return purged
+        for session in stale:
+            discard(blobs.partial_path(session.id), session.id)
+            db.session.delete(session)
+        db.session.commit()
+        purged += len(stale)
+
+
+def maybe_purge_stale_sessions(ttl):
+    """Run ``purge_stale_sessions`` at most once per interval per process"""
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL:
+        return 0
+    _last_purge = now
+    return purge_stale_sessions(ttl)
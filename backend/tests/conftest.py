@@ -0,0 +1,82 @@
+"""Fixtures shared by the backend tests
+
+``app`` runs the application on a fresh SQLite database under ``tmp_path``
+and creates the users listed by ``app_users``; ``client`` is signed in as the
+first of them. A module sets extra environment variables by overriding
+``app_environ``, and a test can parametrize either fixture directly.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "backend-tests-" + "x" * 32)
+
+from app import create_app
+from extensions import db
+from flask_jwt_extended import create_access_token
+from models.models import User
+
+
+@pytest.fixture
+def app_environ():
+    """Environment variables set on top of the test defaults"""
+    return {}
+
+
+@pytest.fixture
+def app_users():
+    """Emails of the users created with the app"""
+    return ["user@example.com"]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, app_environ, app_users):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "create")
+    for name, value in app_environ.items():
+        monkeypatch.setenv(name, value)
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        users = [User(email=email, password_hash="x") for email in app_users]
+        db.session.add_all(users)
+        db.session.commit()
+        app.user_ids = [user.id for user in users]
+        app.user_id = app.user_ids[0] if users else None
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def auth_headers(user_id):
+    """Headers that sign a request in as ``user_id``"""
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = auth_headers(app.user_id)[
+        "Authorization"
+    ]
+    return client
+
+
+def create_job(client, status="applied", **fields):
+    """Create a job through the API and return its id"""
+    job = {
+        "company_name": "Acme",
+        "role_title": "Dev",
+        "application_status": status,
+        **fields,
+    }
+    response = client.post("/api/jobs/", json=job)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
@@ -0,0 +1,122 @@
+"""Tests for the content-addressed blob store and blob reference counts"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from conftest import auth_headers, create_job
+from extensions import db
+from models.models import Blob, User, UserBlob
+from services.blobstore import BlobStore
+
+CONTENT = b"resume contents"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+class BrokenStream(io.BytesIO):
+    def read(self, size=-1):
+        if self.tell():
+            raise OSError("client went away")
+        return super().read(4)
+
+
+def test_put_stores_identical_content_once(tmp_path):
+    store = BlobStore()
+    store.root = str(tmp_path)
+
+    assert store.put(io.BytesIO(CONTENT)) == (DIGEST, len(CONTENT))
+    path = store.path_for(DIGEST)
+    assert path == os.path.join(store.blob_dir, DIGEST[:2], DIGEST[2:4], DIGEST)
+    os.utime(path, (0, 0))
+
+    assert store.put(io.BytesIO(CONTENT)) == (DIGEST, len(CONTENT))
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+    # The duplicate restarts the garbage collector's grace period
+    assert os.path.getmtime(path) > 0
+    assert list(store.iter_blobs()) == [(DIGEST, path)]
+    assert os.listdir(store.tmp_dir) == []
+
+    with pytest.raises(OSError):
+        store.put(BrokenStream(b"partial upload"))
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_adopt_moves_new_files_and_drops_duplicates(tmp_path):
+    store = BlobStore()
+    store.root = str(tmp_path)
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.write_bytes(CONTENT)
+    second.write_bytes(CONTENT)
+
+    assert store.adopt(str(first), DIGEST) == store.path_for(DIGEST)
+    assert store.adopt(str(second), DIGEST) == store.path_for(DIGEST)
+
+    assert not first.exists() and not second.exists()
+    assert store.exists(DIGEST)
+
+
+def upload(client, job_id):
+    response = client.post(
+        f"/api/jobs/{job_id}/files",
+        data={"file": (io.BytesIO(CONTENT), "cv.txt"), "file_type": "resume"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def link(client, job_id, file_id, **kwargs):
+    return client.post(f"/api/jobs/{job_id}/files", json={"file_id": file_id}, **kwargs)
+
+
+def counts(app):
+    db.session.expire_all()
+    blob = db.session.get(Blob, DIGEST)
+    user_blob = db.session.get(UserBlob, (app.user_id, DIGEST))
+    return (
+        blob.ref_count,
+        user_blob.ref_count if user_blob else 0,
+        db.session.get(User, app.user_id).storage_bytes,
+    )
+
+
+def test_files_acquire_and_release_their_blob(app, client):
+    first_job, second_job = create_job(client), create_job(client)
+    first = upload(client, first_job)
+    assert first["digest"] == DIGEST
+    assert counts(app) == (1, 1, len(CONTENT))
+
+    # The same content uploaded again shares the blob and is counted once
+    upload(client, second_job)
+    assert counts(app) == (2, 2, len(CONTENT))
+
+    response = link(client, second_job, first["id"])
+    assert response.status_code == 201
+    assert response.get_json()["digest"] == DIGEST
+    assert counts(app) == (3, 3, len(CONTENT))
+
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    other_job = client.post(
+        "/api/jobs/",
+        json={
+            "company_name": "Globex",
+            "role_title": "QA",
+            "application_status": "applied",
+        },
+        headers=auth_headers(other.id),
+    ).get_json()["id"]
+    # Only the user's own files can be linked
+    response = link(client, other_job, first["id"], headers=auth_headers(other.id))
+    assert response.status_code == 404
+    assert counts(app) == (3, 3, len(CONTENT))
+
+    assert client.delete(f"/api/jobs/{second_job}").status_code == 204
+    assert counts(app) == (1, 1, len(CONTENT))
+    assert client.delete(f"/api/jobs/{first_job}").status_code == 204
+    assert counts(app) == (0, 0, 0)
+    # Unreferenced blobs stay on disk for the garbage collector
+    assert app.extensions["blobstore"].exists(DIGEST)
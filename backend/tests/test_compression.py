@@ -0,0 +1,104 @@
+"""Tests for response compression and the streamed CSV export"""
+
+import csv
+import gzip
+import io
+
+import pytest
+from prometheus_client import REGISTRY
+
+VACANCY_TEXT = "We are hiring a backend engineer to build our job platform. " * 40
+
+
+@pytest.fixture
+def app_environ():
+    return {"COMPRESS_ENCODINGS": "zstd,br,gzip"}
+
+
+@pytest.fixture
+def client(client):
+    for index in range(5):
+        response = client.post(
+            "/api/jobs/",
+            json={
+                "company_name": f"Acme {index}",
+                "role_title": "=Engineer" if index == 0 else "Engineer",
+                "application_status": "applied",
+                "vacancy_text": VACANCY_TEXT,
+            },
+        )
+        assert response.status_code == 201
+    return client
+
+
+def test_large_json_is_compressed_with_the_preferred_encoding(client):
+    url = "/api/jobs/?include=vacancy_text"
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    response = client.get(url, headers={"Accept-Encoding": "br;q=0, gzip, zstd;q=0"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) < len(plain.data) / 5
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers["ETag"].startswith("W/")
+
+    # Below COMPRESS_MIN_SIZE the body is sent as it is
+    small = client.get("/api/jobs/stats", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+
+def cache_hits():
+    return (
+        REGISTRY.get_sample_value("jobpal_compression_cache_total", {"result": "hit"})
+        or 0
+    )
+
+
+def test_etagged_bodies_are_compressed_once(client):
+    url = "/api/jobs/?include=vacancy_text"
+    hits = cache_hits()
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    second = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert second.data == first.data
+    assert cache_hits() == hits + 1
+    cached = client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+    client.put("/api/jobs/1", json={"role_title": "Staff Engineer"})
+    changed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert b"Staff Engineer" in gzip.decompress(changed.data)
+
+
+def test_export_streams_compressed_csv(client):
+    response = client.get(
+        "/api/jobs/export?include=vacancy_text", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert "jobs.csv" in response.headers["Content-Disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+    assert [row["company_name"] for row in rows] == [f"Acme {i}" for i in range(5)]
+    assert rows[0]["role_title"] == "'=Engineer"
+    assert rows[1]["vacancy_text"] == VACANCY_TEXT
+
+
+@pytest.mark.parametrize("encoding, module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encodings(client, encoding, module):
+    codec = pytest.importorskip(module)
+    response = client.get(
+        "/api/jobs/?include=vacancy_text",
+        headers={"Accept-Encoding": f"gzip;q=0.5, {encoding}"},
+    )
+    assert response.headers["Content-Encoding"] == encoding
+    if module == "brotli":
+        body = codec.decompress(response.data)
+    else:
+        body = codec.ZstdDecompressor().decompressobj().decompress(response.data)
+    assert body == client.get("/api/jobs/?include=vacancy_text").data
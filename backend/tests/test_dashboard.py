@@ -0,0 +1,93 @@
+"""Tests for the composite dashboard endpoint"""
+
+from datetime import datetime, timedelta
+
+import conftest
+import pytest
+from conftest import auth_headers
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import JobStatusEvent, User
+
+
+def days_from_now(days):
+    return (datetime.utcnow() + timedelta(days=days)).replace(microsecond=0)
+
+
+def create_job(client, status="applied", applied_days_ago=None, milestone_in=None):
+    fields = {}
+    if applied_days_ago is not None:
+        fields["date_applied"] = days_from_now(-applied_days_ago).isoformat()
+    if milestone_in is not None:
+        fields["next_milestone_date"] = days_from_now(milestone_in).isoformat()
+    return conftest.create_job(client, status, **fields)
+
+
+def test_dashboard_returns_every_widget(client):
+    overdue = create_job(client, applied_days_ago=20, milestone_in=-2)
+    upcoming = create_job(client, "interview", applied_days_ago=5, milestone_in=3)
+    create_job(client, "applied", milestone_in=30)
+    rejected = create_job(client, applied_days_ago=10, milestone_in=-1)
+    client.put(f"/api/jobs/{rejected}", json={"application_status": "rejected"})
+    event = JobStatusEvent.query.filter_by(
+        job_id=rejected, to_status=ApplicationStatus.REJECTED
+    ).one()
+    event.occurred_at = days_from_now(-4)
+    db.session.commit()
+
+    data = client.get("/api/dashboard").get_json()
+
+    assert data["summary"]["total"] == 4
+    assert data["summary"]["by_status"]["rejected"] == 1
+    assert data["rejections"] == {
+        "jobs": 1,
+        "average_days": 6,
+        "fastest_days": 6,
+        "slowest_days": 6,
+    }
+    assert data["waiting"]["jobs"] == 2
+    # Waited 20 and 5 days, spread around the 6 days to rejection
+    assert data["waiting"]["deviation_days"] == pytest.approx(
+        (((20 - 6) ** 2 + (5 - 6) ** 2) / 2) ** 0.5, abs=0.01
+    )
+    assert [job["id"] for job in data["overdue"]] == [overdue]
+    assert [job["id"] for job in data["upcoming"]] == [upcoming]
+    assert data["upcoming"][0]["application_status"] == "interview"
+    this_year = [
+        days_from_now(-days).date().isoformat()
+        for days in (20, 10, 5)
+        if days_from_now(-days).year == datetime.utcnow().year
+    ]
+    assert [day["date"] for day in data["activity"]] == sorted(this_year)
+
+
+def test_etag_changes_with_the_jobs(client):
+    job_id = create_job(client, milestone_in=2)
+
+    first = client.get("/api/dashboard")
+    etag = first.headers["ETag"]
+    cached = client.get("/api/dashboard", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+
+    client.put(f"/api/jobs/{job_id}", json={"application_status": "interview"})
+    changed = client.get("/api/dashboard", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.get_json()["summary"]["by_status"]["interview"] == 1
+
+    wider = client.get("/api/dashboard?upcoming_days=30")
+    assert wider.headers["ETag"] != changed.headers["ETag"]
+
+
+def test_dashboard_is_scoped_and_validated(app, client):
+    create_job(client, milestone_in=1)
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+
+    data = client.get("/api/dashboard", headers=auth_headers(other.id)).get_json()
+    assert data["summary"]["total"] == 0
+    assert data["upcoming"] == []
+    assert client.get("/api/dashboard?upcoming_days=0").status_code == 400
+    assert client.get("/api/dashboard?upcoming_days=x").status_code == 400
@@ -0,0 +1,97 @@
+"""Tests for the synthetic performance-test dataset"""
+
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "dataset-tests-" + "x" * 32)
+
+from extensions import db
+from models.enums import ApplicationStatus
+from services.dataset import SyntheticDataset, load
+from sqlalchemy import create_engine, func, select, text
+
+NOW = datetime(2024, 6, 1)
+
+
+def test_same_seed_produces_same_rows():
+    first = list(SyntheticDataset(20, 10, seed=7, now=NOW).chunks(users_per_chunk=5))
+    second = list(SyntheticDataset(20, 10, seed=7, now=NOW).chunks(users_per_chunk=8))
+    other = list(SyntheticDataset(20, 10, seed=8, now=NOW).chunks())
+
+    def rows(chunks, table):
+        return [
+            {k: v for k, v in row.items() if k != "password_hash"}
+            for chunk in chunks
+            for row in chunk[table]
+        ]
+
+    for table in ("users", "jobs", "vacancy_texts", "files", "blobs"):
+        assert rows(first, table) == rows(second, table)
+    assert rows(first, "jobs") != rows(other, "jobs")
+
+
+def test_jobs_look_plausible():
+    jobs, histories = [], {}
+    for records in SyntheticDataset(50, 40, seed=1, now=NOW).iter_users():
+        jobs.extend(records["jobs"])
+        for event in records["job_status_events"]:
+            histories.setdefault(event["job_id"], []).append(event)
+    statuses = Counter(job["application_status"] for job in jobs)
+
+    assert set(statuses) == set(ApplicationStatus)
+    assert statuses[ApplicationStatus.APPLIED] > statuses[ApplicationStatus.OFFER]
+    for job in jobs:
+        assert job["created_at"] <= job["updated_at"] <= NOW
+        if job["application_status"] == ApplicationStatus.NOT_YET_APPLIED:
+            assert job["date_applied"] is None
+        else:
+            assert job["date_applied"] >= job["created_at"]
+        # The history ends in the current status
+        history = histories[job["id"]]
+        assert history[-1]["to_status"] == job["application_status"]
+        assert [e["occurred_at"] for e in history] == sorted(
+            e["occurred_at"] for e in history
+        )
+
+    texts = [job["vacancy_text"] for job in jobs if job["vacancy_text"]]
+    assert 0.7 < len(texts) / len(jobs) < 0.95
+    assert len(set(texts)) < len(texts)
+    assert 1500 < sum(map(len, texts)) / len(texts) < 6000
+
+
+def test_load_keeps_counters_consistent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dataset.db'}")
+    db.metadata.create_all(engine)
+
+    counts = load(engine, SyntheticDataset(30, 20, seed=3, now=NOW), 7)
+
+    with engine.connect() as conn:
+        for table, count in counts.items():
+            assert conn.scalar(select(func.count()).select_from(text(table))) == count
+        assert counts["jobs"] == 600
+        # Reference counts and storage totals match the rows that use them
+        assert not conn.execute(
+            text(
+                "SELECT b.digest FROM blobs b LEFT JOIN files f"
+                " ON f.blob_digest = b.digest GROUP BY b.digest"
+                " HAVING count(f.id) != max(b.ref_count)"
+            )
+        ).all()
+        assert not conn.execute(
+            text(
+                "SELECT u.id FROM users u LEFT JOIN user_blobs ub ON ub.user_id = u.id"
+                " LEFT JOIN blobs b ON b.digest = ub.blob_digest GROUP BY u.id"
+                " HAVING coalesce(sum(b.size), 0) != max(u.storage_bytes)"
+            )
+        ).all()
+        assert not conn.execute(
+            text(
+                "SELECT j.id FROM jobs j LEFT JOIN vacancy_texts v"
+                " ON v.digest = j.vacancy_digest"
+                " WHERE j.vacancy_digest IS NOT NULL AND v.digest IS NULL"
+            )
+        ).all()
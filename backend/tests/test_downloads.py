@@ -0,0 +1,78 @@
+"""Tests for file downloads, served directly and through X-Accel-Redirect"""
+
+import hashlib
+import io
+
+import pytest
+from conftest import create_job
+
+CONTENT = b"%PDF-1.4 resume contents"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+ACCEL = {"FILE_ACCEL_REDIRECT": "/protected-uploads/"}
+
+
+def upload(client):
+    job_id = create_job(client)
+    response = client.post(
+        f"/api/jobs/{job_id}/files",
+        data={"file": (io.BytesIO(CONTENT), "cv.pdf"), "file_type": "resume"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201
+    return f"/api/jobs/{job_id}/files/{response.get_json()['id']}"
+
+
+@pytest.mark.parametrize("app_environ", [{}, ACCEL], ids=["direct", "accel"])
+def test_digest_is_a_strong_etag_for_conditional_requests(client, app_environ):
+    url = upload(client)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{DIGEST}"'
+    assert "private" in response.headers["Cache-Control"]
+    accel = response.headers.get("X-Accel-Redirect")
+    if app_environ:
+        assert accel == f"/protected-uploads/blobs/{DIGEST[:2]}/{DIGEST[2:4]}/{DIGEST}"
+        assert response.data == b""
+    else:
+        assert accel is None
+        assert response.data == CONTENT
+
+    response = client.get(url, headers={"If-None-Match": f'"{DIGEST}"'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{DIGEST}"'
+    assert "X-Accel-Redirect" not in response.headers
+    assert response.data == b""
+
+
+@pytest.mark.parametrize("app_environ", [{}, ACCEL], ids=["direct", "accel"])
+def test_if_range_resumes_only_an_unchanged_file(client, app_environ):
+    url = upload(client)
+
+    response = client.get(url, headers={"Range": "bytes=4-", "If-Range": f'"{DIGEST}"'})
+    assert response.status_code == 206
+    assert (
+        response.headers["Content-Range"]
+        == f"bytes 4-{len(CONTENT) - 1}/{len(CONTENT)}"
+    )
+    assert response.data == CONTENT[4:]
+    assert "X-Accel-Redirect" not in response.headers
+
+    response = client.get(url, headers={"Range": "bytes=4-", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.data == CONTENT
+
+
+def test_plain_ranges_are_served_directly(client):
+    url = upload(client)
+    response = client.get(url, headers={"Range": "bytes=0-3"})
+    assert response.status_code == 206
+    assert response.data == CONTENT[:4]
+
+
+@pytest.mark.parametrize("app_environ", [ACCEL])
+def test_plain_ranges_are_left_to_nginx_behind_accel(client):
+    url = upload(client)
+    response = client.get(url, headers={"Range": "bytes=0-3"})
+    assert response.status_code == 200
+    assert response.headers["X-Accel-Redirect"].endswith(DIGEST)
@@ -0,0 +1,93 @@
+"""Tests for duplicate job detection"""
+
+from conftest import auth_headers
+from extensions import db
+from models.models import Job, User
+from services.duplicates import similarity
+
+
+def post_job(client, company, role, link=None, **extra):
+    return client.post(
+        "/api/jobs/",
+        json={
+            "company_name": company,
+            "role_title": role,
+            "vacancy_link": link,
+            "application_status": "applied",
+            **extra,
+        },
+    )
+
+
+def test_same_link_with_tracking_parameters_is_a_duplicate(client):
+    first = post_job(client, "Acme", "Backend Engineer", "https://acme.com/jobs/7")
+    assert first.get_json()["duplicates"] == []
+
+    second = post_job(
+        client,
+        "Globex",
+        "Platform Engineer",
+        "http://www.ACME.com/jobs/7/?utm_source=linkedin&trk=feed#apply",
+    )
+    assert second.status_code == 201
+    [duplicate] = second.get_json()["duplicates"]
+    assert duplicate["id"] == first.get_json()["id"]
+    assert duplicate["reasons"] == ["vacancy_link"]
+
+    other = post_job(client, "Globex", "Designer", "https://acme.com/jobs/8")
+    assert other.get_json()["duplicates"] == []
+
+    job = db.session.get(Job, first.get_json()["id"])
+    job.vacancy_link = None
+    db.session.flush()
+    assert job.vacancy_link_hash is None
+
+
+def test_similar_spellings_are_duplicates(client):
+    assert similarity("Acme GmbH", "ACME GmbH.") == 1
+    assert similarity("Acme", "Globex") == 0
+
+    original = post_job(client, "Acme Technologies", "Senior Backend Engineer")
+    response = post_job(client, "ACME Technologies Inc", "Backend Engineer, Senior")
+    [duplicate] = response.get_json()["duplicates"]
+    assert duplicate["id"] == original.get_json()["id"]
+    assert duplicate["reasons"] == ["similar_name"]
+
+    # Same company, different role
+    assert post_job(client, "Acme", "Product Designer").get_json()["duplicates"] == []
+
+
+def test_duplicates_report_groups_jobs(app, client):
+    first = post_job(client, "Initech", "Data Engineer", "https://initech.com/1")
+    second = post_job(client, "Initech Ltd", "Data Engineer")
+    third = post_job(client, "Umbrella", "QA", "https://initech.com/1?ref=mail")
+    post_job(client, "Hooli", "Frontend Developer")
+
+    rejected = post_job(client, "Hooli", "Frontend Developer", reject_duplicates=True)
+    assert rejected.status_code == 409
+    assert [job["company_name"] for job in rejected.get_json()["duplicates"]] == [
+        "Hooli"
+    ]
+    assert Job.query.filter_by(company_name="Hooli").count() == 1
+
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    response = client.post(
+        "/api/jobs/",
+        json={
+            "company_name": "Initech",
+            "role_title": "Data Engineer",
+            "application_status": "applied",
+        },
+        headers=auth_headers(other.id),
+    )
+    assert response.get_json()["duplicates"] == []
+
+    [group] = client.get("/api/jobs/duplicates").get_json()
+    assert [job["id"] for job in group["jobs"]] == [
+        first.get_json()["id"],
+        second.get_json()["id"],
+        third.get_json()["id"],
+    ]
+    assert group["reasons"] == ["similar_name", "vacancy_link"]
@@ -0,0 +1,85 @@
+"""Tests for text extraction from uploads and the file search"""
+
+import io
+import zipfile
+
+import pytest
+from conftest import auth_headers, create_job
+from extensions import db
+from models.models import FileText, User
+from services import extraction
+from services.extraction import UnsupportedFormat, extract_text
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+    '2006/main"><w:body>'
+    "<w:p><w:r><w:t>Senior</w:t><w:tab/><w:t>Engineer</w:t></w:r></w:p>"
+    "<w:p><w:r><w:t>Python</w:t><w:br/><w:t>Go</w:t></w:r></w:p>"
+    "</w:body></w:document>"
+)
+
+
+def test_text_and_docx_files_are_extracted(tmp_path, monkeypatch):
+    txt = tmp_path / "cv.txt"
+    txt.write_bytes("Résumé\x00 text".encode("utf-8"))
+    docx = tmp_path / "cv.docx"
+    with zipfile.ZipFile(docx, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+
+    assert extract_text(str(txt), "CV.TXT") == "Résumé text"
+    assert extract_text(str(docx), "cv.docx") == "Senior\tEngineer\nPython\nGo"
+    with pytest.raises(UnsupportedFormat):
+        extract_text(str(txt), "cv.doc")
+    with pytest.raises(UnsupportedFormat):
+        extract_text(str(txt), "README")
+
+    monkeypatch.setattr(extraction, "MAX_TEXT_CHARS", 6)
+    assert extract_text(str(txt), "cv.txt") == "Résumé"
+
+
+def upload(client, job_id, content, name):
+    response = client.post(
+        f"/api/jobs/{job_id}/files",
+        data={"file": (io.BytesIO(content), name), "file_type": "resume"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201
+    return response.get_json()["digest"]
+
+
+def search(client, q, **kwargs):
+    response = client.get("/api/jobs/files/search", query_string={"q": q}, **kwargs)
+    assert response.status_code == 200
+    return sorted(result["filename"] for result in response.get_json())
+
+
+def test_backfill_extracts_each_blob_once_and_search_finds_it(app, client):
+    job_id = create_job(client)
+    percent = upload(client, job_id, b"Kubernetes, 100% remote", "percent.txt")
+    upload(client, job_id, b"Fully remote kubernetes role", "plain.txt")
+    upload(client, create_job(client), b"Kubernetes, 100% remote", "copy.txt")
+    legacy = upload(client, job_id, b"binary", "old.doc")
+    extractor = app.extensions["text_extractor"]
+
+    # EXTRACTION_WORKERS=0 in tests: nothing runs in the background
+    assert extractor.submit(percent, "unused", "percent.txt") is None
+    assert extractor.backfill() == 3
+    assert extractor.backfill() == 0
+
+    assert db.session.get(FileText, percent).status == FileText.DONE
+    assert db.session.get(FileText, legacy).status == FileText.UNSUPPORTED
+    assert search(client, "KUBERNETES") == [
+        "copy.txt",
+        "percent.txt",
+        "plain.txt",
+    ]
+    # LIKE wildcards in the query match literally
+    assert search(client, "%") == ["copy.txt", "percent.txt"]
+    assert search(client, "1_0") == []
+    assert search(client, "binary") == []
+
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+    assert search(client, "remote", headers=auth_headers(other.id)) == []
+    assert client.get("/api/jobs/files/search?q=%20").status_code == 400
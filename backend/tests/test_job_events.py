@@ -0,0 +1,154 @@
+"""Tests for the live job event stream"""
+
+import json
+import threading
+import time
+
+import pytest
+from conftest import auth_headers, create_job
+
+
+@pytest.fixture
+def app_environ():
+    return {"JOB_EVENTS_HEARTBEAT": "0.05", "JOB_EVENTS_MAX_SECONDS": "0.3"}
+
+
+@pytest.fixture
+def app_users():
+    return ["a@example.com", "b@example.com"]
+
+
+def read_events(client, last_event_id=None):
+    """Every message of one stream, until it ends after JOB_EVENTS_MAX_SECONDS"""
+    headers = {} if last_event_id is None else {"Last-Event-ID": str(last_event_id)}
+    response = client.get("/api/jobs/events", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    messages = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        fields = {}
+        for line in filter(None, block.split("\n")):
+            name, _, value = line.partition(":")
+            fields[name] = value.strip()
+        if "data" in fields:
+            fields["data"] = json.loads(fields["data"])
+        if fields:
+            messages.append(fields)
+    return messages
+
+
+def test_resume_sends_the_latest_state_of_each_changed_job(client):
+    kept = create_job(client)
+    deleted = create_job(client)
+    client.put(f"/api/jobs/{kept}", json={"role_title": "Senior Dev"})
+    client.delete(f"/api/jobs/{deleted}")
+
+    messages = read_events(client, last_event_id=0)
+
+    assert messages[0] == {"retry": "3000"}
+    events = [m for m in messages if m.get("event") == "job"]
+    assert [e["data"]["action"] for e in events] == ["created", "deleted"]
+    assert events[0]["data"]["job"]["role_title"] == "Senior Dev"
+    assert "vacancy_text" not in events[0]["data"]["job"]
+    assert events[1]["data"]["job_id"] == deleted
+    assert {"": "heartbeat"} in messages
+
+    # Nothing is sent twice
+    last_id = int(events[-1]["id"])
+    assert not [m for m in read_events(client, last_id) if m.get("event") == "job"]
+
+
+def test_live_changes_reach_only_their_users_stream(app, client):
+    other = app.test_client()
+    other.environ_base["HTTP_AUTHORIZATION"] = auth_headers(app.user_ids[1])[
+        "Authorization"
+    ]
+    app.config["JOB_EVENTS_MAX_SECONDS"] = 2
+    app.extensions["job_events"].max_seconds = 2
+    received = {}
+
+    def listen(name, listener):
+        received[name] = read_events(listener)
+
+    threads = [
+        threading.Thread(target=listen, args=(name, listener))
+        for name, listener in (("mine", client), ("other", other))
+    ]
+    for thread in threads:
+        thread.start()
+    while len(app.extensions["job_events"]._subscribers) < 2:
+        time.sleep(0.01)
+    started = time.monotonic()
+    job_id = create_job(client)
+    for thread in threads:
+        thread.join()
+
+    [event] = [m for m in received["mine"] if m.get("event") == "job"]
+    assert event["data"]["job"]["id"] == job_id
+    assert not [m for m in received["other"] if m.get("event") == "job"]
+    assert time.monotonic() - started < 3
+
+
+def test_a_live_change_is_sent_without_a_heartbeat(app, client):
+    stream = app.extensions["job_events"]
+    stream.heartbeat = 10
+    stream.max_seconds = 1
+    received = []
+    listener = threading.Thread(target=lambda: received.extend(read_events(client)))
+    listener.start()
+    while not stream._subscribers:
+        time.sleep(0.01)
+    job_id = create_job(client)
+    listener.join()
+
+    assert received[0] == {"retry": "3000"}
+    [event] = received[1:]
+    assert event["event"] == "job"
+    assert event["data"]["job"]["id"] == job_id
+
+
+def test_resuming_past_pruned_changes_asks_for_a_refetch(app, client):
+    for _ in range(3):
+        create_job(client)
+    stream = app.extensions["job_events"]
+    stream.retention = stream.retention * 0
+    stream._last_prune = float("-inf")
+
+    messages = read_events(client, last_event_id=1)
+
+    assert [m["event"] for m in messages if "event" in m] == ["reset"]
+    response = client.get("/api/jobs/events", headers={"Last-Event-ID": "x"})
+    assert response.status_code == 400
+
+
+def test_pruning_keeps_each_users_latest_change(app, client):
+    other = auth_headers(app.user_ids[1])
+    mine = create_job(client)
+    client.post(
+        "/api/jobs/",
+        json={
+            "company_name": "Globex",
+            "role_title": "QA",
+            "application_status": "applied",
+        },
+        headers=other,
+    )
+    create_job(client)
+    client.delete(f"/api/jobs/{mine}")
+    jobs_etag = client.get("/api/jobs/").headers["ETag"]
+    dashboard_etag = client.get("/api/dashboard").headers["ETag"]
+    stream = app.extensions["job_events"]
+    stream.retention = stream.retention * 0
+    stream._last_prune = float("-inf")
+
+    stream.prune()
+
+    assert stream.latest_id(app.user_ids[1]) == 2
+    assert stream.is_pruned(app.user_id, 0)
+    assert not stream.is_pruned(app.user_id, stream.latest_id(app.user_id))
+    response = client.get("/api/jobs/", headers={"If-None-Match": jobs_etag})
+    assert response.status_code == 304
+    response = client.get("/api/dashboard", headers={"If-None-Match": dashboard_etag})
+    assert response.status_code == 304
+    create_job(client)
+    assert client.get("/api/jobs/").headers["ETag"] != jobs_etag
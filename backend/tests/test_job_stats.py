@@ -0,0 +1,72 @@
+"""Tests for the incrementally maintained per-user job counters"""
+
+from datetime import datetime
+
+import pytest
+from conftest import create_job
+from extensions import db
+from services import job_stats
+from services.dataset import SyntheticDataset, load
+from sqlalchemy import text
+
+
+def test_counters_follow_inserts_updates_and_deletes(client):
+    first = create_job(
+        client,
+        "applied",
+        source="linkedin",
+        date_applied="2024-05-15T10:00:00",
+    )
+    second = create_job(client, "not_yet_applied")
+    create_job(client, "rejected", source="referral")
+
+    client.put(
+        f"/api/jobs/{first}",
+        json={"application_status": "offer", "date_applied": "2024-05-20T10:00:00"},
+    )
+    client.put(f"/api/jobs/{second}", json={"role_title": "Senior Dev"})
+    assert client.delete(f"/api/jobs/{second}").status_code == 204
+
+    stats = client.get("/api/jobs/stats").get_json()
+    assert stats["total"] == 2
+    assert stats["active"] == 0
+    assert stats["by_status"]["offer"] == 1
+    assert stats["by_status"]["rejected"] == 1
+    assert stats["by_status"]["applied"] == 0
+    assert stats["by_status"]["not_yet_applied"] == 0
+    assert stats["by_source"] == {
+        "linkedin": 1,
+        "indeed": 0,
+        "company_website": 0,
+        "referral": 1,
+        "other": 0,
+    }
+    assert stats["applied_per_week"] == [{"week": "2024-05-20", "jobs": 1}]
+    assert job_stats.check() == {}
+
+
+def test_check_reports_and_rebuild_repairs_drift(app, client):
+    create_job(client, "interview")
+    # Raw SQL bypasses the Job events
+    db.session.execute(text("UPDATE jobs SET application_status = 'REJECTED'"))
+    db.session.commit()
+
+    drift = job_stats.check()
+    assert sorted(drift[app.user_id]) == [
+        ("active", "", 1, 0),
+        ("status", "interview", 1, 0),
+        ("status", "rejected", 0, 1),
+    ]
+
+    job_stats.rebuild([app.user_id])
+    assert job_stats.check() == {}
+    assert client.get("/api/jobs/stats").get_json()["by_status"]["rejected"] == 1
+
+
+# The dataset numbers its own users from 1
+@pytest.mark.parametrize("app_users", [[]])
+def test_synthetic_dataset_loads_consistent_counters(app):
+    load(db.engine, SyntheticDataset(20, 15, seed=5, now=datetime(2024, 6, 1)))
+
+    assert job_stats.check() == {}
+    assert job_stats.summary(1)["total"] == 15
@@ -0,0 +1,140 @@
+"""Tests for the queue-based structured logging setup"""
+
+import io
+import json
+import logging
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "logging-tests-" + "x" * 32)
+
+from services.logging_setup import (
+    REDACTED,
+    configure_logging,
+    flush_logging,
+    parse_levels,
+)
+
+
+class RecordingStream(io.StringIO):
+    """StringIO that remembers which threads wrote to it"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def write(self, text):
+        self.threads.add(threading.current_thread().name)
+        return super().write(text)
+
+
+@pytest.fixture
+def log_output():
+    streams = []
+
+    def configure(**environ):
+        stream = RecordingStream()
+        streams.append(stream)
+        configure_logging(environ=environ, stream=stream)
+        return stream
+
+    yield configure
+    configure_logging(environ={})
+
+
+def read_lines(stream):
+    flush_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_off_the_calling_thread(log_output):
+    stream = log_output()
+    logging.getLogger("tests.queue").info("hello %s", "world", extra={"job_id": 3})
+
+    [line] = read_lines(stream)
+    assert line["message"] == "hello world"
+    assert line["job_id"] == 3
+    assert line["logger"] == "tests.queue"
+    assert threading.current_thread().name not in stream.threads
+
+
+def test_secrets_are_redacted(log_output):
+    stream = log_output()
+    logger = logging.getLogger("tests.redact")
+    logger.warning("payload %s", {"email": "a@example.com", "password": "hunter2"})
+    logger.warning("password=%s", "hunter2")
+    logger.warning("headers", extra={"headers": {"Authorization": "Bearer abc"}})
+    logger.warning("Authorization: Bearer abc.def")
+
+    output = stream.getvalue() + json.dumps(read_lines(stream))
+    assert "hunter2" not in output
+    assert "abc" not in output
+    assert "a@example.com" in output
+    assert REDACTED in output
+
+
+def test_per_logger_levels(log_output):
+    stream = log_output(LOG_LEVEL="WARNING", LOG_LEVELS="tests.chatty=DEBUG")
+    logging.getLogger("tests.chatty").debug("shown")
+    logging.getLogger("tests.quiet").info("hidden")
+
+    assert [line["message"] for line in read_lines(stream)] == ["shown"]
+
+
+def test_parse_levels_rejects_malformed_entries():
+    assert parse_levels("a=debug, b.c=ERROR,") == {"a": "DEBUG", "b.c": "ERROR"}
+    with pytest.raises(ValueError):
+        parse_levels("a")
+
+
+def test_debug_records_are_rate_limited(log_output):
+    stream = log_output(LOG_LEVELS="tests.sampled=DEBUG", LOG_DEBUG_RATE="5")
+    logger = logging.getLogger("tests.sampled")
+    for i in range(200):
+        logger.debug("debug %d", i)
+    logger.info("info is never sampled")
+
+    lines = read_lines(stream)
+    debug = [line for line in lines if line["level"] == "DEBUG"]
+    assert 5 <= len(debug) <= 10
+    assert lines[-1]["message"] == "info is never sampled"
+
+
+def test_login_does_not_log_credentials(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'logging.db'}")
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "create")
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    monkeypatch.setenv("LOG_DEBUG_RATE", "0")
+
+    from app import create_app
+    from extensions import db
+
+    app = create_app()
+    client = app.test_client()
+    credentials = {"email": "log@example.com", "password": "s3cret-pass"}
+    assert client.post("/api/auth/register", json=credentials).status_code == 201
+    response = client.post(
+        "/api/auth/login",
+        json=credentials,
+        headers={"Authorization": "Bearer not-a-real-token"},
+    )
+    assert response.status_code == 200
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+    flush_logging()
+    output = capsys.readouterr().out
+    configure_logging(environ={})
+    assert "Login attempt" in output
+    assert "s3cret-pass" not in output
+    assert "not-a-real-token" not in output
+    assert response.get_json()["access_token"] not in output
@@ -0,0 +1,123 @@
+"""Tests for the Prometheus request metrics"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "metrics-tests-" + "x" * 32)
+
+from app import create_app
+from extensions import db
+from flask_jwt_extended import create_access_token
+from models.models import User
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'metrics.db'}")
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "create")
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-token")
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        user = User(email="metrics@example.com", password_hash="")
+        db.session.add(user)
+        db.session.commit()
+        app.user_id = user.id
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def headers(app):
+    with app.app_context():
+        token = create_access_token(identity=str(app.user_id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_counted_per_route_pattern(app, headers):
+    client = app.test_client()
+    route = "/api/jobs/<int:job_id>"
+    before = sample(
+        "jobpal_http_requests_total", method="GET", route=route, status="404"
+    )
+    for job_id in (1, 2, 3):
+        assert client.get(f"/api/jobs/{job_id}", headers=headers).status_code == 404
+
+    assert (
+        sample("jobpal_http_requests_total", method="GET", route=route, status="404")
+        == before + 3
+    )
+    assert (
+        sample("jobpal_http_request_duration_seconds_count", method="GET", route=route)
+        >= 3
+    )
+
+
+def test_sql_queries_are_attributed_to_the_request(app, headers):
+    client = app.test_client()
+    labels = {"method": "POST", "route": "/api/jobs/"}
+    queries_before = sample("jobpal_db_queries_per_request_sum", **labels)
+    size_before = sample("jobpal_http_request_size_bytes_sum", **labels)
+    job = {
+        "company_name": "Acme",
+        "role_title": "Engineer",
+        "application_status": "applied",
+    }
+
+    assert client.post("/api/jobs/", json=job, headers=headers).status_code == 201
+
+    assert sample("jobpal_db_queries_per_request_sum", **labels) > queries_before
+    assert sample("jobpal_http_request_size_bytes_sum", **labels) > size_before
+    assert sample("jobpal_http_requests_in_flight") == 0
+
+
+def test_unknown_paths_share_one_series(app):
+    client = app.test_client()
+    labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    before = sample("jobpal_http_requests_total", **labels)
+    client.get("/no/such/page")
+    client.get("/another/missing/page")
+
+    assert sample("jobpal_http_requests_total", **labels) == before + 2
+
+
+def test_metrics_endpoint_requires_token(app):
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert b"jobpal_http_requests_total" in response.data
+
+
+def test_metrics_without_a_token_are_only_served_locally(app):
+    app.config["METRICS_TOKEN"] = ""
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 200
+
+    response = client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    assert response.status_code == 401
+
+
+def test_failed_statements_do_not_leave_their_start_time_behind(app):
+    with app.test_request_context(), db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info["metrics_query_start"] == []
@@ -0,0 +1,104 @@
+"""Tests for connection pool configuration and statistics"""
+
+import pytest
+from services.pooling import (
+    InstrumentedQueuePool,
+    engine_options_from_env,
+    pool_stats,
+)
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+POSTGRES = "postgresql+psycopg2://jobpal@db/jobpal"
+DEFAULTS = {
+    "poolclass": InstrumentedQueuePool,
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30.0,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+
+@pytest.mark.parametrize(
+    "database_url, environ, expected",
+    [
+        ("sqlite:///jobpal.db", {"DB_POOL_SIZE": "50"}, {}),
+        (POSTGRES, {}, DEFAULTS),
+        (
+            POSTGRES,
+            {
+                "DB_POOL_SIZE": "20",
+                "DB_MAX_OVERFLOW": "0",
+                "DB_POOL_TIMEOUT": "2.5",
+                "DB_POOL_RECYCLE": "300",
+                "DB_POOL_PRE_PING": "off",
+            },
+            {
+                **DEFAULTS,
+                "pool_size": 20,
+                "max_overflow": 0,
+                "pool_timeout": 2.5,
+                "pool_recycle": 300,
+                "pool_pre_ping": False,
+            },
+        ),
+        (POSTGRES, {"DB_POOL_PRE_PING": ""}, DEFAULTS),
+        (POSTGRES, {"DB_PGBOUNCER": "false"}, DEFAULTS),
+        (POSTGRES, {"DB_PGBOUNCER": "true"}, {"poolclass": NullPool}),
+        (
+            "postgresql+psycopg://jobpal@db/jobpal",
+            {"DB_PGBOUNCER": "1", "DB_POOL_SIZE": "20"},
+            {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}},
+        ),
+    ],
+    ids=[
+        "sqlite",
+        "defaults",
+        "tuned",
+        "empty-flag",
+        "pgbouncer-off",
+        "pgbouncer-psycopg2",
+        "pgbouncer-psycopg",
+    ],
+)
+def test_engine_options_from_env(database_url, environ, expected):
+    assert engine_options_from_env(database_url, environ) == expected
+
+
+def test_pool_stats_report_the_configured_overflow(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=3,
+    )
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["size"] == 2
+    assert stats["checked_out"] == 1
+    assert stats["max_overflow"] == 3
+    assert stats["checkouts"] == 1
+    engine.dispose()
+    # dispose() recreates the pool with the same settings
+    assert pool_stats(engine)["max_overflow"] == 3
+
+
+def test_pool_health_is_guarded_like_metrics(app):
+    client = app.test_client()
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    assert response.get_json()["engines"]["default"]["pool"]
+
+    remote = {"REMOTE_ADDR": "203.0.113.7"}
+    assert client.get("/health/pool", environ_base=remote).status_code == 401
+    app.config["METRICS_TOKEN"] = "scrape-token"
+    response = client.get(
+        "/health/pool",
+        environ_base=remote,
+        headers={"Authorization": "Bearer scrape-token"},
+    )
+    assert response.status_code == 200
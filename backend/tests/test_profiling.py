@@ -0,0 +1,114 @@
+"""Tests for the admin profiling endpoints"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "profiling-tests-" + "x" * 32)
+
+from app import create_app
+from services.profiling import TOKEN_HEADER, sign_token, verify_token
+
+SECRET = "profiler-secret"
+
+
+def make_app(tmp_path, monkeypatch, secret=SECRET):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'profiling.db'}")
+    monkeypatch.delenv("DATABASE_REPLICA_URLS", raising=False)
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "off")
+    monkeypatch.setenv("PROFILER_OUTPUT_DIR", str(tmp_path / "profiles"))
+    if secret:
+        monkeypatch.setenv("PROFILER_SECRET", secret)
+    else:
+        monkeypatch.delenv("PROFILER_SECRET", raising=False)
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    client = make_app(tmp_path, monkeypatch).test_client()
+    client.environ_base[f"HTTP_{TOKEN_HEADER.upper().replace('-', '_')}"] = sign_token(
+        SECRET
+    )
+    return client
+
+
+def test_disabled_profiler_registers_nothing(tmp_path, monkeypatch):
+    app = make_app(tmp_path, monkeypatch, secret=None)
+
+    assert "profiler" not in app.extensions
+    assert not any(r.rule.startswith("/api/admin") for r in app.url_map.iter_rules())
+    response = app.test_client().get(
+        "/health", headers={TOKEN_HEADER: sign_token(SECRET)}
+    )
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_tokens_expire_and_must_be_signed():
+    assert verify_token(SECRET, sign_token(SECRET))
+    assert not verify_token("other-secret", sign_token(SECRET))
+    assert not verify_token(SECRET, f"{int(time.time()) - 1}.0")
+    assert not verify_token(SECRET, "garbage")
+    assert not verify_token(SECRET, None)
+
+
+def test_admin_endpoints_hide_without_token(tmp_path, monkeypatch):
+    client = make_app(tmp_path, monkeypatch).test_client()
+
+    assert client.get("/api/admin/profile/memory/snapshot").status_code == 404
+    response = client.get("/health", headers={TOKEN_HEADER: "1.bad"})
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_signed_request_is_profiled(client):
+    response = client.get("/health")
+    profile_id = response.headers["X-Profile-Id"]
+
+    stats = client.get(f"/api/admin/profile/requests/{profile_id}")
+    assert stats.status_code == 200
+    assert b"health_check" in stats.data
+    raw = client.get(f"/api/admin/profile/requests/{profile_id}?format=pstats")
+    assert raw.status_code == 200
+    assert client.get("/api/admin/profile/requests/..%2Fsecret").status_code == 404
+
+
+def test_stack_sampling_returns_collapsed_stacks(client):
+    started = client.post("/api/admin/profile/stacks?seconds=0.2&interval=0.01")
+    assert started.status_code == 202
+    profile_id = started.get_json()["id"]
+    assert client.post("/api/admin/profile/stacks").status_code == 409
+
+    deadline = time.monotonic() + 10
+    while (
+        response := client.get(f"/api/admin/profile/stacks/{profile_id}")
+    ).status_code != 200:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert ";" in stack
+
+
+def test_memory_snapshots_and_diffs(client):
+    assert client.get("/api/admin/profile/memory/snapshot").status_code == 409
+    assert client.post("/api/admin/profile/memory/start").status_code == 200
+    try:
+        first = client.get("/api/admin/profile/memory/snapshot?limit=5").get_json()
+        assert len(first["top"]) <= 5
+        retained = [bytearray(1024) for _ in range(1000)]
+        diff = client.get("/api/admin/profile/memory/snapshot?diff=true").get_json()
+        assert diff["diff"][0]["size_diff"] > 0
+        assert retained
+    finally:
+        client.post("/api/admin/profile/memory/stop")
@@ -0,0 +1,247 @@
+"""Query budgets for every endpoint in routes/jobs.py, routes/auth.py and
+routes/dashboard.py.
+
+Each request runs inside ``query_budget``. The user owns several jobs with
+files attached, so a handler that lazily loads a relationship per row (N+1)
+runs far more statements than its budget allows. If a change legitimately
+needs more statements, raise the budget in ENDPOINTS and say why.
+"""
+
+import io
+
+import pytest
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import File, FileText, Job, User
+from services.query_profiler import query_budget
+
+JOBS_PER_USER = 8
+FILES_PER_JOB = 3
+PASSWORD = "budget-password"
+
+
+@pytest.fixture
+def app_environ():
+    # The event stream ends before its first heartbeat, so it reads a fixed
+    # number of times
+    return {
+        "QUERY_PROFILER": "true",
+        "JOB_EVENTS_HEARTBEAT": "10",
+        "JOB_EVENTS_MAX_SECONDS": "0.1",
+    }
+
+
+@pytest.fixture(autouse=True)
+def seeded(app, tmp_path):
+    """Jobs with vacancy texts and files for the signed-in user"""
+    user = db.session.get(User, app.user_id)
+    user.set_password(PASSWORD)
+    for index in range(JOBS_PER_USER):
+        job = Job(
+            user_id=user.id,
+            company_name=f"Company {index}",
+            role_title="Engineer",
+            vacancy_text=f"Vacancy {index} " * 50,
+            application_status=ApplicationStatus.APPLIED,
+        )
+        db.session.add(job)
+        db.session.flush()
+        for number in range(FILES_PER_JOB):
+            path = tmp_path / f"cv-{index}-{number}.txt"
+            path.write_text("python engineer")
+            db.session.add(
+                File(
+                    filename=path.name,
+                    file_path=str(path),
+                    file_type="resume",
+                    job_id=job.id,
+                )
+            )
+    db.session.add(
+        FileText(blob_digest="0" * 64, status=FileText.DONE, content="python engineer")
+    )
+    db.session.commit()
+    app.job_id = job.id
+    app.file_id = File.query.filter_by(job_id=job.id).first().id
+
+
+JOB = {
+    "company_name": "Acme",
+    "role_title": "Engineer",
+    "application_status": "applied",
+}
+
+# name, method, url, request kwargs, expected status, statement budget
+ENDPOINTS = [
+    # The latest job_changes id for the ETag, then the list
+    ("jobs.get_jobs", "GET", "/api/jobs/", {}, 200, 2),
+    ("jobs.get_jobs+text", "GET", "/api/jobs/?include=vacancy_text", {}, 200, 3),
+    # Rows are read while the response streams, in one batch here
+    ("jobs.export_jobs", "GET", "/api/jobs/export", {}, 200, 1),
+    # The vacancy texts of each batch in one more statement
+    (
+        "jobs.export_jobs+text",
+        "GET",
+        "/api/jobs/export?include=vacancy_text",
+        {},
+        200,
+        2,
+    ),
+    # The user, the duplicate check, then the job, its first job_status_events
+    # row, one user_job_stats upsert and its job_changes row, and the job again
+    # with its text
+    ("jobs.create_job", "POST", "/api/jobs/", {"json": JOB}, 201, 7),
+    (
+        "jobs.update_job",
+        "PUT",
+        "/api/jobs/{job_id}",
+        {"json": {"role_title": "Staff Engineer", "vacancy_text": "New text"}},
+        200,
+        5,
+    ),
+    # As above with the status change recorded and recounted instead of the
+    # vacancy text
+    (
+        "jobs.update_job+status",
+        "PUT",
+        "/api/jobs/{job_id}",
+        {"json": {"application_status": "interview"}},
+        200,
+        6,
+    ),
+    # Job and its files, status events, two DELETEs, one batch of tombstones
+    # the user_job_stats upsert and the job_changes row
+    ("jobs.delete_job", "DELETE", "/api/jobs/{job_id}", {}, 204, 8),
+    # Six of these keep blob reference counts and storage totals current
+    (
+        "jobs.upload_file",
+        "POST",
+        "/api/jobs/{job_id}/files",
+        {
+            "data": {"file": (io.BytesIO(b"new resume"), "resume.txt")},
+            "content_type": "multipart/form-data",
+        },
+        201,
+        9,
+    ),
+    (
+        "jobs.upload_file(link)",
+        "POST",
+        "/api/jobs/{job_id}/files",
+        {"json": {"file_id": "{file_id}"}},
+        201,
+        4,
+    ),
+    ("jobs.get_uploaded_files", "GET", "/api/jobs/files", {}, 200, 1),
+    ("jobs.search_files", "GET", "/api/jobs/files/search?q=python", {}, 200, 1),
+    (
+        "jobs.download_file",
+        "GET",
+        "/api/jobs/{job_id}/files/{file_id}",
+        {},
+        200,
+        1,
+    ),
+    ("jobs.get_job", "GET", "/api/jobs/{job_id}", {}, 200, 1),
+    ("jobs.get_job_timeline", "GET", "/api/jobs/{job_id}/timeline", {}, 200, 2),
+    ("jobs.get_status_analytics", "GET", "/api/jobs/analytics", {}, 200, 2),
+    ("jobs.get_job_stats", "GET", "/api/jobs/stats", {}, 200, 1),
+    # The names of every job, then the grouped ones
+    ("jobs.get_duplicates", "GET", "/api/jobs/duplicates", {}, 200, 2),
+    # Resuming from the start: the prune, three lookups for pruned changes,
+    # then job_changes and the changed jobs in one batch, and job_changes
+    # again before the stream waits
+    (
+        "jobs.stream_job_events",
+        "GET",
+        "/api/jobs/events",
+        {"headers": {"Last-Event-ID": "0"}},
+        200,
+        7,
+    ),
+    # The version lookup, then the counters, rejections, waiting applications,
+    # activity and milestones
+    ("dashboard.get_dashboard", "GET", "/api/dashboard", {}, 200, 6),
+    (
+        "auth.register",
+        "POST",
+        "/api/auth/register",
+        {"json": {"email": "new@example.com", "password": "x" * 12}},
+        201,
+        3,
+    ),
+    (
+        "auth.login",
+        "POST",
+        "/api/auth/login",
+        {"json": {"email": "user@example.com", "password": PASSWORD}},
+        200,
+        1,
+    ),
+    ("auth.get_current_user", "GET", "/api/auth/me", {}, 200, 1),
+    ("auth.refresh", "POST", "/api/auth/refresh", {}, 200, 1),
+    (
+        "auth.update_user",
+        "PUT",
+        "/api/auth/update",
+        {"json": {"first_name": "B"}},
+        200,
+        3,
+    ),
+]
+
+
+def _fill(value, app):
+    if isinstance(value, str):
+        return value.format(job_id=app.job_id, file_id=app.file_id)
+    if isinstance(value, dict):
+        filled = {key: _fill(item, app) for key, item in value.items()}
+        if filled.get("file_id"):
+            filled["file_id"] = int(filled["file_id"])
+        return filled
+    return value
+
+
+@pytest.mark.parametrize(
+    "method, url, kwargs, status, budget",
+    [endpoint[1:] for endpoint in ENDPOINTS],
+    ids=[endpoint[0] for endpoint in ENDPOINTS],
+)
+def test_endpoint_stays_within_query_budget(
+    app, client, method, url, kwargs, status, budget
+):
+    url, kwargs = _fill(url, app), _fill(kwargs, app)
+    with query_budget(budget, db.engines.values(), repeat_threshold=3) as log:
+        response = client.open(url, method=method, **kwargs)
+        # Streamed responses run their queries while the body is read, after
+        # X-Query-Count was sent
+        streamed = response.is_streamed
+        body = response.get_data(as_text=True)
+    assert response.status_code == status, body
+    if not streamed:
+        assert response.headers["X-Query-Count"] == str(log.count)
+
+
+def test_every_route_has_a_budget(app):
+    covered = {name.split("+")[0].split("(")[0] for name, *_ in ENDPOINTS}
+    routes = {
+        rule.endpoint.replace("auth_bp", "auth")
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint.split(".")[0] in ("jobs", "auth", "dashboard")
+    }
+    assert routes <= covered, routes - covered
+
+
+def test_profiler_logs_repeated_statements(app, client, caplog):
+    @app.route("/n-plus-one")
+    def n_plus_one():
+        jobs = Job.query.filter_by(user_id=app.user_id).all()
+        return {"files": sum(len(job.files) for job in jobs)}
+
+    with caplog.at_level("WARNING", logger="services.query_profiler"):
+        response = client.get("/n-plus-one")
+
+    assert response.get_json() == {"files": JOBS_PER_USER * FILES_PER_JOB}
+    [record] = [r for r in caplog.records if "possible N+1" in r.getMessage()]
+    assert "FROM files" in record.statement
+    assert any("in n_plus_one" in frame for frame in record.stack)
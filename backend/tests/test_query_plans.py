@@ -0,0 +1,190 @@
+"""Query-plan regression tests for the hot queries in routes/jobs.py.
+
+A large dataset is seeded once, each endpoint is called while the SQL it
+emits is captured, and every captured SELECT is run through EXPLAIN. A test
+fails if the plan reads a whole table instead of using an index.
+
+The suite runs against a temporary SQLite database by default. Point
+TEST_DATABASE_URL at a scratch PostgreSQL database to check the plans
+PostgreSQL picks; all tables in it are dropped afterwards.
+"""
+
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "query-plan-tests-" + "x" * 32)
+
+from app import create_app
+from extensions import db
+from flask_jwt_extended import create_access_token
+from models.models import File, Job
+from services.dataset import SyntheticDataset, analyze, load
+from sqlalchemy import event
+
+USERS = int(os.environ.get("QUERY_PLAN_USERS", 2000))
+JOBS_PER_USER = int(os.environ.get("QUERY_PLAN_JOBS_PER_USER", 20))
+
+# Tables large enough that a full scan is never the right plan
+SEEDED_TABLES = {
+    "users",
+    "jobs",
+    "files",
+    "blobs",
+    "file_texts",
+    "job_status_events",
+    "user_job_stats",
+}
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    tmp_dir = tmp_path_factory.mktemp("plans")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(
+            "DATABASE_URL",
+            os.environ.get("TEST_DATABASE_URL", f"sqlite:///{tmp_dir / 'plans.db'}"),
+        )
+        mp.delenv("DATABASE_REPLICA_URLS", raising=False)
+        mp.setenv("UPLOAD_FOLDER", str(tmp_dir / "uploads"))
+        mp.setenv("EXTRACTION_WORKERS", "0")
+        mp.setenv("DB_SCHEMA_CHECK", "off")
+        app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        load(db.engine, SyntheticDataset(USERS, JOBS_PER_USER, seed=1234))
+        analyze(db.engine)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope="module")
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope="module")
+def headers(app):
+    # A user in the middle of the id range, so neither end of an index helps
+    user_id = USERS // 2
+    token = create_access_token(identity=str(user_id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="module")
+def owned(app):
+    """A job of the test user that has a file attached"""
+    file = (
+        File.query.join(Job)
+        .filter(Job.user_id == USERS // 2)
+        .order_by(File.id.desc())
+        .first()
+    )
+    return {"job_id": file.job_id, "file_id": file.id}
+
+
+@contextmanager
+def captured_selects(engine):
+    """Collect every SELECT sent to the database inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _sqlite_full_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    scans = []
+    for row in plan:
+        # "SCAN jobs" reads the table; "SCAN jobs USING INDEX ..." does not
+        match = re.match(r"SCAN (\w+)(?: AS \w+)?$", row[-1])
+        if match and match.group(1) in SEEDED_TABLES:
+            scans.append(match.group(1))
+    return scans
+
+
+def _postgres_seq_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    document = plan.scalar()
+    if isinstance(document, str):
+        document = json.loads(document)
+
+    scans = []
+    nodes = [document[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if (
+            node["Node Type"] == "Seq Scan"
+            and node.get("Relation Name") in SEEDED_TABLES
+        ):
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def full_table_scans(statements):
+    """Return ``(table, sql)`` for every captured query that scans a table"""
+    offenders = []
+    with db.engine.connect() as conn:
+        explain = (
+            _postgres_seq_scans
+            if conn.dialect.name == "postgresql"
+            else _sqlite_full_scans
+        )
+        for statement, parameters in statements:
+            for table in explain(conn, statement, parameters):
+                offenders.append((table, " ".join(statement.split())))
+    return offenders
+
+
+HOT_REQUESTS = [
+    ("list_jobs", "GET", "/api/jobs/", None),
+    ("list_jobs_with_text", "GET", "/api/jobs/?include=vacancy_text", None),
+    ("get_job", "GET", "/api/jobs/{job_id}", None),
+    ("job_timeline", "GET", "/api/jobs/{job_id}/timeline", None),
+    ("status_analytics", "GET", "/api/jobs/analytics", None),
+    ("job_stats", "GET", "/api/jobs/stats", None),
+    ("update_job", "PUT", "/api/jobs/{job_id}", {"company_name": "Updated"}),
+    ("link_file", "POST", "/api/jobs/{job_id}/files", {"file_id": "{file_id}"}),
+    ("list_files", "GET", "/api/jobs/files", None),
+    ("search_files", "GET", "/api/jobs/files/search?q=python", None),
+    ("download_file", "GET", "/api/jobs/{job_id}/files/{file_id}", None),
+    ("delete_job", "DELETE", "/api/jobs/{job_id}", None),
+]
+
+
+@pytest.mark.parametrize(
+    "method,url,body", [r[1:] for r in HOT_REQUESTS], ids=[r[0] for r in HOT_REQUESTS]
+)
+def test_hot_query_uses_indexes(app, client, headers, owned, method, url, body):
+    url = url.format(**owned)
+    if body is not None:
+        body = {
+            key: int(value.format(**owned)) if value.startswith("{") else value
+            for key, value in body.items()
+        }
+
+    with captured_selects(db.engine) as statements:
+        response = client.open(url, method=method, json=body, headers=headers)
+
+    assert response.status_code < 500, response.get_data(as_text=True)
+    assert statements, f"{method} {url} ran no queries"
+    assert full_table_scans(statements) == []
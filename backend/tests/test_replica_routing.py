@@ -0,0 +1,145 @@
+"""Tests for routing read-only requests to a read replica.
+
+Two SQLite files stand in for the primary and the replica. "Replication" is
+copying the primary file over the replica, so every test controls exactly
+how far the replica lags behind.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CORS_ORIGINS", "http://localhost")
+os.environ.setdefault("JWT_SECRET_KEY", "replica-routing-tests-" + "x" * 32)
+
+from app import create_app
+from extensions import db
+from flask_jwt_extended import create_access_token
+from models.enums import ApplicationStatus
+from models.models import Job, User
+from services.replicas import STICKY_COOKIE
+
+JOB = {
+    "company_name": "Acme",
+    "role_title": "Engineer",
+    "application_status": "applied",
+}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setenv("DB_REPLICA_STICKY_SECONDS", "30")
+    monkeypatch.setenv("UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("DB_SCHEMA_CHECK", "off")
+    app = create_app()
+    app.config["TESTING"] = True
+    app.replicate = lambda: _replicate(app, tmp_path)
+
+    with app.app_context():
+        db.create_all()
+        user = User(email="reader@example.com", password_hash="")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+        app.user_id = user.id
+        app.replicate()
+        yield app
+        db.session.remove()
+
+
+def _replicate(app, tmp_path):
+    """Bring the replica up to date with the primary"""
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+    shutil.copyfile(tmp_path / "primary.db", tmp_path / "replica.db")
+
+
+@pytest.fixture
+def headers(app):
+    token = create_access_token(identity=str(app.user_id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _insert_job_on_primary(user_id):
+    """Write a job without going through a request (no stickiness)"""
+    job = Job(
+        user_id=user_id,
+        company_name="Direct",
+        role_title="Engineer",
+        application_status=ApplicationStatus.APPLIED,
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_get_reads_from_replica(app, headers):
+    job_id = _insert_job_on_primary(app.user_id)
+
+    client = app.test_client()
+    assert client.get("/api/jobs/", headers=headers).get_json() == []
+    assert client.get(f"/api/jobs/{job_id}", headers=headers).status_code == 404
+
+    app.replicate()
+    jobs = client.get("/api/jobs/", headers=headers).get_json()
+    assert [job["id"] for job in jobs] == [job_id]
+
+
+def test_writes_go_to_primary(app, headers):
+    response = app.test_client().post("/api/jobs/", json=JOB, headers=headers)
+    assert response.status_code == 201
+
+    assert db.session.get(Job, response.get_json()["id"]) is not None
+
+
+def test_reads_stick_to_primary_after_own_write(app, headers):
+    client = app.test_client()
+    response = client.post("/api/jobs/", json=JOB, headers=headers)
+    job_id = response.get_json()["id"]
+    assert STICKY_COOKIE in response.headers.get("Set-Cookie", "")
+
+    # Same browser: pinned through the cookie
+    assert client.get(f"/api/jobs/{job_id}", headers=headers).status_code == 200
+    # Same user without the cookie: pinned in this process
+    other_client = app.test_client()
+    assert other_client.get(f"/api/jobs/{job_id}", headers=headers).status_code == 200
+
+
+def test_other_users_are_not_pinned(app, headers):
+    other = User(email="other@example.com", password_hash="")
+    db.session.add(other)
+    db.session.commit()
+    other_id = other.id
+    app.replicate()
+
+    app.test_client().post("/api/jobs/", json=JOB, headers=headers)
+    _insert_job_on_primary(other_id)
+
+    # The other user still reads from the (now stale) replica
+    token = create_access_token(identity=str(other_id))
+    response = app.test_client().get(
+        "/api/jobs/", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.get_json() == []
+
+
+def test_stickiness_expires(app, headers):
+    app.extensions["replica_router"].sticky_seconds = -1
+    client = app.test_client()
+    job_id = client.post("/api/jobs/", json=JOB, headers=headers).get_json()["id"]
+
+    assert client.get(f"/api/jobs/{job_id}", headers=headers).status_code == 404
+
+
+def test_failed_writes_do_not_pin(app, headers):
+    client = app.test_client()
+    response = client.post("/api/jobs/", json={"company_name": "x"}, headers=headers)
+    assert response.status_code == 400
+    assert STICKY_COOKIE not in response.headers.get("Set-Cookie", "")
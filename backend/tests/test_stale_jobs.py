@@ -0,0 +1,104 @@
+"""Tests for the NO_ANSWER stale-application sweeper"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import Job, JobStatusEvent, User
+from services import job_stats
+from services.stale_jobs import sweep
+
+NOW = datetime.utcnow()
+
+
+@pytest.fixture
+def app_users():
+    return []
+
+
+def add_job(user, days_ago, status=ApplicationStatus.APPLIED, rejected_after=None):
+    """A job applied ``days_ago``, optionally rejected ``rejected_after`` days
+    after applying"""
+    job = Job(
+        user=user,
+        company_name="Acme",
+        role_title="Dev",
+        application_status=status,
+        date_applied=NOW - timedelta(days=days_ago),
+    )
+    db.session.add(job)
+    db.session.commit()
+    if rejected_after is not None:
+        job.application_status = ApplicationStatus.REJECTED
+        db.session.commit()
+        JobStatusEvent.query.filter_by(
+            job_id=job.id, to_status=ApplicationStatus.REJECTED
+        ).update({"occurred_at": job.date_applied + timedelta(days=rejected_after)})
+        db.session.commit()
+    return job.id
+
+
+@pytest.fixture
+def jobs(app):
+    # Rejections after 10, 20 and 30 days: threshold 20 + 2 * 8.2 = 36.3 days
+    seasoned = User(email="seasoned@example.com", password_hash="x")
+    new = User(email="new@example.com", password_hash="x")
+    db.session.add_all([seasoned, new])
+    for days in (10, 20, 30):
+        add_job(seasoned, 60, rejected_after=days)
+    return {
+        "stale": add_job(seasoned, 40),
+        "waiting": add_job(seasoned, 33),
+        "interviewing": add_job(seasoned, 100, ApplicationStatus.INTERVIEW),
+        # Too few rejections for a threshold of their own: 30 days
+        "new_stale": add_job(new, 31),
+        "new_waiting": add_job(new, 20),
+    }
+
+
+def statuses(jobs):
+    return {
+        name: db.session.get(Job, job_id).application_status.value
+        for name, job_id in jobs.items()
+    }
+
+
+def test_dry_run_changes_nothing(jobs):
+    stats = sweep(batch_size=1, dry_run=True)
+
+    assert stats == {"users": 2, "batches": 2, "jobs": 2}
+    assert ApplicationStatus.NO_ANSWER.value not in statuses(jobs).values()
+
+
+def test_sweep_marks_jobs_past_each_users_threshold(jobs):
+    stats = sweep(batch_size=1)
+
+    assert stats["jobs"] == 2
+    assert statuses(jobs) == {
+        "stale": "no_answer",
+        "waiting": "applied",
+        "interviewing": "interview",
+        "new_stale": "no_answer",
+        "new_waiting": "applied",
+    }
+    # History and counters are kept as if the jobs were edited one by one
+    assert [
+        (event.from_status, event.to_status)
+        for event in JobStatusEvent.query.filter_by(job_id=jobs["stale"]).order_by(
+            JobStatusEvent.id
+        )
+    ] == [
+        (None, ApplicationStatus.APPLIED),
+        (ApplicationStatus.APPLIED, ApplicationStatus.NO_ANSWER),
+    ]
+    assert job_stats.check() == {}
+    summary = job_stats.summary(db.session.get(Job, jobs["new_stale"]).user_id)
+    assert summary["active"] == 1
+    assert summary["by_status"]["no_answer"] == 1
+
+    assert sweep()["jobs"] == 0
+
+
+def test_min_days_overrides_a_short_threshold(jobs):
+    assert sweep(min_days=45)["jobs"] == 0
@@ -0,0 +1,115 @@
+"""Tests for job status history, timelines and status analytics"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from conftest import auth_headers, create_job
+from extensions import db
+from models.enums import ApplicationStatus
+from models.models import Job, JobStatusEvent, User
+from services import job_stats
+
+
+def set_status(client, job_id, status):
+    response = client.put(f"/api/jobs/{job_id}", json={"application_status": status})
+    assert response.status_code == 200
+
+
+def backdate(job_id, *days_ago):
+    """Move a job's events to the given number of days ago, oldest first"""
+    now = datetime.utcnow()
+    events = JobStatusEvent.query.filter_by(job_id=job_id).order_by(JobStatusEvent.id)
+    for event, days in zip(events, days_ago):
+        event.occurred_at = now - timedelta(days=days)
+    db.session.commit()
+
+
+def test_status_changes_are_recorded_in_order(client):
+    job_id = create_job(client)
+    set_status(client, job_id, "screening_call")
+    client.put(f"/api/jobs/{job_id}", json={"role_title": "Senior Dev"})
+    set_status(client, job_id, "screening_call")
+    set_status(client, job_id, "interview")
+    backdate(job_id, 10, 6, 2)
+
+    timeline = client.get(f"/api/jobs/{job_id}/timeline").get_json()["events"]
+
+    assert [(e["from_status"], e["to_status"]) for e in timeline] == [
+        (None, "applied"),
+        ("applied", "screening_call"),
+        ("screening_call", "interview"),
+    ]
+    assert [e["days_in_status"] for e in timeline[:2]] == [4.0, 4.0]
+    assert [e["current"] for e in timeline] == [False, False, True]
+    assert timeline[2]["days_in_status"] == pytest.approx(2, abs=0.01)
+
+
+def test_timeline_is_scoped_to_the_owner(app, client):
+    job_id = create_job(client)
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+
+    response = client.get(
+        f"/api/jobs/{job_id}/timeline", headers=auth_headers(other.id)
+    )
+    assert response.status_code == 404
+
+
+def test_analytics_report_time_in_status_and_funnel(client):
+    interviewed = create_job(client)
+    set_status(client, interviewed, "screening_call")
+    set_status(client, interviewed, "interview")
+    backdate(interviewed, 9, 7, 1)
+    rejected = create_job(client)
+    set_status(client, rejected, "rejected")
+    backdate(rejected, 5, 2)
+    create_job(client, "not_yet_applied")
+
+    analytics = client.get("/api/jobs/analytics").get_json()
+
+    stages = {row["status"]: row for row in analytics["time_in_status"]}
+    assert stages["applied"]["jobs"] == 2
+    assert stages["applied"]["avg_days"] == 2.5
+    assert stages["applied"]["current"] == 0
+    assert stages["interview"]["current"] == 1
+    assert stages["interview"]["avg_days"] is None
+
+    funnel = {row["status"]: row for row in analytics["funnel"]["stages"]}
+    assert funnel["not_yet_applied"]["jobs"] == 3
+    assert funnel["applied"]["jobs"] == 2
+    assert funnel["screening_call"]["jobs"] == 1
+    assert funnel["test_task"]["jobs"] == 1
+    assert funnel["interview"]["step_rate"] == 1.0
+    assert funnel["offer"]["jobs"] == 0
+    assert funnel["applied"]["rate"] == round(2 / 3, 4)
+    assert analytics["funnel"]["rejected"] == 1
+
+
+def test_deleting_a_job_removes_its_history(client):
+    job_id = create_job(client)
+    set_status(client, job_id, ApplicationStatus.OFFER.value)
+
+    assert client.delete(f"/api/jobs/{job_id}").status_code == 204
+    assert JobStatusEvent.query.filter_by(job_id=job_id).count() == 0
+
+
+def test_changing_an_expired_job_records_what_it_changed_from(app, client):
+    job_id = create_job(client, source="linkedin")
+    job = db.session.get(Job, job_id)
+    db.session.expire(job)
+
+    job.application_status = ApplicationStatus.INTERVIEW
+    job.source = None
+    db.session.commit()
+
+    events = JobStatusEvent.query.filter_by(job_id=job_id).order_by(JobStatusEvent.id)
+    assert [(e.from_status, e.to_status) for e in events] == [
+        (None, ApplicationStatus.APPLIED),
+        (ApplicationStatus.APPLIED, ApplicationStatus.INTERVIEW),
+    ]
+    assert job_stats.check() == {}
+    summary = job_stats.summary(app.user_id)
+    assert summary["by_status"]["applied"] == 0
+    assert summary["by_status"]["interview"] == 1
+    assert summary["by_source"]["linkedin"] == 0
@@ -0,0 +1,98 @@
+"""Tests for the upload garbage collector and per-user storage totals"""
+
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+from conftest import create_job
+from extensions import db
+from models.models import Blob, File, User
+from services.upload_gc import collect_garbage, rebuild_storage_totals
+
+GRACE = timedelta(hours=1)
+
+
+def upload(client, job_id, content, name="cv.txt"):
+    response = client.post(
+        f"/api/jobs/{job_id}/files",
+        data={"file": (io.BytesIO(content), name), "file_type": "resume"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["digest"]
+
+
+def age(path, hours=2):
+    past = time.time() - hours * 3600
+    os.utime(path, (past, past))
+
+
+def storage_bytes(app):
+    db.session.expire_all()
+    return db.session.get(User, app.user_id).storage_bytes
+
+
+def test_unreferenced_blobs_are_collected_after_the_grace_period(app, client):
+    blobs = app.extensions["blobstore"]
+    kept = upload(client, create_job(client), b"kept resume")
+    deleted_job = create_job(client)
+    deleted = upload(client, deleted_job, b"deleted cover letter")
+    assert storage_bytes(app) == len(b"kept resume") + len(b"deleted cover letter")
+
+    assert client.delete(f"/api/jobs/{deleted_job}").status_code == 204
+    assert storage_bytes(app) == len(b"kept resume")
+    assert db.session.get(Blob, deleted).ref_count == 0
+
+    # Inside the grace period nothing goes
+    assert collect_garbage(grace=GRACE)["blobs"] == 0
+    assert blobs.exists(deleted)
+
+    Blob.query.update({Blob.updated_at: datetime.utcnow() - 2 * GRACE})
+    db.session.commit()
+    for digest in (kept, deleted):
+        age(blobs.path_for(digest))
+    stats = collect_garbage(grace=GRACE)
+
+    assert stats["blobs"] == 1
+    assert stats["bytes"] == len(b"deleted cover letter")
+    assert not blobs.exists(deleted)
+    assert db.session.get(Blob, deleted) is None
+    assert blobs.exists(kept)
+    assert db.session.get(Blob, kept).ref_count == 1
+
+    rebuild_storage_totals()
+    assert storage_bytes(app) == len(b"kept resume")
+
+
+def test_legacy_files_are_matched_by_name_and_only_collected_on_request(app, client):
+    root = app.extensions["blobstore"].root
+    os.makedirs(root, exist_ok=True)
+    for name in ("referenced.pdf", "orphan.pdf", "fresh.pdf"):
+        with open(os.path.join(root, name), "wb") as f:
+            f.write(b"legacy upload")
+    age(os.path.join(root, "referenced.pdf"))
+    age(os.path.join(root, "orphan.pdf"))
+    # Saved while UPLOAD_FOLDER was a relative path
+    db.session.add(
+        File(
+            filename="referenced.pdf",
+            file_path="uploads/referenced.pdf",
+            file_type="resume",
+            job_id=create_job(client),
+        )
+    )
+    db.session.commit()
+
+    assert collect_garbage(grace=GRACE)["legacy_files"] == 0
+    assert (
+        collect_garbage(grace=GRACE, dry_run=True, legacy_files=True)["legacy_files"]
+        == 1
+    )
+    assert os.path.exists(os.path.join(root, "orphan.pdf"))
+
+    stats = collect_garbage(grace=GRACE, legacy_files=True)
+
+    assert stats["legacy_files"] == 1
+    assert stats["bytes"] == len(b"legacy upload")
+    assert sorted(os.listdir(root)) == ["fresh.pdf", "referenced.pdf"]
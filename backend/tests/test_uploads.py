@@ -0,0 +1,128 @@
+"""Tests for resumable uploads"""
+
+import hashlib
+import os
+
+import pytest
+from conftest import create_job
+from extensions import blobs, db
+from models.models import File, UploadSession, User
+from services import uploads
+
+CONTENT = b"0123456789" * 10
+
+
+def start(client, job_id, size=len(CONTENT)):
+    response = client.post(
+        "/api/uploads/",
+        json={"job_id": job_id, "filename": "cv.pdf", "size": size},
+    )
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()["id"]
+
+
+def put(client, upload_id, offset, body):
+    return client.put(
+        f"/api/uploads/{upload_id}", data=body, headers={"Upload-Offset": str(offset)}
+    )
+
+
+def test_chunks_are_written_in_order_and_completed(app, client):
+    job_id = create_job(client)
+    upload_id = start(client, job_id)
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["offset"] == 0
+
+    response = put(client, upload_id, 0, CONTENT[:40])
+    assert response.status_code == 200
+    assert response.headers["Upload-Offset"] == "40"
+
+    # A chunk resent from the wrong offset is told where to resume
+    response = put(client, upload_id, 10, CONTENT[10:50])
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 40
+
+    response = client.post(f"/api/uploads/{upload_id}/complete")
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "40"
+
+    assert put(client, upload_id, 40, CONTENT[40:]).status_code == 200
+    response = client.post(f"/api/uploads/{upload_id}/complete")
+
+    assert response.status_code == 201
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    assert response.get_json()["digest"] == digest
+    with open(blobs.path_for(digest), "rb") as f:
+        assert f.read() == CONTENT
+    assert not os.path.exists(blobs.partial_path(upload_id))
+    assert db.session.get(UploadSession, upload_id) is None
+    assert File.query.filter_by(job_id=job_id, blob_digest=digest).count() == 1
+    assert db.session.get(User, app.user_id).storage_bytes == len(CONTENT)
+
+
+def test_chunk_past_the_declared_size_is_rejected(client):
+    upload_id = start(client, create_job(client), size=10)
+    response = put(client, upload_id, 0, CONTENT[:20])
+    assert response.status_code == 413
+
+
+def test_chunk_and_complete_are_refused_while_the_upload_is_locked(client):
+    upload_id = start(client, create_job(client))
+    assert put(client, upload_id, 0, CONTENT).status_code == 200
+
+    with uploads.locked(blobs.partial_path(upload_id)):
+        assert put(client, upload_id, len(CONTENT), b"x").status_code == 409
+        response = client.post(f"/api/uploads/{upload_id}/complete")
+        assert response.status_code == 409
+
+    assert client.post(f"/api/uploads/{upload_id}/complete").status_code == 201
+
+
+def test_writer_that_opened_the_upload_before_it_completed_is_refused(
+    client, monkeypatch
+):
+    upload_id = start(client, create_job(client))
+    assert put(client, upload_id, 0, CONTENT).status_code == 200
+    path = blobs.partial_path(upload_id)
+    flock = uploads.fcntl.flock
+
+    def complete_then_lock(fh, operation):
+        # The upload completes between the late writer's open and its lock
+        os.replace(path, path + ".adopted")
+        flock(fh, operation)
+
+    monkeypatch.setattr(uploads.fcntl, "flock", complete_then_lock)
+    with pytest.raises(uploads.UploadClosed):
+        with uploads.locked(path):
+            pass
+
+
+@pytest.mark.parametrize("app_environ", [{"USER_STORAGE_QUOTA": "150"}])
+def test_quota_is_checked_before_the_blob_is_stored(app, client):
+    job_id = create_job(client)
+    upload_id = start(client, job_id)
+    assert put(client, upload_id, 0, CONTENT).status_code == 200
+    user = db.session.get(User, app.user_id)
+    user.storage_bytes = 100
+    db.session.commit()
+
+    response = client.post(f"/api/uploads/{upload_id}/complete")
+
+    assert response.status_code == 413
+    assert not blobs.exists(hashlib.sha256(CONTENT).hexdigest())
+    assert db.session.get(UploadSession, upload_id) is not None
+    assert os.path.getsize(blobs.partial_path(upload_id)) == len(CONTENT)
+
+    user.storage_bytes = 0
+    db.session.commit()
+    assert client.post(f"/api/uploads/{upload_id}/complete").status_code == 201
+
+
+def test_aborted_upload_is_discarded(client):
+    upload_id = start(client, create_job(client))
+    assert put(client, upload_id, 0, CONTENT[:30]).status_code == 200
+
+    assert client.delete(f"/api/uploads/{upload_id}").status_code == 204
+
+    assert not os.path.exists(blobs.partial_path(upload_id))
+    assert db.session.get(UploadSession, upload_id) is None
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
@@ -0,0 +1,74 @@
+"""Tests for vacancy texts stored in the vacancy_texts side table"""
+
+import zlib
+
+from conftest import auth_headers, create_job
+from extensions import db
+from models.models import EXCERPT_LENGTH, Job, User, VacancyText
+
+TEXT = "We are hiring a backend engineer. " * 20
+
+
+def test_text_round_trips_through_the_side_table(client):
+    job_id = create_job(client, vacancy_text=TEXT)
+
+    response = client.get(f"/api/jobs/{job_id}")
+    assert response.get_json()["vacancy_text"] == TEXT
+
+    job = db.session.get(Job, job_id)
+    assert "_pending_vacancy_text" not in job.__dict__
+    assert job.vacancy_digest == VacancyText.digest_for(TEXT)
+    assert job.vacancy_excerpt == TEXT[:EXCERPT_LENGTH]
+    row = db.session.get(VacancyText, job.vacancy_digest)
+    assert row.size == len(TEXT.encode("utf-8"))
+    assert zlib.decompress(row.body).decode("utf-8") == TEXT
+
+    # Read back after a flush, with the old text already loaded
+    assert job.vacancy_text == TEXT
+    job.vacancy_text = "Role filled"
+    db.session.flush()
+    assert "_pending_vacancy_text" not in job.__dict__
+    assert job.vacancy_text == "Role filled"
+    db.session.commit()
+
+    response = client.put(f"/api/jobs/{job_id}", json={"vacancy_text": ""})
+    assert response.get_json()["vacancy_text"] is None
+    job = db.session.get(Job, job_id)
+    assert job.vacancy_digest is None
+    assert job.vacancy_excerpt is None
+
+
+def test_identical_texts_are_stored_once(app, client):
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.commit()
+
+    create_job(client, vacancy_text=TEXT)
+    create_job(client, vacancy_text=TEXT)
+    response = client.post(
+        "/api/jobs/",
+        json={
+            "company_name": "Globex",
+            "role_title": "Dev",
+            "application_status": "applied",
+            "vacancy_text": TEXT,
+        },
+        headers=auth_headers(other.id),
+    )
+    assert response.status_code == 201
+    create_job(client, vacancy_text="Something else")
+
+    assert VacancyText.query.count() == 2
+    assert Job.query.filter_by(vacancy_digest=VacancyText.digest_for(TEXT)).count() == 3
+
+
+def test_job_list_sends_full_texts_only_on_request(client):
+    create_job(client, vacancy_text=TEXT)
+
+    [job] = client.get("/api/jobs/").get_json()
+    assert job["vacancy_excerpt"] == TEXT[:EXCERPT_LENGTH]
+    assert "vacancy_text" not in job
+
+    [job] = client.get("/api/jobs/?include=vacancy_text").get_json()
+    assert job["vacancy_excerpt"] == TEXT[:EXCERPT_LENGTH]
+    assert job["vacancy_text"] == TEXT
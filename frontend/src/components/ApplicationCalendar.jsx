@@ -1,50 +1,12 @@
-import { useState, useEffect } from 'react';
 import { Box, Typography, Paper } from '@mui/material';
 import CalendarHeatmap from 'react-calendar-heatmap';
 import 'react-calendar-heatmap/dist/styles.css';
-import { format, parseISO, startOfYear } from 'date-fns';
+import { format, startOfYear } from 'date-fns';
 import React from 'react';
-import { API_BASE_URL } from '../utils/auth';
 
-const ApplicationCalendar = () => {
-    const [calendarData, setCalendarData] = useState([]);
+const ApplicationCalendar = ({ activity: calendarData = [] }) => {
     const startDate = startOfYear(new Date());
 
-    useEffect(() => {
-        fetchApplicationData();
-    }, []);
-
-    const fetchApplicationData = async () => {
-        try {
-            const token = localStorage.getItem('token');
-            const response = await fetch(`${API_BASE_URL}/api/jobs/`, {
-                headers: {
-                    'Authorization': `Bearer ${token}`,
-                },
-            });
-
-            if (response.ok) {
-                const jobs = await response.json();
-                const applicationCounts = jobs.reduce((acc, job) => {
-                    if (job.date_applied) {
-                        const date = format(parseISO(job.date_applied), 'yyyy-MM-dd');
-                        acc[date] = (acc[date] || 0) + 1;
-                    }
-                    return acc;
-                }, {});
-
-                const data = Object.entries(applicationCounts).map(([date, count]) => ({
-                    date,
-                    count
-                }));
-
-                setCalendarData(data);
-            }
-        } catch (error) {
-            console.error('Error fetching application data:', error);
-        }
-    };
-
     const formatDate = (dateString) => {
         return format(new Date(dateString), 'MMMM d, yyyy');
     };
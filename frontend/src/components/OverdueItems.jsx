@@ -1,41 +1,12 @@
-import { useState, useEffect } from 'react';
 import { Box, Typography, Paper, List, ListItem, ListItemText, Chip, IconButton } from '@mui/material';
-import { format, isPast, parseISO, differenceInDays } from 'date-fns';
+import { format, parseISO, differenceInDays } from 'date-fns';
 import OpenInNewIcon from '@mui/icons-material/OpenInNew';
 import { useNavigate } from 'react-router-dom';
-import { fetchWithAuth, API_BASE_URL } from '../utils/auth';
 import { alpha } from '@mui/material/styles';
 
-const OverdueItems = ({ averageRejectionDays }) => {
-    const [overdueJobs, setOverdueJobs] = useState([]);
+const OverdueItems = ({ jobs: overdueJobs = [], averageRejectionDays }) => {
     const navigate = useNavigate();
 
-    useEffect(() => {
-        fetchOverdueJobs();
-    }, []);
-
-    const fetchOverdueJobs = async () => {
-        try {
-            const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/`);
-
-            if (response.ok) {
-                const jobs = await response.json();
-                const overdue = jobs
-                    .filter(job =>
-                        job.next_milestone_date &&
-                        isPast(new Date(job.next_milestone_date)) &&
-                        job.application_status !== 'rejected'
-                    )
-                    .sort((a, b) =>
-                        new Date(a.next_milestone_date) - new Date(b.next_milestone_date)
-                    );
-                setOverdueJobs(overdue);
-            }
-        } catch (error) {
-            console.error('Error fetching overdue jobs:', error);
-        }
-    };
-
     const getStatusColor = (status) => {
         const colors = {
             not_yet_applied: 'default',
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import {
     Box,
     Typography,
@@ -10,128 +10,48 @@ import {
 } from '@mui/material';
 import ArrowBackIosNewIcon from '@mui/icons-material/ArrowBackIosNew';
 import ArrowForwardIosIcon from '@mui/icons-material/ArrowForwardIos';
-import { fetchWithAuth, API_BASE_URL } from '../utils/auth';
-import { differenceInDays, parseISO } from 'date-fns';
 
-function RejectionMetrics({ metrics }) {
-    const theme = useTheme();
-    const [currentSectionIndex, setCurrentSectionIndex] = useState(0);
-    const [extendedMetrics, setExtendedMetrics] = useState({
-        totalApplications: 0,
-        responseRate: 0,
-        stageMetrics: {},
-        activeApplications: 0,
-        standardDeviation: 0,
-        noAnswerThreshold: 0
+// Counts come from the dashboard's job counters, so no job list is needed
+const calculateExtendedMetrics = (summary, waiting) => {
+    const byStatus = summary?.by_status || {};
+    const totalApplications = summary?.total || 0;
+
+    const responsesReceived = totalApplications
+        - (byStatus.not_yet_applied || 0)
+        - (byStatus.applied || 0)
+        - (byStatus.no_answer || 0);
+    const responseRate = totalApplications > 0
+        ? Math.round((responsesReceived / totalApplications) * 100)
+        : 0;
+
+    // Share of jobs that are at a stage or further along
+    const stages = ['screening_call', 'interview', 'test_task', 'offer'];
+    const stageMetrics = {};
+    stages.forEach((stage, index) => {
+        const reachedStage = stages
+            .slice(index)
+            .reduce((sum, later) => sum + (byStatus[later] || 0), 0);
+        stageMetrics[stage] = totalApplications > 0
+            ? Math.round((reachedStage / totalApplications) * 100)
+            : 0;
     });
 
-    useEffect(() => {
-        fetchExtendedMetrics();
-    }, [metrics]);
-
-    const calculateStandardDeviation = (jobs, mean) => {
-        const appliedJobs = jobs.filter(job =>
-            job.date_applied &&
-            job.application_status !== 'rejected' &&
-            job.application_status !== 'offer'
-        );
-
-        if (appliedJobs.length === 0) return { standardDeviation: 0, noAnswerThreshold: 0 };
-
-        const squareDiffs = appliedJobs.map(job => {
-            const days = differenceInDays(new Date(), parseISO(job.date_applied));
-            return Math.pow(days - mean, 2);
-        });
-
-        const avgSquareDiff = squareDiffs.reduce((sum, diff) => sum + diff, 0) / squareDiffs.length;
-        const standardDeviation = Math.sqrt(avgSquareDiff);
-        const noAnswerThreshold = mean + (2 * standardDeviation);
-
-        return { standardDeviation, noAnswerThreshold };
+    // Jobs past the threshold are marked no_answer on the server
+    // (scripts/sweep_no_answer.py)
+    return {
+        totalApplications,
+        responseRate,
+        stageMetrics,
+        activeApplications: summary?.active || 0,
+        standardDeviation: waiting?.deviation_days || 0,
+        noAnswerThreshold: waiting?.threshold_days || 0
     };
+};
 
-    const fetchExtendedMetrics = async () => {
-        try {
-            const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/`);
-            if (response.ok) {
-                const jobs = await response.json();
-                const totalApplications = jobs.length;
-
-                // Calculate response rate
-                const responsesReceived = jobs.filter(job =>
-                    job.application_status !== 'not_yet_applied' &&
-                    job.application_status !== 'applied'
-                ).length;
-                const responseRate = totalApplications > 0
-                    ? Math.round((responsesReceived / totalApplications) * 100)
-                    : 0;
-
-                // Calculate stage metrics
-                const stages = ['screening_call', 'interview', 'test_task', 'offer'];
-                const stageMetrics = {};
-                stages.forEach(stage => {
-                    const reachedStage = jobs.filter(job =>
-                        stages.indexOf(job.application_status) >= stages.indexOf(stage)
-                    ).length;
-                    stageMetrics[stage] = totalApplications > 0
-                        ? Math.round((reachedStage / totalApplications) * 100)
-                        : 0;
-                });
-
-                // Calculate active applications and identify no-answer cases
-                const activeJobs = jobs.filter(job =>
-                    job.application_status !== 'rejected' &&
-                    job.application_status !== 'offer'
-                );
-
-                const activeApplications = activeJobs.length;
-
-                // Calculate standard deviation and threshold
-                const { standardDeviation, noAnswerThreshold } = calculateStandardDeviation(
-                    jobs,
-                    metrics.averageDays
-                );
-
-                // Update jobs that exceed the threshold
-                const jobsToUpdate = activeJobs.filter(job => {
-                    if (!job.date_applied) return false;
-                    const days = differenceInDays(new Date(), parseISO(job.date_applied));
-                    return days > noAnswerThreshold;
-                });
-
-                // Update the status of jobs exceeding threshold
-                if (jobsToUpdate.length > 0) {
-                    jobsToUpdate.forEach(async (job) => {
-                        try {
-                            await fetchWithAuth(`${API_BASE_URL}/api/jobs/${job.id}`, {
-                                method: 'PUT',
-                                headers: {
-                                    'Content-Type': 'application/json',
-                                },
-                                body: JSON.stringify({
-                                    ...job,
-                                    application_status: 'no_answer'
-                                })
-                            });
-                        } catch (error) {
-                            console.error('Error updating job status:', error);
-                        }
-                    });
-                }
-
-                setExtendedMetrics({
-                    totalApplications,
-                    responseRate,
-                    stageMetrics,
-                    activeApplications,
-                    standardDeviation,
-                    noAnswerThreshold
-                });
-            }
-        } catch (error) {
-            console.error('Error fetching extended metrics:', error);
-        }
-    };
+function RejectionMetrics({ metrics, summary, waiting }) {
+    const theme = useTheme();
+    const [currentSectionIndex, setCurrentSectionIndex] = useState(0);
+    const extendedMetrics = calculateExtendedMetrics(summary, waiting);
 
     const MetricItem = ({ label, value, unit = '', color }) => (
         <Box sx={{ mb: 2 }}>
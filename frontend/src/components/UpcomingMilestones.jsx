@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import {
     Box,
     Typography,
@@ -14,45 +14,21 @@ import {
 import { format, parseISO, isWithinInterval, addDays } from 'date-fns';
 import OpenInNewIcon from '@mui/icons-material/OpenInNew';
 import { useNavigate } from 'react-router-dom';
-import { fetchWithAuth, API_BASE_URL } from '../utils/auth';
 import { alpha } from '@mui/material/styles';
 
-const UpcomingMilestones = () => {
-    const [upcomingJobs, setUpcomingJobs] = useState([]);
+const UpcomingMilestones = ({ jobs = [] }) => {
     const [daysRange, setDaysRange] = useState(13);
     const navigate = useNavigate();
 
-    useEffect(() => {
-        fetchUpcomingJobs();
-    }, [daysRange]);
-
-    const fetchUpcomingJobs = async () => {
-        try {
-            const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/`);
-
-            if (response.ok) {
-                const jobs = await response.json();
-                const now = new Date();
-                const futureDate = addDays(now, daysRange);
-
-                const upcoming = jobs
-                    .filter(job =>
-                        job.next_milestone_date &&
-                        job.application_status !== 'rejected' &&
-                        isWithinInterval(parseISO(job.next_milestone_date), {
-                            start: now,
-                            end: futureDate
-                        })
-                    )
-                    .sort((a, b) =>
-                        new Date(a.next_milestone_date) - new Date(b.next_milestone_date)
-                    );
-                setUpcomingJobs(upcoming);
-            }
-        } catch (error) {
-            console.error('Error fetching upcoming jobs:', error);
-        }
-    };
+    // The dashboard sends the milestones of the widest range; narrower ones
+    // are filtered here without another request
+    const now = new Date();
+    const upcomingJobs = jobs.filter(job =>
+        isWithinInterval(parseISO(job.next_milestone_date), {
+            start: now,
+            end: addDays(now, daysRange)
+        })
+    );
 
     const handleRangeChange = (event, newRange) => {
         if (newRange !== null) {
@@ -0,0 +1,74 @@
+import { useEffect, useRef } from 'react';
+import { fetchWithAuth, API_BASE_URL } from '../utils/auth';
+
+// Apply one event from /api/jobs/events to a list of jobs
+export const applyJobEvent = (jobs, event) => {
+    if (event.action === 'deleted') {
+        return jobs.filter(job => job.id !== event.job_id);
+    }
+    const exists = jobs.some(job => job.id === event.job.id);
+    return exists
+        ? jobs.map(job => (job.id === event.job.id ? { ...job, ...event.job } : job))
+        : [event.job, ...jobs];
+};
+
+// Calls onEvent for every job change of the current user, as it happens.
+// EventSource cannot send the Authorization header, so the stream is read
+// with fetch, reconnecting with Last-Event-ID so no change is missed.
+// onReset is called when changes were missed and the list must be refetched.
+export const useJobEvents = (onEvent, onReset) => {
+    const handlers = useRef({ onEvent, onReset });
+    handlers.current = { onEvent, onReset };
+
+    useEffect(() => {
+        const controller = new AbortController();
+        let lastEventId = null;
+        let retry = 3000;
+
+        const handleMessage = (message) => {
+            let event = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                const [field, ...rest] = line.split(':');
+                const value = rest.join(':').replace(/^ /, '');
+                if (field === 'id') lastEventId = value;
+                else if (field === 'event') event = value;
+                else if (field === 'data') data += value;
+                else if (field === 'retry') retry = Number(value) || retry;
+            });
+            if (event === 'job') {
+                handlers.current.onEvent(JSON.parse(data));
+            } else if (event === 'reset' && handlers.current.onReset) {
+                handlers.current.onReset();
+            }
+        };
+
+        const connect = async () => {
+            while (!controller.signal.aborted) {
+                try {
+                    const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/events`, {
+                        headers: lastEventId ? { 'Last-Event-ID': lastEventId } : {},
+                        signal: controller.signal,
+                    });
+                    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                    let buffer = '';
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += value;
+                        const messages = buffer.split('\n\n');
+                        buffer = messages.pop();
+                        messages.forEach(handleMessage);
+                    }
+                } catch (error) {
+                    if (controller.signal.aborted) return;
+                    console.error('Job event stream failed:', error);
+                    await new Promise(resolve => setTimeout(resolve, retry));
+                }
+            }
+        };
+
+        connect();
+        return () => controller.abort();
+    }, []);
+};
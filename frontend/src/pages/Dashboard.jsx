@@ -8,65 +8,36 @@ import OverdueItems from '../components/OverdueItems';
 import RejectionMetrics from '../components/RejectionMetrics';
 import UpcomingMilestones from '../components/UpcomingMilestones';
 import { fetchWithAuth, API_BASE_URL } from '../utils/auth';
-import { differenceInDays, parseISO } from 'date-fns';
 
 function Home() {
     const navigate = useNavigate();
-    const [rejectionMetrics, setRejectionMetrics] = useState({
-        averageDays: 0,
-        totalRejections: 0,
-        fastestRejection: Infinity,
-        slowestRejection: 0
-    });
+    const [dashboard, setDashboard] = useState(null);
 
     useEffect(() => {
-        fetchRejectionData();
+        fetchDashboard();
     }, []);
 
-    const fetchRejectionData = async () => {
+    // One request for every widget; the browser revalidates it with the ETag
+    const fetchDashboard = async () => {
         try {
-            const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/`);
+            const response = await fetchWithAuth(`${API_BASE_URL}/api/dashboard`);
 
             if (response.ok) {
-                const jobs = await response.json();
-                const rejectedJobs = jobs.filter(job =>
-                    job.application_status === 'rejected' &&
-                    job.date_applied
-                );
-
-                if (rejectedJobs.length === 0) {
-                    setRejectionMetrics({
-                        averageDays: 0,
-                        totalRejections: 0,
-                        fastestRejection: 0,
-                        slowestRejection: 0
-                    });
-                    return;
-                }
-
-                const rejectionTimes = rejectedJobs.map(job => {
-                    const applicationDate = parseISO(job.date_applied);
-                    const rejectionDate = parseISO(job.next_milestone_date);
-                    return differenceInDays(rejectionDate, applicationDate);
-                }).filter(days => days >= 0);
-
-                const totalDays = rejectionTimes.reduce((sum, days) => sum + days, 0);
-                const averageDays = Math.round(totalDays / rejectionTimes.length);
-                const fastestRejection = Math.min(...rejectionTimes);
-                const slowestRejection = Math.max(...rejectionTimes);
-
-                setRejectionMetrics({
-                    averageDays,
-                    totalRejections: rejectedJobs.length,
-                    fastestRejection,
-                    slowestRejection
-                });
+                setDashboard(await response.json());
             }
         } catch (error) {
-            console.error('Error fetching rejection data:', error);
+            console.error('Error fetching dashboard:', error);
         }
     };
 
+    const rejections = dashboard?.rejections;
+    const rejectionMetrics = {
+        averageDays: rejections?.average_days || 0,
+        totalRejections: rejections?.jobs || 0,
+        fastestRejection: rejections?.fastest_days || 0,
+        slowestRejection: rejections?.slowest_days || 0
+    };
+
     return (
         <Box sx={{ p: 3 }}>
             <Typography variant="h4" sx={{ mb: 4, fontWeight: 500 }}>
@@ -92,13 +63,20 @@ function Home() {
 
             <Box sx={{ display: 'grid', gridTemplateColumns: { xs: '1fr', md: '1.2fr 0.8fr' }, gap: 2 }}>
                 <Box sx={{ display: 'flex', flexDirection: 'column', gap: 2 }}>
-                    <UpcomingMilestones />
-                    <OverdueItems averageRejectionDays={rejectionMetrics.averageDays} />
+                    <UpcomingMilestones jobs={dashboard?.upcoming} />
+                    <OverdueItems
+                        jobs={dashboard?.overdue}
+                        averageRejectionDays={rejectionMetrics.averageDays}
+                    />
                 </Box>
                 <Box sx={{ display: 'flex', flexDirection: 'column', gap: 2 }}>
-                    <ApplicationCalendar />
+                    <ApplicationCalendar activity={dashboard?.activity} />
 
-                    <RejectionMetrics metrics={rejectionMetrics} />
+                    <RejectionMetrics
+                        metrics={rejectionMetrics}
+                        summary={dashboard?.summary}
+                        waiting={dashboard?.waiting}
+                    />
                 </Box>
             </Box>
         </Box>
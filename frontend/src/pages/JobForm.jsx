@@ -112,14 +112,28 @@ function JobForm() {
                 ? `${API_BASE_URL}/api/jobs/${id}/`
                 : `${API_BASE_URL}/api/jobs/`;
 
-            const response = await fetchWithAuth(url, {
+            const submit = (data) => fetchWithAuth(url, {
                 method: id ? 'PUT' : 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(submissionData),
+                body: JSON.stringify(data),
             });
 
+            // New jobs that look like ones already added are only created
+            // once the user confirms
+            let response = await submit(id ? submissionData : { ...submissionData, reject_duplicates: true });
+            if (response.status === 409) {
+                const { duplicates } = await response.json();
+                const existing = duplicates
+                    .map((job) => `- ${job.role_title} at ${job.company_name} (${job.application_status})`)
+                    .join('\n');
+                if (!window.confirm(`This looks like a job you have already added:\n${existing}\n\nAdd it anyway?`)) {
+                    return;
+                }
+                response = await submit(submissionData);
+            }
+
             if (response.ok) {
                 navigate('/jobs');
             } else {
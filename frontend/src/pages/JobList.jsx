@@ -168,7 +168,7 @@ function JobList() {
                                         </Box>
 
                                         <Typography variant="body2" color="text.secondary" paragraph>
-                                            {job.vacancy_text ? job.vacancy_text.slice(0, 200) + '...' : 'No description available'}
+                                            {job.vacancy_excerpt ? job.vacancy_excerpt + '...' : 'No description available'}
                                         </Typography>
 
                                         {(job.salary_min || job.salary_max) && (
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { useJobEvents, applyJobEvent } from '../hooks/useJobEvents';
 import {
     Typography,
     Box,
@@ -74,6 +75,12 @@ function Jobs() {
         fetchJobs();
     }, []);
 
+    // Changes made in other tabs or by the server appear without a refetch
+    useJobEvents(
+        event => setJobs(current => applyJobEvent(current, event)),
+        () => fetchJobs()
+    );
+
     const fetchJobs = async () => {
         try {
             const response = await fetchWithAuth(`${API_BASE_URL}/api/jobs/`);
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""Load-test the API and report latency percentiles per endpoint.
+
+Seeds a fresh database with the synthetic dataset (``services/dataset.py``)
+of ``--users`` users owning ``--jobs`` jobs each, starts the backend under
+gunicorn (``--workers``), and runs ``--concurrency`` virtual users for
+``--duration`` seconds. Each virtual user logs in once and then repeatedly
+picks a scenario:
+
+    dashboard   GET /api/auth/me and /api/dashboard, revalidated with the
+                ETag of the previous response
+    dashboard_multi
+                the dashboard as it was before /api/dashboard: GET
+                /api/auth/me and the full job list once per widget
+    browse      the job list with vacancy texts, one job, the file list
+    edit        create a job, then update it
+    login       log in again
+
+The mix is set with ``--mix dashboard=50,browse=30,edit=15,login=5``. To
+compare the composite dashboard with the multi-fetch pattern, run
+``--mix dashboard=100`` and ``--mix dashboard_multi=100`` against the same
+dataset.
+
+Results are printed as JSON: p50/p95/p99/mean latency, requests per second
+and error count per endpoint and overall. The run parameters and the git
+commit are included so that results from different commits can be compared.
+``--compare previous.json`` adds the change against an earlier result.
+
+The database is a temporary SQLite file unless BENCH_DATABASE_URL is set.
+That database is emptied and seeded. Use ``--url`` to benchmark an already
+running server instead; its database must hold the synthetic dataset
+(``seed_dataset.py`` or ``--seed-only``) with at least ``--users`` users.
+
+Usage:
+    bench_api.py [--users 200] [--jobs 50] [--concurrency 16] [--duration 30]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from extensions import db
+from services.dataset import DEFAULT_PASSWORD, SyntheticDataset, analyze, load
+from sqlalchemy import create_engine
+
+DEFAULT_MIX = "dashboard=50,browse=30,edit=15,login=5"
+SCENARIOS = ("dashboard", "dashboard_multi", "browse", "edit", "login")
+# Widgets that each fetched the job list before /api/dashboard
+DASHBOARD_WIDGETS = 5
+STATUSES = [
+    "not_yet_applied",
+    "applied",
+    "rejected",
+    "test_task",
+    "screening_call",
+    "interview",
+    "offer",
+]
+
+
+def seed(database_url, users, jobs_per_user, seed_value):
+    """Recreate the schema and load the synthetic dataset"""
+    engine = create_engine(database_url)
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    load(engine, SyntheticDataset(users, jobs_per_user, seed=seed_value))
+    analyze(engine)
+    engine.dispose()
+
+
+class VirtualUser(threading.Thread):
+    """Logs in as one seeded user and runs scenarios until the deadline"""
+
+    def __init__(self, base_url, email, mix, deadline, warmup_until, results, seed):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.email = email
+        self.scenarios, self.weights = zip(*mix.items())
+        self.deadline = deadline
+        self.warmup_until = warmup_until
+        self.results = results
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.job_ids = []
+        self.dashboard_etag = None
+
+    def call(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=60, **kwargs
+            )
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - started
+        if time.monotonic() >= self.warmup_until:
+            self.results.record(name, elapsed, ok)
+        return response if ok else None
+
+    def login(self):
+        response = self.call(
+            "POST /api/auth/login",
+            "POST",
+            "/api/auth/login",
+            json={"email": self.email, "password": DEFAULT_PASSWORD},
+        )
+        if response is not None:
+            token = response.json()["access_token"]
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def dashboard(self):
+        self.call("GET /api/auth/me", "GET", "/api/auth/me")
+        headers = {"If-None-Match": self.dashboard_etag} if self.dashboard_etag else {}
+        response = self.call(
+            "GET /api/dashboard", "GET", "/api/dashboard", headers=headers
+        )
+        if response is not None:
+            self.dashboard_etag = response.headers.get("ETag")
+
+    def dashboard_multi(self):
+        self.call("GET /api/auth/me", "GET", "/api/auth/me")
+        for _ in range(DASHBOARD_WIDGETS):
+            response = self.call("GET /api/jobs/", "GET", "/api/jobs/")
+        if response is not None:
+            self.job_ids = [job["id"] for job in response.json()]
+
+    def browse(self):
+        response = self.call(
+            "GET /api/jobs/?include=vacancy_text",
+            "GET",
+            "/api/jobs/?include=vacancy_text",
+        )
+        if response is not None:
+            self.job_ids = [job["id"] for job in response.json()]
+        if self.job_ids:
+            job_id = self.rng.choice(self.job_ids)
+            self.call("GET /api/jobs/<id>", "GET", f"/api/jobs/{job_id}")
+        self.call("GET /api/jobs/files", "GET", "/api/jobs/files")
+
+    def edit(self):
+        response = self.call(
+            "POST /api/jobs/",
+            "POST",
+            "/api/jobs/",
+            json={
+                "company_name": f"Bench {self.rng.randrange(10**6)}",
+                "role_title": "Engineer",
+                "application_status": "applied",
+                "vacancy_text": "benchmark vacancy " * 100,
+            },
+        )
+        if response is not None:
+            job_id = response.json()["id"]
+            self.job_ids.append(job_id)
+            self.call(
+                "PUT /api/jobs/<id>",
+                "PUT",
+                f"/api/jobs/{job_id}",
+                json={"application_status": self.rng.choice(STATUSES)},
+            )
+
+    def run(self):
+        self.login()
+        self.dashboard()
+        while time.monotonic() < self.deadline:
+            scenario = self.rng.choices(self.scenarios, self.weights)[0]
+            getattr(self, scenario)()
+
+
+class Results:
+    """Latencies per endpoint, shared by all virtual users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def summarize(latencies, errors, seconds):
+    """Percentiles (ms), throughput and errors for one set of latencies"""
+    if len(latencies) < 2:
+        cuts = latencies * 99 or [0.0] * 99
+    else:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / seconds, 2),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0,
+    }
+
+
+def compare(current, previous):
+    """Relative change of each metric against an earlier result"""
+    changes = {}
+    for name, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        changes[name] = {
+            key: f"{(stats[key] - before[key]) / before[key] * 100:+.1f}%"
+            for key in ("p50_ms", "p95_ms", "p99_ms", "rps")
+            if before.get(key)
+        }
+    return changes
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def wait_until_up(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise TimeoutError(f"{base_url} did not come up")
+
+
+def parse_mix(spec):
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main():
+    """Parse arguments, run the load test and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=3, help="Seconds not included in results"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=7398)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Benchmark a running server instead")
+    parser.add_argument(
+        "--seed-only", action="store_true", help="Seed the database and exit"
+    )
+    parser.add_argument("--output", help="Also write the JSON results here")
+    parser.add_argument("--compare", help="Earlier JSON result to compare with")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    workdir = tempfile.mkdtemp(prefix="bench-api-")
+    database_url = os.environ.get("BENCH_DATABASE_URL") or (
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    )
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+        "CORS_ORIGINS": os.environ.get("CORS_ORIGINS", "http://localhost"),
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "bench-api-" + "x" * 32),
+        "EXTRACTION_WORKERS": "0",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": str(BACKEND_DIR),
+    }
+    env.pop("DATABASE_REPLICA_URLS", None)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        started = time.perf_counter()
+        seed(database_url, args.users, args.jobs, args.seed)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        if args.seed_only:
+            return
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "-c",
+                "gunicorn.conf.py",
+                "app:create_app()",
+            ],
+            cwd=BACKEND_DIR,
+            env={
+                **env,
+                "DB_SCHEMA_CHECK": "off",
+                "PORT": str(args.port),
+                "WEB_CONCURRENCY": str(args.workers),
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        wait_until_up(base_url)
+        results = Results()
+        warmup_until = time.monotonic() + args.warmup
+        deadline = warmup_until + args.duration
+        users = [
+            VirtualUser(
+                base_url,
+                SyntheticDataset.email_for(index % args.users + 1),
+                mix,
+                deadline,
+                warmup_until,
+                results,
+                args.seed + index,
+            )
+            for index in range(args.concurrency)
+        ]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    all_latencies = [s for values in results.latencies.values() for s in values]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "database": database_url.split(":", 1)[0],
+            "users": args.users,
+            "jobs_per_user": args.jobs,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "workers": None if args.url else args.workers,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "total": summarize(all_latencies, sum(results.errors.values()), args.duration),
+        "endpoints": {
+            name: summarize(latencies, results.errors[name], args.duration)
+            for name, latencies in sorted(results.latencies.items())
+        },
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["compared_to"] = {"file": args.compare}
+            report["change"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
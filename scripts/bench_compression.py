@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Measure the bytes and time response compression saves on real payloads.
+
+Seeds a temporary SQLite database with the synthetic dataset
+(``services/dataset.py``) and requests the largest responses in-process:
+the job list with and without vacancy texts, the dashboard and the CSV
+export. Every endpoint is fetched without compression and with each
+available encoding, once with the compressed-body cache disabled (every
+request compresses) and, for ETagged responses, once with it enabled.
+
+Per case the JSON result holds the median server time, the bytes sent, the
+compression ratio, and the time to transfer the body at ``--bandwidth``
+Mbit/s. ``saved_ms`` is the server time plus transfer time without
+compression minus the same with it; positive means the client gets the
+response sooner.
+
+Usage:
+    bench_compression.py [--users 5] [--jobs 200] [--repeat 20] [--bandwidth 20]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+ENDPOINTS = [
+    "/api/jobs/",
+    "/api/jobs/?include=vacancy_text",
+    "/api/dashboard?upcoming_days=90",
+    "/api/jobs/export?include=vacancy_text",
+]
+
+
+def seed(database_url, users, jobs_per_user, seed_value):
+    from extensions import db
+    from services.dataset import SyntheticDataset, load
+    from sqlalchemy import create_engine
+
+    engine = create_engine(database_url)
+    db.metadata.create_all(engine)
+    load(engine, SyntheticDataset(users, jobs_per_user, seed=seed_value))
+    engine.dispose()
+
+
+def fetch(client, url, encoding, user_id):
+    """Server time (s) and body bytes of one request"""
+    from flask_jwt_extended import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+    if encoding != "identity":
+        headers["Accept-Encoding"] = encoding
+    started = time.perf_counter()
+    response = client.get(url, headers=headers)
+    body = response.get_data()
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, (url, response.status_code)
+    assert response.headers.get("Content-Encoding", "identity") == encoding
+    return elapsed, len(body)
+
+
+def run_case(app, url, encoding, users, repeat):
+    client = app.test_client()
+    fetch(client, url, encoding, 1)  # warm up
+    timings, sizes = [], []
+    for index in range(repeat):
+        seconds, size = fetch(client, url, encoding, index % users + 1)
+        timings.append(seconds)
+        sizes.append(size)
+    return statistics.median(timings), statistics.fmean(sizes)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Parse arguments, run the cases and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs per user")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--bandwidth", type=float, default=20, help="Client bandwidth in Mbit/s"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON results here")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-compression-")
+    database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.update(
+        {
+            "DATABASE_URL": database_url,
+            "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+            "CORS_ORIGINS": os.environ.get("CORS_ORIGINS", "http://localhost"),
+            "JWT_SECRET_KEY": os.environ.get(
+                "JWT_SECRET_KEY", "bench-compression-" + "x" * 32
+            ),
+            "EXTRACTION_WORKERS": "0",
+            "DB_SCHEMA_CHECK": "off",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    seed(database_url, args.users, args.jobs, args.seed)
+
+    from app import create_app
+
+    app = create_app()
+    app.app_context().push()
+    compressor = app.extensions["response_compressor"]
+    cache_limit = compressor.cache_limit
+
+    cases = {}
+    for url in ENDPOINTS:
+        compressor.cache_limit = 0
+        seconds, size = run_case(app, url, "identity", args.users, args.repeat)
+        baseline = seconds + size * 8 / (args.bandwidth * 1e6)
+        runs = [(encoding, 0) for encoding in compressor.encodings]
+        if "export" not in url:
+            runs += [(encoding, cache_limit) for encoding in compressor.encodings]
+        results = {
+            "identity": {"server_ms": round(seconds * 1000, 2), "bytes": round(size)}
+        }
+        for encoding, limit in runs:
+            compressor.cache_limit = limit
+            seconds, compressed = run_case(app, url, encoding, args.users, args.repeat)
+            total = seconds + compressed * 8 / (args.bandwidth * 1e6)
+            results[f"{encoding}{'+cache' if limit else ''}"] = {
+                "server_ms": round(seconds * 1000, 2),
+                "bytes": round(compressed),
+                "ratio": round(size / compressed, 2),
+                "saved_ms": round((baseline - total) * 1000, 2),
+            }
+        cases[url] = results
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "users": args.users,
+            "jobs_per_user": args.jobs,
+            "repeat": args.repeat,
+            "bandwidth_mbit": args.bandwidth,
+            "encodings": compressor.encodings,
+            "levels": compressor.levels,
+        },
+        "cases": cases,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
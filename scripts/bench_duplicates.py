@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Time the duplicate check run on every job insert, and the report.
+
+Seeds a temporary SQLite database with the synthetic dataset
+(``services/dataset.py``, 100k jobs by default) and, in an app context,
+times ``find_duplicates`` for new jobs of random users: half copy an
+existing job's link with tracking parameters added, half respell an
+existing job's company. ``duplicate_groups`` is timed once per user.
+
+SQLite has no trigram index, so this measures the Python fallback, which
+reads all of the user's jobs; with ``--database-url`` pointing at a migrated
+PostgreSQL database (the pg_trgm indexes in place) it measures the indexed
+path instead. The seed is loaded only into an empty database.
+
+Usage:
+    bench_duplicates.py [--users 100] [--jobs 1000] [--checks 2000]
+                        [--database-url URL]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+
+def seed(database_url, users, jobs_per_user, seed_value):
+    from extensions import db
+    from services.dataset import SyntheticDataset, load
+    from sqlalchemy import create_engine, inspect, text
+
+    engine = create_engine(database_url)
+    if not inspect(engine).has_table("jobs"):
+        db.metadata.create_all(engine)
+    with engine.connect() as conn:
+        empty = not conn.execute(text("SELECT 1 FROM jobs LIMIT 1")).first()
+    if empty:
+        load(engine, SyntheticDataset(users, jobs_per_user, seed=seed_value))
+    engine.dispose()
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "median_us": round(statistics.median(timings) * 1e6, 1),
+        "p95_us": round(timings[int(len(timings) * 0.95)] * 1e6, 1),
+        "max_us": round(timings[-1] * 1e6, 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Parse arguments, run the checks and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs per user")
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url")
+    parser.add_argument("--output", help="Also write the JSON results here")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-duplicates-")
+    database_url = args.database_url or (
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    )
+    os.environ.update(
+        {
+            "DATABASE_URL": database_url,
+            "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+            "CORS_ORIGINS": os.environ.get("CORS_ORIGINS", "http://localhost"),
+            "JWT_SECRET_KEY": os.environ.get(
+                "JWT_SECRET_KEY", "bench-duplicates-" + "x" * 32
+            ),
+            "EXTRACTION_WORKERS": "0",
+            "DB_SCHEMA_CHECK": "off",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    os.environ.pop("DATABASE_REPLICA_URLS", None)
+    seed(database_url, args.users, args.jobs, args.seed)
+
+    from app import create_app
+    from extensions import db
+    from models.models import Job
+    from services.duplicates import duplicate_groups, find_duplicates
+    from sqlalchemy import func, select
+
+    app = create_app()
+    app.app_context().push()
+    total = db.session.scalar(select(func.count()).select_from(Job))
+    users = db.session.scalars(select(Job.user_id).distinct()).all()
+
+    rng = random.Random(args.seed)
+    checks, found = [], 0
+    for index in range(args.checks):
+        user_id = rng.choice(users)
+        job = db.session.execute(
+            select(Job.company_name, Job.role_title, Job.vacancy_link)
+            .where(Job.user_id == user_id, Job.vacancy_link.isnot(None))
+            .order_by(func.random())
+            .limit(1)
+        ).one()
+        if index % 2:
+            fields = ("Unrelated Co", "Office Manager", f"{job[2]}/?utm_source=x")
+        else:
+            fields = (job[0].upper() + " Inc", job[1], None)
+        started = time.perf_counter()
+        duplicates = find_duplicates(user_id, *fields)
+        checks.append(time.perf_counter() - started)
+        found += bool(duplicates)
+
+    reports = []
+    for user_id in users[:20]:
+        started = time.perf_counter()
+        duplicate_groups(user_id)
+        reports.append(time.perf_counter() - started)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "dialect": db.engine.dialect.name,
+            "jobs": total,
+            "users": len(users),
+        },
+        "find_duplicates": {**summarize(checks), "found": found},
+        "duplicate_groups": summarize(reports),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Microbenchmark the per-row primitives behind the jobs endpoints.
+
+Times the operations that run once per job in ``routes/jobs.py``: parsing
+and formatting datetimes, constructing ``ApplicationStatus``/``JobSource``
+from request values, building the response dict (``serialize_job``) and
+encoding it, and constructing the models in ``models/models.py``.
+
+Every case is reported in nanoseconds per operation and relative to a fixed
+calibration loop timed in the same run, so the relative cost is comparable
+across machines. A case fails when its relative cost exceeds its threshold
+in THRESHOLDS, and the script then exits with status 1. Raise a threshold
+only together with the change that makes the case slower.
+
+``--baseline previous.json`` additionally fails when a case is more than
+``--tolerance`` slower than an earlier run on the same machine.
+
+Usage:
+    bench_micro.py [--filter serialize] [--repeat 5] [--output result.json]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+from models.enums import ApplicationStatus, JobSource
+from models.models import File, Job, User
+from routes.jobs import serialize_job
+
+# Highest acceptable cost of each case, in calibration loops. These are about
+# twice the typical cost, to stay quiet on noisy CI machines; use --baseline
+# to catch smaller slowdowns.
+THRESHOLDS = {
+    "datetime.fromisoformat": 0.08,
+    "datetime.fromisoformat(date only)": 0.07,
+    "datetime.isoformat": 0.4,
+    "ApplicationStatus(value)": 0.35,
+    "JobSource(value)": 0.35,
+    "ApplicationStatus.value": 0.12,
+    "serialize_job(list)": 6,
+    "serialize_job(detail)": 7,
+    "json.dumps(100 jobs)": 300,
+    "Job()": 8,
+    "Job(vacancy_text)": 12,
+    "User()": 4.5,
+    "File()": 6,
+}
+
+VACANCY_TEXT = "We are looking for an experienced backend engineer. " * 60
+JOB_PAYLOAD = {
+    "company_name": "Acme",
+    "role_title": "Senior Backend Engineer",
+    "vacancy_link": "https://jobs.example.com/linkedin/1",
+    "application_status": "screening_call",
+    "source": "company_website",
+    "date_applied": "2024-05-17T09:30:00",
+    "next_milestone_date": "2024-05-24T14:00:00",
+    "salary_min": 70000,
+    "salary_max": 90000,
+}
+
+
+def calibration():
+    """Fixed pure-Python workload that every case is measured against"""
+    total = 0
+    for number in range(100):
+        total += number * number
+    return total
+
+
+def sample_job():
+    """A transient job with every column set, as loaded for a list"""
+    moment = datetime(2024, 5, 17, 9, 30)
+    return Job(
+        id=1,
+        user_id=1,
+        company_name=JOB_PAYLOAD["company_name"],
+        role_title=JOB_PAYLOAD["role_title"],
+        vacancy_link=JOB_PAYLOAD["vacancy_link"],
+        vacancy_text=VACANCY_TEXT,
+        application_status=ApplicationStatus.SCREENING_CALL,
+        source=JobSource.COMPANY_WEBSITE,
+        date_applied=moment,
+        next_milestone_date=moment,
+        salary_min=70000,
+        salary_max=90000,
+        telegram_notification_sent=False,
+        created_at=moment,
+        updated_at=moment,
+    )
+
+
+def cases():
+    """Name and zero-argument callable of every benchmark case"""
+    job = sample_job()
+    moment = job.created_at
+    status = job.application_status
+    listed = [serialize_job(job, include_text=False, include_excerpt=True)] * 100
+    job_kwargs = {
+        "user_id": 1,
+        "company_name": JOB_PAYLOAD["company_name"],
+        "role_title": JOB_PAYLOAD["role_title"],
+        "vacancy_link": JOB_PAYLOAD["vacancy_link"],
+        "application_status": ApplicationStatus.APPLIED,
+        "source": JobSource.LINKEDIN,
+        "date_applied": moment,
+    }
+
+    return {
+        "datetime.fromisoformat": lambda: datetime.fromisoformat("2024-05-17T09:30:00"),
+        "datetime.fromisoformat(date only)": lambda: datetime.fromisoformat(
+            "2024-05-17"
+        ),
+        "datetime.isoformat": moment.isoformat,
+        "ApplicationStatus(value)": lambda: ApplicationStatus("screening_call"),
+        "JobSource(value)": lambda: JobSource("company_website"),
+        "ApplicationStatus.value": lambda: status.value,
+        "serialize_job(list)": lambda: serialize_job(
+            job, include_text=False, include_excerpt=True
+        ),
+        "serialize_job(detail)": lambda: serialize_job(job),
+        "json.dumps(100 jobs)": lambda: json.dumps(listed, sort_keys=True),
+        "Job()": lambda: Job(**job_kwargs),
+        "Job(vacancy_text)": lambda: Job(**job_kwargs, vacancy_text=VACANCY_TEXT),
+        "User()": lambda: User(email="user@example.com", password_hash="x"),
+        "File()": lambda: File(
+            filename="resume.pdf",
+            file_path="uploads/blobs/ab/cd/abcd",
+            file_type="resume",
+            blob_digest="abcd",
+            job_id=1,
+        ),
+    }
+
+
+def time_per_call(function, repeat):
+    """Best-of-``repeat`` nanoseconds per call"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Parse arguments, run the cases and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run matching cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Also write the JSON results here")
+    parser.add_argument("--baseline", help="Earlier JSON result to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against --baseline (default: 0.25)",
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+
+    # The calibration is re-timed between cases and the fastest run kept, so
+    # a noisy moment does not skew every relative cost
+    timings = {}
+    calibration_ns = time_per_call(calibration, args.repeat)
+    for name, function in cases().items():
+        if args.filter in name:
+            timings[name] = time_per_call(function, args.repeat)
+            calibration_ns = min(calibration_ns, time_per_call(calibration, 1))
+
+    results, failures = {}, []
+    for name, ns in timings.items():
+        relative = ns / calibration_ns
+        result = {
+            "ns": round(ns, 1),
+            "relative": round(relative, 4),
+            "threshold": THRESHOLDS[name],
+        }
+        if relative > THRESHOLDS[name]:
+            failures.append(f"{name}: {relative:.3f} > threshold {THRESHOLDS[name]}")
+        if name in baseline:
+            change = ns / baseline[name]["ns"] - 1
+            result["change"] = f"{change * 100:+.1f}%"
+            if change > args.tolerance:
+                failures.append(f"{name}: {change * 100:+.1f}% against baseline")
+        results[name] = result
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calibration_ns": round(calibration_ns, 1),
+        },
+        "cases": results,
+        "failures": failures,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
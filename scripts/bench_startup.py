@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark backend cold start and gunicorn worker restart time.
+
+Cold start is the time a fresh interpreter takes to import ``app`` and run
+``create_app()``, measured for each DB_SCHEMA_CHECK mode. ``create`` is the
+old behaviour (``db.create_all()`` on every boot).
+
+Worker restart runs gunicorn with a single worker, kills the worker and
+measures how long it takes until a new worker answers ``/health/pool``. This
+is done with and without ``--preload``.
+
+The database is a migrated SQLite file by default. Set BENCH_DATABASE_URL to
+use another database, which must already be at the newest migration.
+
+Usage:
+    bench_startup.py [--repeats 5] [--port 7399]
+"""
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.append(str(BACKEND_DIR))
+
+COLD_START = (
+    "import time; started = time.perf_counter(); import app; app.create_app(); "
+    "print(time.perf_counter() - started)"
+)
+SCHEMA_CHECK_MODES = ("create", "warn", "off")
+
+
+def bench_env(database_url, workdir):
+    """Return the environment for the benchmarked processes"""
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATABASE_URL": database_url,
+            "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+            "CORS_ORIGINS": env.get("CORS_ORIGINS", "http://localhost"),
+            "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY", "bench-startup-" + "x" * 32),
+            "PYTHONPATH": str(BACKEND_DIR),
+        }
+    )
+    env.pop("DATABASE_REPLICA_URLS", None)
+    return env
+
+
+def migrate(env):
+    """Bring the benchmark database to the newest migration"""
+    os.environ.update(env)
+    from app import create_app
+    from extensions import db
+    from flask_migrate import Migrate, upgrade
+    from services.schema import MIGRATIONS_DIR
+
+    os.environ["DB_SCHEMA_CHECK"] = "off"
+    app = create_app()
+    Migrate(app, db)
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        db.engine.dispose()
+
+
+def time_cold_start(env, mode, repeats):
+    """Median seconds for a new interpreter to build the app"""
+    env = {**env, "DB_SCHEMA_CHECK": mode}
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START],
+            cwd=BACKEND_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def worker_pid(port, timeout=30.0):
+    """Poll /health/pool until it answers and return the serving pid"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/health/pool", timeout=1
+            ) as response:
+                return json.load(response)["pid"]
+        except OSError:
+            time.sleep(0.005)
+    raise TimeoutError(f"gunicorn did not answer on port {port}")
+
+
+def time_worker_restart(env, port, preload, repeats):
+    """Median seconds from killing the worker until a new one answers"""
+    env = {
+        **env,
+        "DB_SCHEMA_CHECK": "warn",
+        "PORT": str(port),
+        "WEB_CONCURRENCY": "1",
+        "GUNICORN_PRELOAD": "true" if preload else "false",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "app:create_app()",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        pid = worker_pid(port)
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            os.kill(pid, signal.SIGKILL)
+            new_pid = worker_pid(port)
+            while new_pid == pid:
+                new_pid = worker_pid(port)
+            timings.append(time.perf_counter() - started)
+            pid = new_pid
+        return statistics.median(timings)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    """Parse arguments, run the benchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--port", type=int, default=7399)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-startup-")
+    url = os.environ.get("BENCH_DATABASE_URL")
+    env = bench_env(url or f"sqlite:///{os.path.join(workdir, 'bench.db')}", workdir)
+    if not url:
+        migrate(env)
+
+    results = {
+        "cold_start_ms": {
+            mode: round(time_cold_start(env, mode, args.repeats) * 1000, 1)
+            for mode in SCHEMA_CHECK_MODES
+        },
+        "worker_restart_ms": {
+            name: round(
+                time_worker_restart(env, args.port, preload, args.repeats) * 1000, 1
+            )
+            for name, preload in (("no_preload", False), ("preload", True))
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
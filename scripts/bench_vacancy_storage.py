@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Benchmark the jobs list query with inline versus side-table vacancy texts.
+
+Seeds the same synthetic dataset (``services/dataset.py``) into two layouts:
+
+* ``inline``: the old schema, with ``vacancy_text`` stored on every jobs row
+* ``side``: the current schema, with a short excerpt on ``jobs`` and the full
+  text compressed and deduplicated in ``vacancy_texts``
+
+It then times the query behind ``GET /api/jobs/`` for a sample of users and
+reports the size of each layout. It uses separate SQLite files by default. Set
+BENCH_DATABASE_URL to run against PostgreSQL; the benchmark tables are created
+in that database and dropped afterwards.
+
+Usage:
+    bench_vacancy_storage.py [--jobs 100000] [--users 1000] [--dup-ratio 0.3]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.models import EXCERPT_LENGTH, VacancyText
+from services.dataset import SyntheticDataset
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    select,
+    text,
+)
+
+BATCH_SIZE = 5000
+
+JOB_COLUMNS = [
+    ("id", Integer),
+    ("user_id", Integer),
+    ("company_name", String(255)),
+    ("role_title", String(255)),
+    ("vacancy_link", Text),
+    ("application_status", String(32)),
+    ("source", String(32)),
+    ("date_applied", DateTime),
+    ("next_milestone_date", DateTime),
+    ("salary_min", Integer),
+    ("salary_max", Integer),
+    ("created_at", DateTime),
+    ("updated_at", DateTime),
+]
+
+
+def build_layouts(metadata):
+    """Define the inline and side-table schemas on ``metadata``"""
+    inline = Table(
+        "bench_jobs_inline",
+        metadata,
+        *(Column(name, type_, primary_key=name == "id") for name, type_ in JOB_COLUMNS),
+        Column("vacancy_text", Text),
+    )
+    texts = Table(
+        "bench_vacancy_texts",
+        metadata,
+        Column("digest", String(64), primary_key=True),
+        Column("body", LargeBinary, nullable=False),
+        Column("size", Integer, nullable=False),
+        Column("created_at", DateTime),
+    )
+    side = Table(
+        "bench_jobs_side",
+        metadata,
+        *(Column(name, type_, primary_key=name == "id") for name, type_ in JOB_COLUMNS),
+        Column("vacancy_digest", String(64), ForeignKey("bench_vacancy_texts.digest")),
+        Column("vacancy_excerpt", String(EXCERPT_LENGTH)),
+    )
+    return inline, texts, side
+
+
+def generate_jobs(n_jobs, n_users, dup_ratio, seed):
+    """Yield job rows of the synthetic dataset with their full vacancy text"""
+    dataset = SyntheticDataset(
+        n_users, max(1, n_jobs // n_users), seed=seed, duplicate_ratio=dup_ratio
+    )
+    for records in dataset.iter_users():
+        for job in records["jobs"]:
+            row = {name: job[name] for name, _ in JOB_COLUMNS}
+            row["application_status"] = job["application_status"].name
+            row["source"] = job["source"].name
+            row["vacancy_text"] = job["vacancy_text"]
+            yield row
+
+
+def seed_inline(engine, inline, rows):
+    with engine.begin() as conn:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(inline.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(inline.insert(), batch)
+
+
+def seed_side(engine, texts, side, rows):
+    """Insert jobs with excerpts and each distinct text once, compressed"""
+    seen = set()
+    job_batch, text_batch = [], []
+
+    def flush(conn):
+        if text_batch:
+            conn.execute(texts.insert(), text_batch)
+        conn.execute(side.insert(), job_batch)
+        job_batch.clear()
+        text_batch.clear()
+
+    with engine.begin() as conn:
+        for row in rows:
+            vacancy = row.pop("vacancy_text")
+            digest = vacancy and VacancyText.digest_for(vacancy)
+            if vacancy and digest not in seen:
+                seen.add(digest)
+                raw = vacancy.encode("utf-8")
+                text_batch.append(
+                    {
+                        "digest": digest,
+                        "body": zlib.compress(raw, 6),
+                        "size": len(raw),
+                        "created_at": None,
+                    }
+                )
+            job_batch.append(
+                {
+                    **row,
+                    "vacancy_digest": digest,
+                    "vacancy_excerpt": vacancy and vacancy[:EXCERPT_LENGTH],
+                }
+            )
+            if len(job_batch) >= BATCH_SIZE:
+                flush(conn)
+        if job_batch:
+            flush(conn)
+    return len(seen)
+
+
+def time_list_query(engine, table, user_ids, repeats):
+    """Median seconds to fetch one user's list, as ``get_jobs`` does"""
+    columns = [c for c in table.columns if c.name != "vacancy_digest"]
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            for user_id in user_ids:
+                started = time.perf_counter()
+                conn.execute(select(*columns).where(table.c.user_id == user_id)).all()
+                timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def storage_bytes(engine, tables, sqlite_path):
+    """Per-table size with indexes and TOAST, or the SQLite file size"""
+    if engine.dialect.name != "postgresql":
+        return {"database": os.path.getsize(sqlite_path)}
+    with engine.connect() as conn:
+        return {
+            table.name: conn.scalar(
+                text("SELECT pg_total_relation_size(CAST(:name AS regclass))"),
+                {"name": table.name},
+            )
+            for table in tables
+        }
+
+
+def main():
+    """Parse arguments, run the benchmark and print JSON results"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument(
+        "--dup-ratio",
+        type=float,
+        default=0.3,
+        help="Share of jobs that reuse an earlier posting (default: 0.3)",
+    )
+    parser.add_argument("--sample-users", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    url = os.environ.get("BENCH_DATABASE_URL")
+    workdir = tempfile.mkdtemp(prefix="bench-vacancy-")
+    results = {
+        "jobs": args.users * max(1, args.jobs // args.users),
+        "users": args.users,
+        "dup_ratio": args.dup_ratio,
+    }
+
+    for layout in ("inline", "side"):
+        sqlite_path = None
+        if url:
+            engine = create_engine(url)
+        else:
+            sqlite_path = os.path.join(workdir, f"{layout}.db")
+            engine = create_engine(f"sqlite:///{sqlite_path}")
+        metadata = MetaData()
+        inline, texts, side = build_layouts(metadata)
+        table = inline if layout == "inline" else side
+        tables = [inline] if layout == "inline" else [texts, side]
+        metadata.drop_all(engine, tables=tables)
+        metadata.create_all(engine, tables=tables)
+
+        rows = generate_jobs(args.jobs, args.users, args.dup_ratio, args.seed)
+        started = time.perf_counter()
+        if layout == "inline":
+            seed_inline(engine, inline, rows)
+            distinct = None
+        else:
+            distinct = seed_side(engine, texts, side, rows)
+        seed_seconds = time.perf_counter() - started
+
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"CREATE INDEX ix_{table.name}_user_id ON {table.name} (user_id)")
+            )
+            if engine.dialect.name == "postgresql":
+                conn.execute(text(f"ANALYZE {table.name}"))
+
+        sample = random.Random(args.seed).sample(
+            range(1, args.users + 1), min(args.sample_users, args.users)
+        )
+        results[layout] = {
+            "seed_seconds": round(seed_seconds, 2),
+            "list_query_ms": round(
+                time_list_query(engine, table, sample, args.repeats) * 1000, 3
+            ),
+            "bytes": storage_bytes(engine, tables, sqlite_path),
+        }
+        if distinct is not None:
+            results[layout]["distinct_texts"] = distinct
+        if url:
+            metadata.drop_all(engine, tables=tables)
+        engine.dispose()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
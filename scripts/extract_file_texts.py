@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Extract text for uploaded files that have not been processed yet.
+
+Uploads are normally extracted in the background right after the request
+returns. This catches up on files uploaded before extraction existed and on
+tasks lost when a worker was restarted.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app
+from extensions import text_extractor
+
+
+def main():
+    """Run a synchronous backfill of extracted file texts"""
+    create_app()
+    processed = text_extractor.backfill()
+    print(f"Processed {processed} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Reclaim upload storage that is no longer referenced.
+
+Run it from cron, or with --interval as a long-running background process.
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app
+from services.upload_gc import collect_garbage, rebuild_storage_totals
+
+
+def main():
+    """Parse arguments and run the garbage collector"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=24,
+        help="Keep unreferenced uploads at least this long (default: 24)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Rows or directory entries per query (default: 500)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would be deleted"
+    )
+    parser.add_argument(
+        "--legacy-files",
+        action="store_true",
+        help="Also delete files in UPLOAD_FOLDER from before the blob store "
+        "that no File row names; try it with --dry-run first",
+    )
+    parser.add_argument(
+        "--rebuild-usage",
+        action="store_true",
+        help="Recompute per-user storage totals from scratch first",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        help="Keep running, collecting every INTERVAL seconds",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    while True:
+        with app.app_context():
+            if args.rebuild_usage:
+                rebuild_storage_totals()
+                print("Rebuilt per-user storage totals")
+            stats = collect_garbage(
+                grace=timedelta(hours=args.grace_hours),
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+                legacy_files=args.legacy_files,
+            )
+        print(("Would reclaim" if args.dry_run else "Reclaimed"), dict(stats))
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""Incremental (changed-since) backups of users, jobs, files and their content.
+
+Backups are organised in chains. A chain starts with a full *base* generation
+and is followed by *incremental* generations that only contain rows whose
+``updated_at`` is newer than the previous generation's watermark, plus the
+tombstones written to ``deleted_records`` since then. Content-addressed tables
+that are never updated in place (``vacancy_texts``) are tracked by
+``created_at`` instead, and append-only logs (``job_status_events``,
+``job_changes``) by ``occurred_at``. Each generation is a
+gzip-compressed JSON-lines file, so both dumping and restoring stream rows
+instead of holding whole tables in memory.
+
+Tombstones are written by ORM deletes of users, jobs and files only. Rows
+removed with bulk or Core deletes leave none:
+
+* ``job_status_events`` deleted with their job (``_delete_status_events``):
+  restore deletes the rows of ON DELETE CASCADE children along with each
+  tombstoned parent, as PostgreSQL would, so they go with their job.
+* ``job_changes`` pruned by ``JobEvents.prune``, and blobs and vacancy texts
+  collected by ``upload_gc``: they come back on restore and are removed
+  again by the next prune or GC run.
+
+Derived tables (``user_blobs``, ``user_job_stats`` and the users' storage
+totals) are not backed up; restore rebuilds them.
+
+Usage:
+    incremental_backup.py backup [--full]     # new generation (base if needed)
+    incremental_backup.py list                # show chains and generations
+    incremental_backup.py restore [CHAIN] [--until SEQ]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app
+from extensions import db
+from models.models import (
+    Blob,
+    DeletedRecord,
+    File,
+    Job,
+    JobChange,
+    JobStatusEvent,
+    User,
+    VacancyText,
+)
+from services import job_stats
+from services.upload_gc import rebuild_storage_totals
+from sqlalchemy import DateTime, Enum, LargeBinary, bindparam, func, select, text
+
+# Parents first: upserts are applied in this order, deletions in reverse.
+TABLES = [
+    User.__table__,
+    Blob.__table__,
+    VacancyText.__table__,
+    Job.__table__,
+    File.__table__,
+    JobStatusEvent.__table__,
+    JobChange.__table__,
+]
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+BATCH_SIZE = 1000
+MANIFEST = "manifest.json"
+
+
+def _encode(column, value):
+    """Convert a column value to something JSON can carry"""
+    if value is None:
+        return None
+    if isinstance(column.type, Enum) and column.type.enum_class is not None:
+        return value.name
+    if isinstance(column.type, DateTime):
+        return value.isoformat()
+    if isinstance(column.type, LargeBinary):
+        return base64.b64encode(value).decode("ascii")
+    return value
+
+
+def _decode(column, value):
+    """Inverse of ``_encode``"""
+    if value is None:
+        return None
+    if isinstance(column.type, Enum) and column.type.enum_class is not None:
+        return column.type.enum_class[value]
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, LargeBinary):
+        return base64.b64decode(value)
+    return value
+
+
+def _key(table):
+    """Single-column primary key of a backed-up table"""
+    return table.primary_key.columns.values()[0]
+
+
+def _changed_at(table):
+    """Column that tells whether a row changed since the last generation"""
+    for name in ("updated_at", "created_at", "occurred_at"):
+        if name in table.c:
+            return table.c[name]
+    raise ValueError(f"{table.name} has no timestamp to back up by")
+
+
+def _load_manifest(chain_dir: Path) -> Dict:
+    with open(chain_dir / MANIFEST) as fh:
+        return json.load(fh)
+
+
+def _save_manifest(chain_dir: Path, manifest: Dict) -> None:
+    tmp_path = chain_dir / (MANIFEST + ".tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, chain_dir / MANIFEST)
+
+
+def _chains(backup_dir: Path) -> List[Path]:
+    if not backup_dir.is_dir():
+        return []
+    return sorted(
+        path
+        for path in backup_dir.iterdir()
+        if path.is_dir() and (path / MANIFEST).exists()
+    )
+
+
+def dump_generation(
+    path: Path, since: Optional[datetime], watermark: datetime
+) -> Dict[str, int]:
+    """Write one generation file and return per-table record counts.
+
+    Args:
+        path (Path): Destination ``.jsonl.gz`` file
+        since (Optional[datetime]): Lower bound for ``updated_at``/``deleted_at``,
+            or None for a full base dump
+        watermark (datetime): Upper bound recorded for this generation
+
+    Returns:
+        Dict[str, int]: Number of upserted rows per table plus ``deletions``
+    """
+    counts = {table.name: 0 for table in TABLES}
+    counts["deletions"] = 0
+    tmp_path = path.with_suffix(".tmp")
+
+    with db.engine.connect() as conn, gzip.open(tmp_path, "wt") as out:
+        conn = conn.execution_options(stream_results=True, yield_per=BATCH_SIZE)
+
+        if since is not None:
+            tombstones = DeletedRecord.__table__
+            rows = conn.execute(
+                select(tombstones.c.table_name, tombstones.c.row_id)
+                .where(tombstones.c.deleted_at >= since)
+                .where(tombstones.c.deleted_at < watermark)
+                .order_by(tombstones.c.id)
+            )
+            for table_name, row_id in rows:
+                out.write(
+                    json.dumps({"op": "delete", "table": table_name, "id": row_id})
+                )
+                out.write("\n")
+                counts["deletions"] += 1
+
+        for table in TABLES:
+            query = select(table).order_by(_key(table))
+            if since is not None:
+                query = query.where(_changed_at(table) >= since)
+            for row in conn.execute(query):
+                record = {
+                    column.name: _encode(column, row._mapping[column.name])
+                    for column in table.columns
+                }
+                out.write(
+                    json.dumps({"op": "upsert", "table": table.name, "row": record})
+                )
+                out.write("\n")
+                counts[table.name] += 1
+
+    os.replace(tmp_path, path)
+    return counts
+
+
+def backup(backup_dir: Path, full: bool, overlap: timedelta) -> Path:
+    """Create a new generation, starting a new chain when needed.
+
+    Incremental generations re-read an ``overlap`` window before the previous
+    watermark so rows committed by transactions that were still open at the
+    previous backup are not missed. Replaying a row twice is harmless because
+    restore upserts by primary key.
+
+    Args:
+        backup_dir (Path): Directory holding all chains
+        full (bool): Force a new base generation
+        overlap (timedelta): Safety window subtracted from the last watermark
+
+    Returns:
+        Path: The generation file that was written
+    """
+    watermark = datetime.utcnow()
+    chains = _chains(backup_dir)
+
+    if full or not chains:
+        chain_dir = backup_dir / f"chain-{watermark:%Y%m%dT%H%M%S}"
+        chain_dir.mkdir(parents=True, exist_ok=False)
+        manifest = {"chain": chain_dir.name, "generations": []}
+        since = None
+    else:
+        chain_dir = chains[-1]
+        manifest = _load_manifest(chain_dir)
+        previous = datetime.fromisoformat(manifest["generations"][-1]["watermark"])
+        since = previous - overlap
+
+    seq = len(manifest["generations"])
+    filename = f"{seq:04d}-{'base' if since is None else 'incr'}.jsonl.gz"
+    counts = dump_generation(chain_dir / filename, since, watermark)
+
+    manifest["generations"].append(
+        {
+            "seq": seq,
+            "kind": "base" if since is None else "incremental",
+            "file": filename,
+            "since": since.isoformat() if since else None,
+            "watermark": watermark.isoformat(),
+            "counts": counts,
+        }
+    )
+    _save_manifest(chain_dir, manifest)
+
+    if since is None:
+        # Tombstones older than the new base are covered by it and by every
+        # older chain's own generation files, so they can be dropped.
+        db.session.execute(
+            DeletedRecord.__table__.delete().where(
+                DeletedRecord.deleted_at < watermark - overlap
+            )
+        )
+        db.session.commit()
+
+    return chain_dir / filename
+
+
+def _read_records(path: Path) -> Iterator[Dict]:
+    with gzip.open(path, "rt") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _apply_upserts(conn, table, rows: List[Dict]) -> None:
+    """Insert new rows and update existing ones, matched by primary key"""
+    key = _key(table)
+    ids = [row[key.name] for row in rows]
+    existing = set(conn.scalars(select(key).where(key.in_(ids))))
+
+    inserts = [row for row in rows if row[key.name] not in existing]
+    updates = [
+        {**row, "_key": row[key.name]} for row in rows if row[key.name] in existing
+    ]
+
+    if inserts:
+        conn.execute(table.insert(), inserts)
+    if updates:
+        conn.execute(table.update().where(key == bindparam("_key")), updates)
+
+
+def _cascades(table) -> List:
+    """Foreign key columns of backed-up tables that cascade from ``table``"""
+    return [
+        fk.parent
+        for child in TABLES
+        for fk in child.foreign_keys
+        if fk.column.table is table and fk.ondelete == "CASCADE"
+    ]
+
+
+def _apply_deletions(conn, deletions: Dict[str, List[int]]) -> None:
+    """Delete tombstoned rows, children first
+
+    Children deleted by ON DELETE CASCADE have no tombstones of their own, and
+    SQLite does not enforce the cascade, so they are deleted here too.
+    """
+    for table in reversed(TABLES):
+        ids = deletions.get(table.name)
+        for start in range(0, len(ids or []), BATCH_SIZE):
+            batch = ids[start : start + BATCH_SIZE]
+            for column in _cascades(table):
+                conn.execute(column.table.delete().where(column.in_(batch)))
+            conn.execute(table.delete().where(_key(table).in_(batch)))
+
+
+def replay_generation(conn, path: Path) -> int:
+    """Apply one generation file to the database.
+
+    Deletions are applied before upserts so that a row which was deleted and
+    whose id was reused (possible on SQLite) ends up in its latest state.
+
+    Returns:
+        int: Number of records applied
+    """
+    deletions: Dict[str, List[int]] = {}
+    applied = 0
+    batch: List[Dict] = []
+    batch_table = None
+
+    for record in _read_records(path):
+        applied += 1
+        if record["op"] == "delete":
+            deletions.setdefault(record["table"], []).append(record["id"])
+            continue
+
+        if deletions:
+            _apply_deletions(conn, deletions)
+            deletions = {}
+
+        table = TABLES_BY_NAME[record["table"]]
+        if batch and (table is not batch_table or len(batch) >= BATCH_SIZE):
+            _apply_upserts(conn, batch_table, batch)
+            batch = []
+        batch_table = table
+        batch.append(
+            {
+                column.name: _decode(column, record["row"].get(column.name))
+                for column in table.columns
+            }
+        )
+
+    if deletions:
+        _apply_deletions(conn, deletions)
+    if batch:
+        _apply_upserts(conn, batch_table, batch)
+    return applied
+
+
+def restore(chain_dir: Path, until: Optional[int], force: bool) -> None:
+    """Replay a base generation and its incrementals in one transaction.
+
+    The derived per-user storage totals and job counters are rebuilt
+    afterwards.
+
+    Args:
+        chain_dir (Path): Chain to restore
+        until (Optional[int]): Last generation sequence number to apply
+        force (bool): Allow restoring into non-empty tables
+    """
+    manifest = _load_manifest(chain_dir)
+    generations = [
+        gen for gen in manifest["generations"] if until is None or gen["seq"] <= until
+    ]
+
+    with db.engine.begin() as conn:
+        if not force:
+            for table in TABLES:
+                if conn.scalar(select(func.count()).select_from(table)):
+                    raise SystemExit(
+                        f"Table {table.name} is not empty; use --force to merge"
+                    )
+
+        for gen in generations:
+            applied = replay_generation(conn, chain_dir / gen["file"])
+            print(f"  {gen['file']}: {applied} records")
+
+        if conn.dialect.name == "postgresql":
+            for table in TABLES:
+                if _key(table).name != "id":
+                    continue
+                conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+                    )
+                )
+
+    rebuild_storage_totals()
+    job_stats.rebuild()
+
+
+def list_chains(backup_dir: Path) -> None:
+    for chain_dir in _chains(backup_dir):
+        manifest = _load_manifest(chain_dir)
+        print(chain_dir.name)
+        for gen in manifest["generations"]:
+            print(
+                f"  {gen['seq']:>4}  {gen['kind']:<11}  {gen['watermark']}  "
+                f"{json.dumps(gen['counts'])}"
+            )
+
+
+def main():
+    """Parse arguments and run the requested backup command"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dir",
+        default=os.environ.get("BACKUP_DIR", "backups"),
+        help="Directory holding backup chains (default: $BACKUP_DIR or ./backups)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = subparsers.add_parser("backup", help="Write a new generation")
+    backup_parser.add_argument(
+        "--full", action="store_true", help="Start a new chain with a base dump"
+    )
+    backup_parser.add_argument(
+        "--overlap-seconds",
+        type=int,
+        default=300,
+        help="Re-read window before the previous watermark (default: 300)",
+    )
+
+    subparsers.add_parser("list", help="List chains and generations")
+
+    restore_parser = subparsers.add_parser("restore", help="Replay a chain")
+    restore_parser.add_argument(
+        "chain", nargs="?", help="Chain directory name (default: latest)"
+    )
+    restore_parser.add_argument(
+        "--until", type=int, help="Stop after this generation sequence number"
+    )
+    restore_parser.add_argument(
+        "--force", action="store_true", help="Restore into non-empty tables"
+    )
+
+    args = parser.parse_args()
+    backup_dir = Path(args.dir)
+
+    if args.command == "list":
+        list_chains(backup_dir)
+        return
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "backup":
+            path = backup(
+                backup_dir, args.full, timedelta(seconds=args.overlap_seconds)
+            )
+            print(f"Wrote {path}")
+        else:
+            chains = _chains(backup_dir)
+            if args.chain:
+                chain_dir = backup_dir / args.chain
+            elif chains:
+                chain_dir = chains[-1]
+            else:
+                raise SystemExit(f"No backup chains found in {backup_dir}")
+            print(f"Restoring {chain_dir.name}...")
+            restore(chain_dir, args.until, args.force)
+            print("Done!")
+
+
+if __name__ == "__main__":
+    main()
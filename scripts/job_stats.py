@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Check or rebuild the per-user job counters in user_job_stats.
+
+Without options, reports users whose counters differ from their jobs and
+exits with status 1 if there are any. --rebuild recomputes the counters;
+--repair rebuilds only the users found to have drifted.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app
+from services import job_stats
+
+
+def main():
+    """Parse arguments and check or rebuild the counters"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--user", type=int, action="append", help="Only this user id (repeatable)"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--rebuild", action="store_true", help="Recompute the counters from jobs"
+    )
+    mode.add_argument(
+        "--repair", action="store_true", help="Rebuild only users that drifted"
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.rebuild:
+            rows = job_stats.rebuild(args.user)
+            print(f"Rebuilt {rows} counters")
+            return
+
+        drift = job_stats.check(args.user)
+        for user_id, differences in drift.items():
+            for metric, bucket, stored, expected in differences:
+                label = f"{metric}[{bucket}]" if bucket else metric
+                print(f"user {user_id}: {label} is {stored}, expected {expected}")
+        if not drift:
+            print("All counters match")
+        elif args.repair:
+            rows = job_stats.rebuild(sorted(drift))
+            print(f"Rebuilt {rows} counters for {len(drift)} users")
+        else:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
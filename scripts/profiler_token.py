@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Print a token for the admin profiling endpoints.
+
+Signs with PROFILER_SECRET. Send the token in the X-Profiler-Token header,
+e.g. to profile one request:
+
+    curl -i -H "X-Profiler-Token: $(scripts/profiler_token.py)" \\
+        -H "Authorization: Bearer ..." http://localhost:7315/api/jobs/
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.profiling import MAX_TOKEN_TTL, sign_token
+
+
+def main():
+    """Parse arguments and print a signed token"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--ttl",
+        type=int,
+        default=300,
+        help=f"Seconds the token stays valid (default: 300, max: {MAX_TOKEN_TTL})",
+    )
+    args = parser.parse_args()
+
+    secret = os.environ.get("PROFILER_SECRET")
+    if not secret:
+        sys.exit("PROFILER_SECRET is not set")
+    print(sign_token(secret, args.ttl))
+
+
+if __name__ == "__main__":
+    main()
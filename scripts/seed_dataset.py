@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Fill a database with the synthetic performance-test dataset.
+
+Generates ``--users`` users with ``--jobs`` jobs each, plus their vacancy
+texts, files, blobs and extracted file texts (see ``services/dataset.py``),
+and bulk-loads them: ``COPY`` on PostgreSQL, batched executemany elsewhere.
+The same ``--seed`` and ``--now`` always produce the same rows. Every user
+can log in as ``user<id>@example.com`` with ``--password``.
+
+The tables must be empty. ``--reset`` drops and recreates every table
+first, so only point it at a scratch database.
+
+Usage:
+    seed_dataset.py [--database-url URL] [--users 1000] [--jobs 50] [--reset]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from extensions import db
+from services.dataset import DEFAULT_PASSWORD, SyntheticDataset, analyze, load
+from sqlalchemy import create_engine
+
+
+def main():
+    """Parse arguments, load the dataset and print JSON row counts"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("DATABASE_URL"),
+        help="Target database (default: DATABASE_URL)",
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--now",
+        type=datetime.fromisoformat,
+        help="Reference time for generated dates (default: midnight UTC today)",
+    )
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument(
+        "--upload-folder", default=os.environ.get("UPLOAD_FOLDER", "uploads")
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="Drop and recreate all tables first"
+    )
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    engine = create_engine(args.database_url)
+    if args.reset:
+        db.metadata.drop_all(engine)
+        db.metadata.create_all(engine)
+
+    dataset = SyntheticDataset(
+        args.users,
+        args.jobs,
+        seed=args.seed,
+        now=args.now,
+        duplicate_ratio=args.duplicate_ratio,
+        password=args.password,
+        upload_folder=args.upload_folder,
+    )
+    started = time.perf_counter()
+    counts = load(engine, dataset)
+    load_seconds = time.perf_counter() - started
+    analyze(engine)
+    engine.dispose()
+
+    rows = sum(counts.values())
+    print(
+        json.dumps(
+            {
+                "database": engine.dialect.name,
+                "seed": args.seed,
+                "now": dataset.now.isoformat(),
+                "rows": counts,
+                "seconds": round(load_seconds, 2),
+                "rows_per_second": round(rows / load_seconds),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
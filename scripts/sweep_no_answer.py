@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Mark applications that have waited too long for a reply as NO_ANSWER.
+
+Run it from cron, or with --interval as a long-running background process.
+With PROMETHEUS_MULTIPROC_DIR shared with the web workers its metrics appear
+in the app's /metrics; --metrics-port serves them itself instead.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app
+from services.stale_jobs import sweep
+
+
+def main():
+    """Parse arguments and run the sweeper"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Users per UPDATE and transaction (default: 500)",
+    )
+    parser.add_argument(
+        "--min-days",
+        type=float,
+        default=14,
+        help="Never sweep applications younger than this (default: 14)",
+    )
+    parser.add_argument(
+        "--default-days",
+        type=float,
+        default=30,
+        help="Threshold for users with too few rejections (default: 30)",
+    )
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=3,
+        help="Rejections needed for a per-user threshold (default: 3)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would change"
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        help="Keep running, sweeping every INTERVAL seconds",
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve Prometheus metrics on this port"
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+        from services.metrics import metrics_registry
+
+        start_http_server(args.metrics_port, registry=metrics_registry())
+
+    while True:
+        with app.app_context():
+            stats = sweep(
+                batch_size=args.batch_size,
+                min_days=args.min_days,
+                default_days=args.default_days,
+                min_samples=args.min_samples,
+                dry_run=args.dry_run,
+            )
+        print(("Would mark" if args.dry_run else "Marked"), dict(stats))
+
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()